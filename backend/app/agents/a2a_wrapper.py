@@ -18,6 +18,7 @@ from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from app.agents.state import AgentState
+from app.core.llm_scheduler import Priority, llm_call_context
 from langgraph.graph.state import CompiledStateGraph
 import uuid
 import datetime
@@ -77,108 +78,110 @@ class LangGraphAgentExecutor(AgentExecutor):
         thread_id = context.context_id or str(uuid.uuid4())
         config = {"configurable": {"thread_id": thread_id}}
         
-        try:
-            if len(content_parts) == 1 and content_parts[0]["type"] == "text":
-                 inputs = {"messages": [HumanMessage(content=content_parts[0]["text"])]}
-            else:
-                 inputs = {"messages": [HumanMessage(content=content_parts)]}
+        # A2A calls are user-facing chat, scheduled ahead of background LLM work
+        with llm_call_context(Priority.INTERACTIVE, thread_id=thread_id):
+            try:
+                if len(content_parts) == 1 and content_parts[0]["type"] == "text":
+                     inputs = {"messages": [HumanMessage(content=content_parts[0]["text"])]}
+                else:
+                     inputs = {"messages": [HumanMessage(content=content_parts)]}
 
-            # Use astream_events for token streaming
-            full_response = ""
-            print(f"[DEBUG] Starting streaming...")
-            async for event in self.graph.astream_events(inputs, config, version="v1"):
-                kind = event["event"]
+                # Use astream_events for token streaming
+                full_response = ""
+                print(f"[DEBUG] Starting streaming...")
+                async for event in self.graph.astream_events(inputs, config, version="v1"):
+                    kind = event["event"]
                 
-                if kind == "on_chat_model_stream":
-                    content = event["data"]["chunk"].content
-                    if content:
-                        full_response += content
-                        print(f"[DEBUG] Streamed {len(content)} chars, total: {len(full_response)}")
-                        # Send status update with accumulated response
-                        status = TaskStatus(
-                            state=TaskState.in_progress,
-                            message=Message(
-                                messageId=str(uuid.uuid4()),
-                                role="agent",
-                                parts=[TextPart(text=full_response)]
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            full_response += content
+                            print(f"[DEBUG] Streamed {len(content)} chars, total: {len(full_response)}")
+                            # Send status update with accumulated response
+                            status = TaskStatus(
+                                state=TaskState.in_progress,
+                                message=Message(
+                                    messageId=str(uuid.uuid4()),
+                                    role="agent",
+                                    parts=[TextPart(text=full_response)]
+                                )
                             )
-                        )
-                        status_event = TaskStatusUpdateEvent(
-                            task_id=context.task_id,
-                            status=status,
-                            context_id=context.context_id,
-                            final=False
-                        )
-                        await event_queue.enqueue_event(status_event)
+                            status_event = TaskStatusUpdateEvent(
+                                task_id=context.task_id,
+                                status=status,
+                                context_id=context.context_id,
+                                final=False
+                            )
+                            await event_queue.enqueue_event(status_event)
 
-            print(f"[DEBUG] Streaming complete. Full response length: {len(full_response)}")
+                print(f"[DEBUG] Streaming complete. Full response length: {len(full_response)}")
             
-            # If no streaming events, fall back to invoke
-            if not full_response:
-                print("[DEBUG] No streaming events captured, using ainvoke...")
-                result = await self.graph.ainvoke(inputs, config)
-                messages = result.get("messages", [])
-                last_message = messages[-1] if messages else None
+                # If no streaming events, fall back to invoke
+                if not full_response:
+                    print("[DEBUG] No streaming events captured, using ainvoke...")
+                    result = await self.graph.ainvoke(inputs, config)
+                    messages = result.get("messages", [])
+                    last_message = messages[-1] if messages else None
                 
-                # Handle both string and list content formats
-                if last_message:
-                    content = last_message.content
-                    if isinstance(content, str):
-                        full_response = content
-                    elif isinstance(content, list):
-                        # Extract text from content blocks
-                        text_parts = []
-                        for block in content:
-                            if isinstance(block, dict) and 'text' in block:
-                                text_parts.append(block['text'])
-                            elif isinstance(block, str):
-                                text_parts.append(block)
-                        full_response = ''.join(text_parts)
+                    # Handle both string and list content formats
+                    if last_message:
+                        content = last_message.content
+                        if isinstance(content, str):
+                            full_response = content
+                        elif isinstance(content, list):
+                            # Extract text from content blocks
+                            text_parts = []
+                            for block in content:
+                                if isinstance(block, dict) and 'text' in block:
+                                    text_parts.append(block['text'])
+                                elif isinstance(block, str):
+                                    text_parts.append(block)
+                            full_response = ''.join(text_parts)
+                        else:
+                            full_response = str(content)
                     else:
-                        full_response = str(content)
-                else:
-                    full_response = "No response generated."
+                        full_response = "No response generated."
             
-            print(f"[DEBUG] Final response: {full_response[:100]}...")
+                print(f"[DEBUG] Final response: {full_response[:100]}...")
             
-            # Send completion status
-            status = TaskStatus(
-                state=TaskState.completed,
-                message=Message(
-                    messageId=str(uuid.uuid4()),
-                    role="agent",
-                    parts=[TextPart(text=full_response)]
+                # Send completion status
+                status = TaskStatus(
+                    state=TaskState.completed,
+                    message=Message(
+                        messageId=str(uuid.uuid4()),
+                        role="agent",
+                        parts=[TextPart(text=full_response)]
+                    )
                 )
-            )
-            event = TaskStatusUpdateEvent(
-                task_id=context.task_id,
-                status=status,
-                context_id=context.context_id,
-                final=True
-            )
-            await event_queue.enqueue_event(event)
+                event = TaskStatusUpdateEvent(
+                    task_id=context.task_id,
+                    status=status,
+                    context_id=context.context_id,
+                    final=True
+                )
+                await event_queue.enqueue_event(event)
             
-            print(f"[Agent Execution] Output: {full_response}")
+                print(f"[Agent Execution] Output: {full_response}")
             
-        except Exception as e:
-            print(f"Error executing graph: {e}")
-            import traceback
-            traceback.print_exc()
-            status = TaskStatus(
-                state=TaskState.failed,
-                message=Message(
-                    messageId=str(uuid.uuid4()),
-                    role="agent",
-                    parts=[TextPart(text=str(e))]
+            except Exception as e:
+                print(f"Error executing graph: {e}")
+                import traceback
+                traceback.print_exc()
+                status = TaskStatus(
+                    state=TaskState.failed,
+                    message=Message(
+                        messageId=str(uuid.uuid4()),
+                        role="agent",
+                        parts=[TextPart(text=str(e))]
+                    )
+                )
+                event = TaskStatusUpdateEvent(
+                    task_id=context.task_id,
+                    status=status,
+                    context_id=context.context_id,
+                    final=True
                 )
-            )
-            event = TaskStatusUpdateEvent(
-                task_id=context.task_id,
-                status=status,
-                context_id=context.context_id,
-                final=True
-            )
-            await event_queue.enqueue_event(event)
+                await event_queue.enqueue_event(event)
 
     async def execute_streaming(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
@@ -205,25 +208,53 @@ class LangGraphAgentExecutor(AgentExecutor):
         thread_id = context.context_id or str(uuid.uuid4())
         config = {"configurable": {"thread_id": thread_id}}
         
-        try:
-            if len(content_parts) == 1 and content_parts[0]["type"] == "text":
-                 inputs = {"messages": [HumanMessage(content=content_parts[0]["text"])]}
-            else:
-                 inputs = {"messages": [HumanMessage(content=content_parts)]}
+        # A2A calls are user-facing chat, scheduled ahead of background LLM work
+        with llm_call_context(Priority.INTERACTIVE, thread_id=thread_id):
+            try:
+                if len(content_parts) == 1 and content_parts[0]["type"] == "text":
+                     inputs = {"messages": [HumanMessage(content=content_parts[0]["text"])]}
+                else:
+                     inputs = {"messages": [HumanMessage(content=content_parts)]}
 
-            # Use astream_events for token streaming
-            full_response = ""
-            print(f"[DEBUG] Starting streaming for task {context.task_id}")
-            async for event in self.graph.astream_events(inputs, config, version="v1"):
-                kind = event["event"]
-                print(f"[DEBUG] Event: {kind}")
+                # Use astream_events for token streaming
+                full_response = ""
+                print(f"[DEBUG] Starting streaming for task {context.task_id}")
+                async for event in self.graph.astream_events(inputs, config, version="v1"):
+                    kind = event["event"]
+                    print(f"[DEBUG] Event: {kind}")
                 
-                if kind == "on_chat_model_stream":
-                    content = event["data"]["chunk"].content
-                    if content:
-                        full_response += content
-                        print(f"[DEBUG] Accumulated response length: {len(full_response)}")
-                        # Send status update with accumulated response
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            full_response += content
+                            print(f"[DEBUG] Accumulated response length: {len(full_response)}")
+                            # Send status update with accumulated response
+                            status = TaskStatus(
+                                state=TaskState.in_progress,
+                                message=Message(
+                                    messageId=str(uuid.uuid4()),
+                                    role="agent",
+                                    parts=[TextPart(text=full_response)]
+                                )
+                            )
+                            status_event = TaskStatusUpdateEvent(
+                                task_id=context.task_id,
+                                status=status,
+                                context_id=context.context_id,
+                                final=False
+                            )
+                            await event_queue.enqueue_event(status_event)
+
+                    elif kind == "on_tool_end":
+                        # For tool calls, we can send a status update
+                        data = event.get("data", {})
+                        tool_output = data.get("output")
+                        tool_input = data.get("input")
+                        name = event.get("name", "Tool")
+                    
+                        # Send status update about tool execution
+                        tool_msg = f"\\n[Tool: {name}]\\n"
+                        full_response += tool_msg
                         status = TaskStatus(
                             state=TaskState.in_progress,
                             message=Message(
@@ -240,71 +271,45 @@ class LangGraphAgentExecutor(AgentExecutor):
                         )
                         await event_queue.enqueue_event(status_event)
 
-                elif kind == "on_tool_end":
-                    # For tool calls, we can send a status update
-                    data = event.get("data", {})
-                    tool_output = data.get("output")
-                    tool_input = data.get("input")
-                    name = event.get("name", "Tool")
-                    
-                    # Send status update about tool execution
-                    tool_msg = f"\\n[Tool: {name}]\\n"
-                    full_response += tool_msg
-                    status = TaskStatus(
-                        state=TaskState.in_progress,
-                        message=Message(
-                            messageId=str(uuid.uuid4()),
-                            role="agent",
-                            parts=[TextPart(text=full_response)]
-                        )
-                    )
-                    status_event = TaskStatusUpdateEvent(
-                        task_id=context.task_id,
-                        status=status,
-                        context_id=context.context_id,
-                        final=False
-                    )
-                    await event_queue.enqueue_event(status_event)
-
-            print(f"[DEBUG] Streaming complete. Full response length: {len(full_response)}")
-            print(f"[DEBUG] Full response: {full_response[:200]}...")
+                print(f"[DEBUG] Streaming complete. Full response length: {len(full_response)}")
+                print(f"[DEBUG] Full response: {full_response[:200]}...")
             
-            # Send completion status with the actual response
-            status = TaskStatus(
-                state=TaskState.completed, 
-                message=Message(
-                    messageId=str(uuid.uuid4()),
-                    role="agent",
-                    parts=[TextPart(text=full_response if full_response else "No response generated")]
+                # Send completion status with the actual response
+                status = TaskStatus(
+                    state=TaskState.completed, 
+                    message=Message(
+                        messageId=str(uuid.uuid4()),
+                        role="agent",
+                        parts=[TextPart(text=full_response if full_response else "No response generated")]
+                    )
+                )
+                event = TaskStatusUpdateEvent(
+                    task_id=context.task_id, 
+                    status=status, 
+                    context_id=context.context_id,
+                    final=True
                 )
-            )
-            event = TaskStatusUpdateEvent(
-                task_id=context.task_id, 
-                status=status, 
-                context_id=context.context_id,
-                final=True
-            )
-            await event_queue.enqueue_event(event)
+                await event_queue.enqueue_event(event)
 
-        except Exception as e:
-            print(f"Error streaming graph: {e}")
-            import traceback
-            traceback.print_exc()
-            status = TaskStatus(
-                state=TaskState.failed,
-                message=Message(
-                    messageId=str(uuid.uuid4()),
-                    role="agent",
-                    parts=[TextPart(text=repr(e))]
+            except Exception as e:
+                print(f"Error streaming graph: {e}")
+                import traceback
+                traceback.print_exc()
+                status = TaskStatus(
+                    state=TaskState.failed,
+                    message=Message(
+                        messageId=str(uuid.uuid4()),
+                        role="agent",
+                        parts=[TextPart(text=repr(e))]
+                    )
+                )
+                event = TaskStatusUpdateEvent(
+                    task_id=context.task_id,
+                    status=status,
+                    context_id=context.context_id,
+                    final=True
                 )
-            )
-            event = TaskStatusUpdateEvent(
-                task_id=context.task_id,
-                status=status,
-                context_id=context.context_id,
-                final=True
-            )
-            await event_queue.enqueue_event(event)
+                await event_queue.enqueue_event(event)
 
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
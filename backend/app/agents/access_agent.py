@@ -6,6 +6,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+async def get_access_tools():
+    """Access-related tools from MCP server"""
+    tools = await get_mcp_tools(prefix="access_")
+    if not tools:
+        logger.warning("No access tools found from MCP server, using empty tool list")
+        tools = []
+    return tools
+
 async def access_agent(state: AgentState):
     """
     Access Agent: Handles SAP GRC and permission requests.
@@ -15,11 +23,7 @@ async def access_agent(state: AgentState):
         model = get_llm()
         
         # Get access-related tools from MCP server
-        tools = await get_mcp_tools(prefix="access_")
-        
-        if not tools:
-            logger.warning("No access tools found from MCP server, using empty tool list")
-            tools = []
+        tools = await get_access_tools()
         
         model = model.bind_tools(tools)
 
@@ -13,6 +13,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+async def get_m365_tools():
+    """M365 tools from MCP server + memory tools"""
+    m365_tools = await get_mcp_tools(prefix="m365_")
+    if not m365_tools:
+        logger.warning("No M365 tools found from MCP server")
+    return m365_tools + MEMORY_TOOLS
+
+
 async def m365_agent(state: AgentState):
     """
     M365 Agent: Handles user identity management (Entra ID).
@@ -23,11 +31,7 @@ async def m365_agent(state: AgentState):
         model = get_llm()
         
         # Get M365 tools from MCP server + memory tools
-        m365_tools = await get_mcp_tools(prefix="m365_")
-        all_tools = m365_tools + MEMORY_TOOLS
-        
-        if not m365_tools:
-            logger.warning("No M365 tools found from MCP server")
+        all_tools = await get_m365_tools()
         
         model = model.bind_tools(all_tools)
 
@@ -9,6 +9,7 @@ from app.agents.a2a_wrapper import LangGraphAgentExecutor
 from app.agents.resource_agent import create_resource_graph
 from app.agents.intune_agent import create_intune_graph
 from app.agents.access_management_agent import create_access_graph
+from app.api import metrics
 import asyncio
 
 async def create_app():
@@ -72,6 +73,7 @@ async def create_app():
     main_app.mount("/agents/resource", resource_app)
     main_app.mount("/agents/intune", intune_app)
     main_app.mount("/agents/access", access_app)
+    main_app.include_router(metrics.router, prefix="/api")
     
     return main_app
 
@@ -13,6 +13,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+async def get_servicenow_tools():
+    """ServiceNow tools from MCP server + memory tools"""
+    servicenow_tools = await get_mcp_tools(prefix="servicenow_")
+    if not servicenow_tools:
+        logger.warning("No ServiceNow tools found from MCP server")
+    return servicenow_tools + MEMORY_TOOLS
+
+
 async def servicenow_agent(state: AgentState):
     """
     ServiceNow Agent: Handles IT tickets and incidents.
@@ -23,11 +31,7 @@ async def servicenow_agent(state: AgentState):
         model = get_llm()
         
         # Get ServiceNow tools from MCP server + memory tools
-        servicenow_tools = await get_mcp_tools(prefix="servicenow_")
-        all_tools = servicenow_tools + MEMORY_TOOLS
-        
-        if not servicenow_tools:
-            logger.warning("No ServiceNow tools found from MCP server")
+        all_tools = await get_servicenow_tools()
         
         model = model.bind_tools(all_tools)
 
@@ -1,25 +1,36 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
 from app.agents.state import AgentState
-from app.core.rag import get_retriever
+from app.core.rag import search_documents
+from app.core.retrieval_service import asearch_documents
 from app.core.llm import get_llm
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
+from app.tools.rag_tools import consult_sop
 
-@tool
-def search_knowledge_base(query: str):
-    """Searches the internal Knowledge Base (HR Policies, IT SOPs) for information."""
-    retriever = get_retriever()
-    docs = retriever.invoke(query)
+def _search_knowledge_base(query: str):
+    docs = search_documents(query)
     return "\n\n".join([d.page_content for d in docs])
 
+async def _asearch_knowledge_base(query: str):
+    # Batched with concurrent queries and run off the event loop
+    docs = await asearch_documents(query)
+    return "\n\n".join([d.page_content for d in docs])
+
+search_knowledge_base = StructuredTool.from_function(
+    func=_search_knowledge_base,
+    coroutine=_asearch_knowledge_base,
+    name="search_knowledge_base",
+    description="Searches the internal Knowledge Base (HR Policies, IT SOPs) for information.",
+)
+
 def knowledge_agent_node(state: AgentState):
     model = get_llm()
-    tools = [search_knowledge_base]
+    tools = [search_knowledge_base, consult_sop]
     model = model.bind_tools(tools)
     
     prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are the Knowledge Agent. You answer questions using the search_knowledge_base tool. Always search before answering."),
+        ("system", "You are the Knowledge Agent. You answer questions using the search_knowledge_base tool. Always search before answering. For step-by-step IT procedures (Intune, M365, onboarding, ServiceNow, SAP access) use the consult_sop tool."),
         MessagesPlaceholder(variable_name="messages"),
     ])
     
@@ -35,7 +46,7 @@ def should_continue(state: AgentState):
 
 builder = StateGraph(AgentState)
 builder.add_node("agent", knowledge_agent_node)
-builder.add_node("tools", ToolNode([search_knowledge_base]))
+builder.add_node("tools", ToolNode([search_knowledge_base, consult_sop]))
 
 builder.add_edge(START, "agent")
 builder.add_conditional_edges("agent", should_continue, ["tools", END])
@@ -1,10 +1,12 @@
 """
 M365 Agent Subgraph
-Uses the updated async m365_agent with MCP tools
+Uses the updated async m365_agent with MCP tools.
+Tool calls are executed in parallel by the tools node before looping back.
 """
 from langgraph.graph import StateGraph, START, END
 from app.agents.state import AgentState
-from app.agents.m365_agent import m365_agent
+from app.agents.m365_agent import m365_agent, get_m365_tools
+from app.agents.tool_executor import create_tool_executor
 
 def should_continue(state: AgentState):
     """Check if the agent wants to use tools"""
@@ -13,12 +15,13 @@ def should_continue(state: AgentState):
         return "continue"
     return END
 
-# Build simple graph - agent handles tools internally via LangGraph
+# Build graph - agent decides, tools node executes its tool calls concurrently
 builder = StateGraph(AgentState)
 builder.add_node("agent", m365_agent)
+builder.add_node("tools", create_tool_executor(get_m365_tools))
 
 builder.add_edge(START, "agent")
-# The agent will handle tool calls internally, so we just loop back or end
-builder.add_conditional_edges("agent", should_continue, {"continue": "agent", END: END})
+builder.add_conditional_edges("agent", should_continue, {"continue": "tools", END: END})
+builder.add_edge("tools", "agent")
 
 m365_graph = builder.compile()
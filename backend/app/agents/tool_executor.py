@@ -0,0 +1,100 @@
+"""
+Parallel Tool Executor
+Graph node that runs every tool call of the last AIMessage concurrently.
+
+Calls are bounded by a per-graph concurrency cap and a per-tool timeout.
+Failures, timeouts and unknown tools come back to the agent as error
+ToolMessages instead of aborting the graph, so the model can recover.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from app.agents.state import AgentState
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_tool_executor(
+    load_tools: Callable[[], Awaitable[List[BaseTool]]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+):
+    """
+    Create an async graph node that executes tool calls in parallel
+
+    Args:
+        load_tools: Coroutine function returning the tools the agent was bound with
+        max_concurrency: Max tool calls running at once across all runs of this
+            graph (defaults to AGENT_TOOL_MAX_CONCURRENCY)
+        timeout: Default per-tool timeout in seconds (defaults to
+            AGENT_TOOL_TIMEOUT_SECONDS; AGENT_TOOL_TIMEOUTS overrides per tool)
+
+    Returns:
+        Graph node function returning {"messages": [ToolMessage, ...]}
+    """
+    limit = max_concurrency or settings.AGENT_TOOL_MAX_CONCURRENCY
+    default_timeout = timeout or settings.AGENT_TOOL_TIMEOUT_SECONDS
+    # One semaphore per event loop, shared by every run of the graph
+    semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def get_semaphore() -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in semaphores:
+            semaphores.clear()
+            semaphores[loop] = asyncio.Semaphore(limit)
+        return semaphores[loop]
+
+    async def run_tool_call(tools: Dict[str, BaseTool], tool_call: dict, semaphore: asyncio.Semaphore) -> ToolMessage:
+        name = tool_call["name"]
+        tool = tools.get(name)
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: tool '{name}' is not available to this agent.",
+                tool_call_id=tool_call["id"],
+                name=name,
+                status="error"
+            )
+
+        tool_timeout = settings.AGENT_TOOL_TIMEOUTS.get(name, default_timeout)
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(tool.ainvoke({**tool_call, "type": "tool_call"}), tool_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Tool '{name}' timed out after {tool_timeout}s")
+                return ToolMessage(
+                    content=f"Error: tool '{name}' timed out after {tool_timeout} seconds.",
+                    tool_call_id=tool_call["id"],
+                    name=name,
+                    status="error"
+                )
+            except Exception as e:
+                logger.error(f"Tool '{name}' failed: {e}")
+                return ToolMessage(
+                    content=f"Error: tool '{name}' failed: {e}",
+                    tool_call_id=tool_call["id"],
+                    name=name,
+                    status="error"
+                )
+
+        if isinstance(result, ToolMessage):
+            return result
+        return ToolMessage(content=str(result), tool_call_id=tool_call["id"], name=name)
+
+    async def execute_tools(state: AgentState):
+        last_message = state["messages"][-1]
+        if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+            return {"messages": []}
+
+        tools = {tool.name: tool for tool in await load_tools()}
+        semaphore = get_semaphore()
+        results = await asyncio.gather(*[
+            run_tool_call(tools, tool_call, semaphore) for tool_call in last_message.tool_calls
+        ])
+        return {"messages": list(results)}
+
+    return execute_tools
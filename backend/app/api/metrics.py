@@ -0,0 +1,55 @@
+"""
+Runtime Metrics Endpoints
+"""
+import asyncio
+from fastapi import APIRouter
+from app.core.config import settings
+from app.core.llm_scheduler import llm_scheduler
+from app.core.llm_router import llm_router
+from app.core.singleflight import llm_flights, tool_flights
+from app.core.rag import vector_store_registry
+from app.core.retrieval_service import retrieval_service
+from app.core.llm import get_embedding_cache_stats
+from app.core.memory import semantic_memory
+from app.core.memory_db import memory_db
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/llm")
+async def get_llm_metrics():
+    """Get LLM scheduler queue depth, in-flight calls and token budget per provider"""
+    return llm_scheduler.get_stats()
+
+@router.get("/llm/providers")
+async def get_llm_provider_metrics():
+    """Get TTFT percentiles, circuit breaker state and hedging counts per provider"""
+    return llm_router.get_stats()
+
+@router.get("/single-flight")
+async def get_single_flight_metrics():
+    """Get how many identical in-flight LLM and read-only tool calls were collapsed"""
+    return {
+        "llm": llm_flights.get_stats(),
+        "mcp_tools": tool_flights.get_stats()
+    }
+
+@router.get("/rag")
+async def get_rag_metrics():
+    """Get knowledge base index load times, reload count, query latency and batching"""
+    return {**vector_store_registry.get_stats(), "batching": retrieval_service.get_stats()}
+
+@router.get("/embeddings")
+async def get_embedding_metrics():
+    """Get embedding cache hit rates (memory LRU and on-disk) for the shared model"""
+    return get_embedding_cache_stats() or {"enabled": settings.EMBEDDING_CACHE_ENABLED, "loaded": False}
+
+@router.get("/memory")
+async def get_memory_metrics(top: int = 10):
+    """Get long-term memory size in total and for the largest users, plus eviction and compaction counts"""
+    usage = await asyncio.to_thread(memory_db.get_usage, top)
+    return {**memory_db.get_stats(), "usage": usage, "semantic": semantic_memory.get_stats()}
+
+@router.get("/memory/users/{user_id}")
+async def get_user_memory_metrics(user_id: str):
+    """Get one user's stored memory entries and bytes against their quotas"""
+    return await asyncio.to_thread(memory_db.get_user_usage, user_id)
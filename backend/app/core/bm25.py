@@ -0,0 +1,154 @@
+"""
+BM25 Lexical Index
+Inverted index over the knowledge base chunks, stored next to the FAISS index.
+
+Complements vector search for exact identifiers (SOP names, error codes,
+ticket categories) that embeddings tend to blur. Documents are referenced
+by the same IDs as in the FAISS docstore.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BM25_FILE = "bm25.json"
+
+# Identifiers such as INC0010001, 0x80070005, SOP-INT-001 or provision_device stay one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from how i if in is it me my of on or
+should the this to use used using what when where which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/identifier tokens without stop words"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of documents
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lens: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.avg_len = 0.0
+
+    @classmethod
+    def from_texts(cls, items: Iterable[Tuple[str, str]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Build an index from (doc_id, text) pairs
+        """
+        index = cls(k1=k1, b=b)
+        postings = defaultdict(list)
+        for doc_id, text in items:
+            position = len(index.doc_ids)
+            tokens = tokenize(text)
+            index.doc_ids.append(doc_id)
+            index.doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append((position, tf))
+        index.postings = dict(postings)
+        index.avg_len = sum(index.doc_lens) / len(index.doc_lens) if index.doc_lens else 0.0
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_ids) - df + 0.5) / (df + 0.5))
+
+    def search_with_coverage(self, query: str, k: int = 10) -> List[Tuple[str, float, float]]:
+        """
+        Score documents containing any query term
+
+        Args:
+            query: Free-text query
+            k: Number of results
+
+        Returns:
+            (doc_id, score, coverage) triples, best first; coverage is the
+            fraction of distinct query terms found in the document
+        """
+        terms = set(tokenize(query))
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for position, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[position] / self.avg_len)
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+                matched[position] += 1
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.doc_ids[position], score, matched[position] / len(terms)) for position, score in best]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """(doc_id, score) pairs for the k best matching documents"""
+        return [(doc_id, score) for doc_id, score, _ in self.search_with_coverage(query, k)]
+
+    def save(self, index_path: str):
+        path = os.path.join(index_path, BM25_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "doc_ids": self.doc_ids,
+                "doc_lens": self.doc_lens,
+                "postings": self.postings,
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["BM25Index"]:
+        """Load the index saved next to a FAISS index, or None if there is none"""
+        path = os.path.join(index_path, BM25_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(k1=data["k1"], b=data["b"])
+        index.doc_ids = data["doc_ids"]
+        index.doc_lens = data["doc_lens"]
+        index.postings = {term: [tuple(p) for p in postings] for term, postings in data["postings"].items()}
+        index.avg_len = sum(index.doc_lens) / len(index.doc_lens) if index.doc_lens else 0.0
+        return index
+
+
+def is_decisive(results: List[Tuple[str, float, float]], ratio: float, min_coverage: float) -> bool:
+    """
+    Whether the lexical top hit clearly beats the rest
+
+    The best document must cover at least min_coverage of the query terms
+    and score at least ratio times the runner-up.
+    """
+    if not results:
+        return False
+    _, top_score, coverage = results[0]
+    runner_up = results[1][1] if len(results) > 1 else 0.0
+    return coverage >= min_coverage and top_score >= ratio * runner_up
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists: score(d) = sum over lists of 1 / (k + rank)
+
+    Returns:
+        (doc_id, fused score) pairs, best first
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
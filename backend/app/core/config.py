@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -7,7 +8,7 @@ class Settings(BaseSettings):
     AZURE_OPENAI_ENDPOINT: str = ""
     GEMINI_API_KEY: str = ""
     
-    # Provider: azure, gemini, openai
+    # Provider: azure, gemini, openai, fake
     MODEL_PROVIDER: str = "azure"
     
     AZURE_OPENAI_DEPLOYMENT: str = "gpt-4o"
@@ -16,7 +17,87 @@ class Settings(BaseSettings):
     
     # MCP Server Configuration
     MCP_COMPOSITE_URL: str = "http://localhost:8001/mcp"
-    MCP_TRANSPORT: str = "http"  # http or stdio
+    MCP_TRANSPORT: str = "http"  # http, stdio, or inprocess (call the composite server in this process)
+    MCP_SINGLE_FLIGHT: bool = True  # Coalesce identical concurrent read-only tool calls
+    MCP_RESULT_CACHE: bool = True  # Composite server caches read-only tool results (invalidated by writes; off with --workers > 1)
+    MCP_RESULT_CACHE_TTL_SECONDS: float = 30.0  # Upper bound on staleness from writes in other processes
+    MCP_RESULT_CACHE_MAX_ENTRIES: int = 5000
+    MCP_TOOL_METRICS: bool = True  # Per-tool metrics: GET /metrics and the get_server_stats tool
+    MCP_BATCH_MAX_CALLS: int = 50  # Calls accepted by one batch_call request
+    MCP_BATCH_MAX_CONCURRENCY: int = 8  # batch_call calls running at once in the server
+    MCP_POOL_SIZE: int = 2  # Persistent client sessions to the composite server (inprocess uses 1)
+    MCP_CALL_TIMEOUT_SECONDS: float = 120.0  # Per tool call; agent tool timeouts are usually tighter
+    MCP_CONNECT_TIMEOUT_SECONDS: float = 5.0  # Per connection attempt and max wait for a connected session
+    MCP_HEALTH_CHECK_INTERVAL_SECONDS: float = 30.0  # Ping idle sessions (0 = off)
+    MCP_RECONNECT_BACKOFF_SECONDS: float = 0.5  # First reconnect delay, doubled per failure
+    MCP_RECONNECT_BACKOFF_MAX_SECONDS: float = 30.0
+    MCP_TOOL_CATALOG_PATH: str = "mcp_tool_catalog.json"  # Saved tool definitions for startup without the server ("" = off)
+
+    # RAG Configuration
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"  # HuggingFace sentence-transformers model
+    EMBEDDING_CACHE_ENABLED: bool = True  # Content-hash -> vector cache around the embedding model
+    EMBEDDING_CACHE_PATH: str = "embedding_cache.db"  # SQLite file ("" = in-memory LRU only)
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 10000  # In-memory LRU capacity (vectors)
+    RAG_CHUNK_SIZE: int = 500  # Max characters per chunk (app and scripts/ingest_rag.py)
+    RAG_CHUNK_OVERLAP: int = 50  # Overlapping characters between chunks
+    INGEST_BATCH_SIZE: int = 64  # Chunks per embedding batch
+    INGEST_WORKERS: int = 0  # Embedding processes for ingestion (0 = in-process)
+    RAG_INDEX_TYPE: str = "flat"  # flat | ivf | hnsw | pq (IVF-PQ) | sq8 (int8 scalar quantized)
+    RAG_INDEX_MMAP: bool = True  # Memory-map the index read-only so workers share pages
+    RAG_IVF_NLIST: int = 0  # IVF lists (0 = ~4 * sqrt(n))
+    RAG_IVF_NPROBE: int = 16  # IVF lists scanned per query
+    RAG_HNSW_M: int = 32  # HNSW graph degree
+    RAG_HNSW_EF_SEARCH: int = 128  # HNSW search beam width
+    RAG_PQ_M: int = 48  # PQ sub-quantizers (must divide the embedding dim, 384 for MiniLM)
+    RAG_HYBRID: bool = True  # Fuse BM25 and vector rankings in search_knowledge_base
+    RAG_HYBRID_CANDIDATES: int = 20  # Candidates taken from each ranking before fusion
+    RAG_RRF_K: int = 60  # Reciprocal rank fusion constant
+    RAG_BM25_DECISIVE_RATIO: float = 2.0  # BM25-only answer when top score >= ratio x runner-up
+    RAG_BM25_MIN_COVERAGE: float = 0.5  # ...and the top hit contains this share of query terms
+    RAG_BATCH_MAX_SIZE: int = 32  # Knowledge base queries embedded/searched together
+    RAG_BATCH_WAIT_MS: float = 5.0  # How long a query waits for others to join its batch
+    RAG_SEARCH_WORKERS: int = 1  # Threads running batched searches
+    RAG_WARMUP_ON_STARTUP: bool = True  # Load embeddings + FAISS index in the background at startup
+    MEMORY_DB_PATH: str = "memory.db"  # SQLite file behind memory_tools (preferences, conversation context)
+    MEMORY_WRITE_BUFFER_SECONDS: float = 0.5  # Write-behind flush interval (0 = write through)
+    MEMORY_WRITE_BUFFER_MAX: int = 1000  # Buffered writes that force an immediate flush
+    MEMORY_CONTEXT_TTL_SECONDS: float = 30 * 24 * 3600  # Conversation context lifetime (0 = until evicted)
+    MEMORY_KEY_TTL_SECONDS: Dict[str, float] = {}  # Per-key overrides, e.g. {"active_ticket": 604800}
+    MEMORY_MAX_CONTEXT_PER_USER: int = 500  # Context entries (and semantic memories) kept per user, LRU evicted (0 = unlimited)
+    MEMORY_MAX_PREFERENCES_PER_USER: int = 100  # Preferences kept per user, oldest evicted (0 = unlimited)
+    MEMORY_COMPACT_INTERVAL_SECONDS: float = 300.0  # Background expiry/summarization pass (0 = off)
+    MEMORY_COMPACT_AFTER_SECONDS: float = 7 * 24 * 3600  # Idle time before a conversation is merged into a summary
+    MEMORY_SUMMARY_MAX_CHARS: int = 2000  # Longest compaction summary (oldest text cut)
+    MEMORY_STORE_PATH: str = "memory_store.db"  # Vector-indexed SQLite store for semantic recall
+    MEMORY_SEMANTIC_SEARCH: bool = True  # Embed conversation context and search it by meaning
+    MEMORY_WARMUP_ON_STARTUP: bool = False  # Load the long-term memory store's embedding model at startup
+
+    # Agent tool execution
+    AGENT_TOOL_MAX_CONCURRENCY: int = 4  # Parallel tool calls per subgraph
+    AGENT_TOOL_TIMEOUT_SECONDS: float = 30.0
+    AGENT_TOOL_TIMEOUTS: Dict[str, float] = {}  # Per-tool overrides, e.g. {"intune_wipe_intune_device": 120}
+
+    # LLM Scheduler Configuration
+    LLM_MAX_CONCURRENCY: int = 8  # Concurrent calls per provider
+    LLM_TOKENS_PER_MINUTE: int = 0  # Per-provider budget, 0 = unlimited
+    # Per-provider overrides, e.g. {"azure": {"max_concurrency": 4, "tokens_per_minute": 90000}}
+    LLM_PROVIDER_LIMITS: Dict[str, Dict[str, int]] = {}
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = 512
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: float = 10.0
+    LLM_SINGLE_FLIGHT: bool = True  # Coalesce identical concurrent LLM requests
+
+    # LLM Router (failover and hedging across providers)
+    LLM_FALLBACK_PROVIDERS: List[str] = []  # e.g. ["gemini", "openai"]; empty disables routing
+    LLM_HEDGE_DELAY_MS: int = 2000  # Hedge delay until enough TTFT samples exist
+    LLM_HEDGE_MIN_DELAY_MS: int = 250  # Never hedge sooner than this
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_ROUTER_LATENCY_WINDOW: int = 200  # TTFT samples kept per provider
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 3  # Consecutive failures before a provider is skipped
+    LLM_CIRCUIT_COOLDOWN_SECONDS: float = 30.0
+
+    # Fake provider latency (MODEL_PROVIDER=fake, for tests and load simulation)
+    FAKE_LLM_FIRST_TOKEN_DELAY_MS: int = 0
+    FAKE_LLM_TOKEN_DELAY_MS: int = 0
 
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore")
 
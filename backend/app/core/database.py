@@ -1,13 +1,45 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Type
+import os
 
-# Use async SQLite driver
-DATABASE_URL = "sqlite+aiosqlite:///./antigravity.db"
+# Use async SQLite driver (DATABASE_URL in the environment points elsewhere, e.g. for tests)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./antigravity.db")
 
 engine = create_async_engine(DATABASE_URL, echo=True, future=True)
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    # The backend and every MCP server worker share this file: WAL lets
+    # readers run alongside a writer, and writers wait instead of failing
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+_ensured_tables = set()
+
+async def ensure_tables(*models: Type[SQLModel]):
+    """Create the tables behind these models if missing (once per process)"""
+    tables = [model.__table__ for model in models if model.__table__.name not in _ensured_tables]
+    if not tables:
+        return
+    for attempt in range(3):
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all, tables=tables)
+            break
+        except OperationalError as e:
+            # Another process created one between the existence check and CREATE
+            if "already exists" not in str(e) or attempt == 2:
+                raise
+    _ensured_tables.update(table.name for table in tables)
+
 async def init_db():
     from app.core.seed_data import seed_database
     
@@ -0,0 +1,216 @@
+"""
+Embedding Cache
+Content-hash -> vector cache wrapped around an Embeddings model.
+
+Vectors are kept in an in-memory LRU in front of a SQLite table, so the
+same text is embedded once across ingestion runs, repeated knowledge base
+queries and memory searches, and across processes. Cache keys include a
+fingerprint of the model configuration, so switching models never serves
+vectors from the old one.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def model_fingerprint(embeddings: Embeddings) -> str:
+    """
+    Identify the model configuration that produced a vector
+
+    Built from the class, the model name and encoding options, so a
+    different model or normalization setting gets separate cache entries.
+    """
+    cls = type(embeddings)
+    parts = {"class": f"{cls.__module__}.{cls.__qualname__}"}
+    for attr in ("model_name", "model", "deployment", "size", "encode_kwargs", "query_encode_kwargs"):
+        value = getattr(embeddings, attr, None)
+        if value is not None:
+            parts[attr] = value
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+# Models whose embed_query is embed_documents on one text, so queries can be batched
+_QUERY_AS_DOCUMENT = (
+    "langchain_huggingface.embeddings.huggingface.HuggingFaceEmbeddings",
+    "langchain_core.embeddings.fake.DeterministicFakeEmbedding",
+    "langchain_core.embeddings.fake.FakeEmbeddings",
+)
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    Embed several queries with as few model calls as possible
+
+    Uses one embed_documents call when the model encodes queries and
+    documents the same way, otherwise one embed_query call per text.
+    """
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(texts)
+    names = {f"{cls.__module__}.{cls.__qualname__}" for cls in type(embeddings).__mro__}
+    if names.intersection(_QUERY_AS_DOCUMENT) and not getattr(embeddings, "query_encode_kwargs", None):
+        return embeddings.embed_documents(texts)
+    return [embeddings.embed_query(text) for text in texts]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated texts from cache
+
+    Document and query vectors are cached separately, since some models
+    embed queries differently.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        path: Optional[str] = None,
+        memory_items: int = 10000,
+        fingerprint: Optional[str] = None,
+    ):
+        """
+        Args:
+            inner: Model used for cache misses
+            path: SQLite file for the persistent cache (None = memory only)
+            memory_items: Capacity of the in-memory LRU
+            fingerprint: Override for the model fingerprint
+        """
+        self.inner = inner
+        self.path = path
+        self.memory_items = memory_items
+        self.fingerprint = fingerprint or model_fingerprint(inner)
+        self._model_key = hashlib.sha256(self.fingerprint.encode("utf-8")).hexdigest()[:16]
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_model ON embeddings (model)")
+            self._conn.commit()
+
+    def __getstate__(self):
+        # Worker processes reopen their own connection
+        state = self.__dict__.copy()
+        state.update(_conn=None, _lock=None, _lru=OrderedDict())
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if self.path:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self._model_key}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+    def _embed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+            in_memory = set(found)
+            self.memory_hits += sum(1 for key in keys if key in in_memory)
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._conn is not None:
+                # SQLite caps bound parameters; look up in slices
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                        found[key] = vector
+                        self._remember(key, vector)
+                self.disk_hits += sum(1 for key in keys if key in found and key not in in_memory)
+
+        # Embed each distinct missing text once, outside the lock
+        todo = {key: text for key, text in zip(keys, texts) if key not in found}
+        if todo:
+            todo_keys = list(todo)
+            if kind == "query":
+                vectors = embed_queries(self.inner, [todo[key] for key in todo_keys])
+            else:
+                vectors = self.inner.embed_documents([todo[key] for key in todo_keys])
+            blobs = [np.asarray(vector, dtype=np.float32) for vector in vectors]
+            with self._lock:
+                self.misses += sum(1 for key in keys if key in todo)
+                for key, array in zip(todo_keys, blobs):
+                    # Return float32-rounded values so hits and misses are identical
+                    found[key] = array.tolist()
+                    self._remember(key, found[key])
+                if self._conn is not None:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                        [(key, self._model_key, array.tobytes()) for key, array in zip(todo_keys, blobs)],
+                    )
+                    self._conn.commit()
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("doc", list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("query", list(texts))
+
+    def purge_other_models(self) -> int:
+        """Delete persisted vectors of every model except the current one"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM embeddings WHERE model != ?", (self._model_key,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        stats = {
+            "model": self.fingerprint,
+            "memory_items": len(self._lru),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+        }
+        if self._conn is not None:
+            with self._lock:
+                stats["disk_items"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self._model_key,)
+                ).fetchone()[0]
+        return stats
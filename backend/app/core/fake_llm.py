@@ -0,0 +1,120 @@
+"""
+Fake Chat Model
+Offline LLM backend for tests and local load simulation (MODEL_PROVIDER=fake).
+Latency is configurable so slow and fast providers can be simulated.
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Scripted chat model with simulated latency and failures.
+
+    Responses are returned in order; the last one repeats once the script
+    is exhausted. AIMessages with tool_calls can be scripted to drive
+    tool-calling agents.
+    """
+
+    responses: List[Union[str, AIMessage]] = ["This is a fake response."]
+    first_token_delay: float = 0.0  # Seconds before the first token / response
+    token_delay: float = 0.0  # Seconds between streamed tokens
+    error: Optional[str] = None  # Raise RuntimeError(error) instead of answering
+    name_suffix: str = ""
+
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": f"fake{self.name_suffix}"}
+
+    @property
+    def call_count(self) -> int:
+        return self._calls
+
+    def bind_tools(self, tools, **kwargs: Any):
+        # Tool schemas are accepted but the script decides which tools get called
+        return self.bind(tools=[getattr(t, "name", str(t)) for t in tools])
+
+    def _next_message(self) -> AIMessage:
+        if self.error:
+            self._calls += 1
+            raise RuntimeError(self.error)
+        response = self.responses[min(self._calls, len(self.responses) - 1)]
+        self._calls += 1
+        if isinstance(response, AIMessage):
+            return response.model_copy(deep=True)
+        return AIMessage(content=response)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.first_token_delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message())])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.first_token_delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message())])
+
+    def _chunks(self, message: AIMessage) -> List[ChatGenerationChunk]:
+        if message.tool_calls or not isinstance(message.content, str):
+            return [ChatGenerationChunk(message=AIMessageChunk(
+                content=message.content,
+                tool_call_chunks=[
+                    {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                    for i, tc in enumerate(message.tool_calls)
+                ],
+            ))]
+        words = message.content.split(" ")
+        return [
+            ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+            for i, word in enumerate(words)
+        ]
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_delay)
+        for i, chunk in enumerate(self._chunks(self._next_message())):
+            if i:
+                time.sleep(self.token_delay)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_delay)
+        for i, chunk in enumerate(self._chunks(self._next_message())):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield chunk
@@ -0,0 +1,415 @@
+"""
+Incremental RAG Ingestion
+Manifest-driven pipeline that keeps the FAISS index in sync with document files.
+
+A manifest stored next to the index records, per source file, its content
+hash, the chunk settings used and the IDs of its chunks. A chunk's ID is
+the hash of its file path and text, so re-running ingestion only embeds
+chunks that are new, deletes vectors of chunks that were edited away or
+whose file was removed, and skips everything else. File paths are taken
+relative to the directory holding the index, so the IDs are the same
+whichever directory ingestion runs from.
+
+Chunks are streamed file by file into fixed-size embedding batches, which
+run either in-process or on a CPU process pool holding one model per
+worker, so large corpora are embedded with bounded memory.
+
+The manifest tracks the exact flat index; the configured search index type
+(see app.core.vector_index) and the BM25 index are derived from it.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.core.bm25 import BM25Index
+from app.core.config import settings
+from app.core.vector_index import remove_search_indexes, search_index_is_current, write_search_index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2  # 2: sources relative to the index's parent directory
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable vector ID for a chunk of a source file"""
+    return _sha256(f"{source}\0{text}".encode("utf-8"))
+
+
+def load_manifest(index_path: str) -> Optional[Dict[str, Any]]:
+    """Load the ingestion manifest, or None if the index has none"""
+    path = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(index_path: str, manifest: Dict[str, Any]):
+    # Write-then-rename so a crash never leaves a half-written manifest
+    path = os.path.join(index_path, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def find_documents(docs_path: str, patterns: Iterable[str] = ("*.txt", "*.md")) -> List[Path]:
+    """List source files under docs_path matching any of the glob patterns"""
+    docs_dir = Path(docs_path)
+    files = set()
+    for pattern in patterns:
+        files.update(docs_dir.glob(pattern))
+    return sorted(files)
+
+
+def _source_root(index_path: str) -> str:
+    """Directory source keys are relative to: the one holding the index"""
+    return os.path.dirname(os.path.abspath(index_path))
+
+
+def _source_key(path: Path, root: str) -> str:
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+
+
+def split_file(
+    path: Path,
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    root: str,
+) -> List[Tuple[str, Document]]:
+    """
+    Split one file into chunks with content-derived IDs
+
+    Args:
+        root: Directory the file's source key is relative to (see _source_root)
+
+    Returns:
+        (chunk_id, Document) pairs; identical chunks within a file are kept once
+    """
+    source = _source_key(path, root)
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+    chunks = []
+    seen = set()
+    for doc in splitter.create_documents([text], metadatas=[{"source": source}]):
+        doc_id = chunk_id(source, doc.page_content)
+        if doc_id in seen:
+            continue
+        seen.add(doc_id)
+        chunks.append((doc_id, doc))
+    return chunks
+
+
+def save_store(index_path: str, vectorstore: FAISS):
+    """
+    Save the store by writing to a temp dir and renaming into place
+
+    Readers may have index.faiss memory-mapped; rewriting it in place would
+    truncate the mapped file under them, renaming swaps the inode instead.
+    """
+    os.makedirs(index_path, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=index_path, prefix=".tmp-") as tmp_dir:
+        vectorstore.save_local(tmp_dir)
+        for name in os.listdir(tmp_dir):
+            os.replace(os.path.join(tmp_dir, name), os.path.join(index_path, name))
+
+
+def save_bm25(index_path: str, vectorstore: FAISS):
+    """Rebuild the BM25 index from every chunk in the store (no embedding needed)"""
+    BM25Index.from_texts(
+        (doc_id, doc.page_content) for doc_id, doc in vectorstore.docstore._dict.items()
+    ).save(index_path)
+
+
+# --- Embedding workers ---
+
+_worker_embeddings: Optional[Embeddings] = None
+
+
+def _init_worker(embeddings_factory: Callable[[], Embeddings], torch_threads: int):
+    """Process pool initializer: load one embedding model per worker"""
+    global _worker_embeddings
+    try:
+        import torch
+        # Split the CPU between workers instead of every worker using all cores
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _worker_embeddings = embeddings_factory()
+
+
+def _embed_in_worker(texts: List[str]) -> List[List[float]]:
+    return _worker_embeddings.embed_documents(texts)
+
+
+def default_worker_embeddings_factory() -> Callable[[], Embeddings]:
+    """Picklable factory building the configured (cached) HuggingFace model in a worker"""
+    from app.core.llm import create_embeddings
+    return partial(create_embeddings, model_name=settings.EMBEDDING_MODEL)
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most batch_size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(
+    batches: Iterable[List[Tuple[str, Document]]],
+    embeddings: Embeddings,
+    workers: int = 0,
+    worker_embeddings_factory: Optional[Callable[[], Embeddings]] = None,
+) -> Iterator[Tuple[List[Tuple[str, Document]], List[List[float]]]]:
+    """
+    Embed chunk batches in order, in-process or on a CPU process pool
+
+    Batches are pulled lazily and at most 2 * workers are in flight, so
+    memory stays bounded however large the corpus is.
+
+    Args:
+        batches: Iterable of (chunk_id, Document) batches
+        embeddings: Model used when workers is 0
+        workers: Number of worker processes (0 = embed in this process)
+        worker_embeddings_factory: Picklable zero-arg factory creating the
+            model inside each worker (defaults to the configured HF model)
+
+    Yields:
+        (batch, vectors) pairs in input order
+    """
+    if workers <= 0:
+        for batch in batches:
+            yield batch, embeddings.embed_documents([doc.page_content for _, doc in batch])
+        return
+
+    factory = worker_embeddings_factory or default_worker_embeddings_factory()
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn: forking a process that already loaded torch can deadlock
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(factory, torch_threads),
+    ) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch, pool.submit(_embed_in_worker, [doc.page_content for _, doc in batch])))
+            if len(pending) >= 2 * workers:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+def ingest_documents(
+    docs_path: str,
+    index_path: str,
+    embeddings: Embeddings,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    patterns: Iterable[str] = ("*.txt", "*.md"),
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    worker_embeddings_factory: Optional[Callable[[], Embeddings]] = None,
+) -> Dict[str, Any]:
+    """
+    Bring the FAISS index at index_path in sync with the files in docs_path
+
+    Only files under docs_path are considered, so several document
+    directories can share one index. Indexes without a current manifest
+    (built by older versions) are rebuilt from scratch. Chunks are generated file by
+    file and embedded in batches as they are produced.
+
+    Args:
+        docs_path: Directory holding the source documents
+        index_path: FAISS index directory (created if missing)
+        embeddings: Embeddings used for new chunks
+        chunk_size: Max characters per chunk (defaults to RAG_CHUNK_SIZE)
+        chunk_overlap: Overlapping characters between chunks (defaults to RAG_CHUNK_OVERLAP)
+        patterns: Glob patterns selecting source files
+        batch_size: Chunks per embedding batch (defaults to INGEST_BATCH_SIZE)
+        workers: Embedding processes, 0 = in-process (defaults to INGEST_WORKERS)
+        worker_embeddings_factory: Picklable model factory for worker processes
+
+    Returns:
+        Report with file counts, embedded / skipped / deleted chunk counts
+        and embedding throughput
+    """
+    chunk_size = chunk_size or settings.RAG_CHUNK_SIZE
+    chunk_overlap = settings.RAG_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    workers = settings.INGEST_WORKERS if workers is None else workers
+
+    manifest = load_manifest(index_path)
+    index_exists = os.path.exists(os.path.join(index_path, "index.faiss"))
+    if index_exists and manifest is None:
+        logger.warning(f"Index at {index_path} has no ingestion manifest; rebuilding from scratch")
+        index_exists = False
+    if not index_exists:
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+
+    report = {
+        "files_scanned": 0,
+        "files_unchanged": 0,
+        "files_changed": 0,
+        "files_removed": 0,
+        "chunks_total": 0,
+        "chunks_skipped": 0,
+        "chunks_embedded": 0,
+        "chunks_deleted": 0,
+        "batch_size": batch_size,
+        "workers": workers,
+        "embed_seconds": 0.0,
+        "chunks_per_sec": None,
+    }
+    files = manifest["files"]
+    root = _source_root(index_path)
+    to_delete: List[str] = []
+    current_sources = set()
+
+    def new_chunks() -> Iterator[Tuple[str, Document]]:
+        """Yield chunks that need embedding, one file at a time"""
+        for path in find_documents(docs_path, patterns):
+            source = _source_key(path, root)
+            current_sources.add(source)
+            report["files_scanned"] += 1
+            try:
+                raw = path.read_bytes()
+            except OSError as e:
+                logger.error(f"Error loading {path.name}: {e}")
+                continue
+
+            file_hash = _sha256(raw)
+            entry = files.get(source)
+            if (
+                entry is not None
+                and entry["sha256"] == file_hash
+                and entry["chunk_size"] == chunk_size
+                and entry["chunk_overlap"] == chunk_overlap
+            ):
+                report["files_unchanged"] += 1
+                report["chunks_skipped"] += len(entry["chunks"])
+                report["chunks_total"] += len(entry["chunks"])
+                continue
+
+            try:
+                text = raw.decode("utf-8")
+            except UnicodeDecodeError as e:
+                logger.error(f"Error loading {path.name}: not UTF-8 text ({e})")
+                continue
+            chunks = split_file(path, text, chunk_size, chunk_overlap, root)
+            old_ids = set(entry["chunks"]) if entry else set()
+            new_ids = [doc_id for doc_id, _ in chunks]
+
+            to_delete.extend(old_ids.difference(new_ids))
+            report["files_changed"] += 1
+            report["chunks_skipped"] += len(old_ids.intersection(new_ids))
+            report["chunks_total"] += len(new_ids)
+            files[source] = {
+                "sha256": file_hash,
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "chunks": new_ids,
+            }
+            for doc_id, doc in chunks:
+                if doc_id not in old_ids:
+                    yield doc_id, doc
+
+    vectorstore = None
+
+    def open_existing():
+        # The existing index is only loaded once there is something to change
+        return FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+
+    started = time.perf_counter()
+    for batch, vectors in embed_batches(
+        iter_batches(new_chunks(), batch_size), embeddings, workers, worker_embeddings_factory
+    ):
+        text_embeddings = [(doc.page_content, vector) for (_, doc), vector in zip(batch, vectors)]
+        metadatas = [doc.metadata for _, doc in batch]
+        ids = [doc_id for doc_id, _ in batch]
+        if vectorstore is None and index_exists:
+            vectorstore = open_existing()
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        report["chunks_embedded"] += len(batch)
+    report["embed_seconds"] = round(time.perf_counter() - started, 3)
+    if report["chunks_embedded"] and report["embed_seconds"] > 0:
+        report["chunks_per_sec"] = round(report["chunks_embedded"] / report["embed_seconds"], 1)
+
+    # Files under docs_path that disappeared since the last run
+    docs_key = _source_key(Path(docs_path), root)
+    docs_prefix = "" if docs_key == "." else docs_key.rstrip("/") + "/"
+    for source in list(files):
+        if source.startswith(docs_prefix) and source not in current_sources:
+            to_delete.extend(files.pop(source)["chunks"])
+            report["files_removed"] += 1
+
+    if index_exists and not report["chunks_embedded"] and not to_delete:
+        if report["files_changed"]:
+            # Edits that produced the same chunks only need the new file hashes
+            save_manifest(index_path, manifest)
+        if BM25Index.load(index_path) is None:
+            # Indexes built before BM25 support get their lexical index now
+            save_bm25(index_path, open_existing())
+        if not search_index_is_current(index_path):
+            # RAG_INDEX_TYPE changed since the last run (or its index predates the corpus)
+            write_search_index(index_path, open_existing().index)
+        logger.info(f"Index at {index_path} is up to date")
+        return report
+
+    if to_delete and vectorstore is None and index_exists:
+        vectorstore = open_existing()
+    if vectorstore is not None:
+        # Only delete IDs the store actually holds
+        to_delete = [doc_id for doc_id in to_delete if doc_id in vectorstore.docstore._dict]
+        if to_delete:
+            vectorstore.delete(to_delete)
+    report["chunks_deleted"] = len(to_delete)
+
+    if vectorstore is None:
+        logger.warning(f"No documents to index under {docs_path}")
+        return report
+
+    # Derived indexes of any type describe the old corpus; until the configured
+    # one is rebuilt, readers use the new flat index
+    remove_search_indexes(index_path)
+    save_store(index_path, vectorstore)
+    write_search_index(index_path, vectorstore.index)
+    save_bm25(index_path, vectorstore)
+    save_manifest(index_path, manifest)
+    return report
@@ -1,13 +1,23 @@
+import threading
+import time
 from langchain_openai import ChatOpenAI, AzureChatOpenAI, AzureOpenAIEmbeddings, OpenAIEmbeddings
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from app.core.config import settings
+from app.core.llm_scheduler import ScheduledChatModel
+from app.core.llm_router import RoutedChatModel
+from app.core.embedding_cache import CachedEmbeddings
 
-def get_llm():
+PROVIDERS = ("azure", "gemini", "openai", "fake")
+
+def _normalize_provider(provider: str) -> str:
+    provider = provider.lower()
+    # Anything unknown defaults to standard OpenAI
+    return provider if provider in PROVIDERS else "openai"
+
+def _create_chat_model(provider: str):
     """
-    Returns the configured LLM instance based on MODEL_PROVIDER settings.
+    Builds the raw chat model client for a provider.
     """
-    provider = settings.MODEL_PROVIDER.lower()
-    
     if provider == "azure":
         return AzureChatOpenAI(
             azure_deployment=settings.AZURE_OPENAI_DEPLOYMENT,
@@ -21,6 +31,12 @@ def get_llm():
             google_api_key=settings.GEMINI_API_KEY,
             convert_system_message_to_human=True 
         )
+    elif provider == "fake":
+        from app.core.fake_llm import FakeChatModel
+        return FakeChatModel(
+            first_token_delay=settings.FAKE_LLM_FIRST_TOKEN_DELAY_MS / 1000.0,
+            token_delay=settings.FAKE_LLM_TOKEN_DELAY_MS / 1000.0
+        )
     else:
         # Default to standard OpenAI
         return ChatOpenAI(
@@ -28,10 +44,61 @@ def get_llm():
             temperature=0
         )
 
+def get_llm():
+    """
+    Returns the configured LLM instance based on MODEL_PROVIDER settings.
+    Calls go through the process-wide scheduler so per-provider
+    concurrency and token budgets are respected. When
+    LLM_FALLBACK_PROVIDERS is set, calls fail over and hedge across them.
+    """
+    providers = [_normalize_provider(settings.MODEL_PROVIDER)]
+    for fallback in settings.LLM_FALLBACK_PROVIDERS:
+        fallback = _normalize_provider(fallback)
+        if fallback not in providers:
+            providers.append(fallback)
+
+    backends = [ScheduledChatModel(inner=_create_chat_model(p), provider=p) for p in providers]
+    if len(backends) == 1:
+        return backends[0]
+    return RoutedChatModel(backends=backends)
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+embeddings_load_seconds = None
+
+def create_embeddings(model_name: str = None):
+    """
+    Builds the local HuggingFace embeddings, wrapped in the embedding cache
+    when EMBEDDING_CACHE_ENABLED is set.
+    Module-level so process pool workers can build their own copy.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(model_name=model_name or settings.EMBEDDING_MODEL)
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(
+        embeddings,
+        path=settings.EMBEDDING_CACHE_PATH or None,
+        memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+    )
+
 def get_embeddings():
     """
-    Returns the configured Embeddings instance.
+    Returns the process-wide Embeddings instance.
     Forcing Local Embeddings to avoid Quota issues.
+    The model is loaded once on first use and shared by every caller.
     """
-    from langchain_huggingface import HuggingFaceEmbeddings
-    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    global _embeddings, embeddings_load_seconds
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                started = time.perf_counter()
+                _embeddings = create_embeddings()
+                embeddings_load_seconds = time.perf_counter() - started
+    return _embeddings
+
+def get_embedding_cache_stats():
+    """Hit/miss counts of the shared embeddings' cache, or None if not loaded or uncached"""
+    if isinstance(_embeddings, CachedEmbeddings):
+        return _embeddings.get_stats()
+    return None
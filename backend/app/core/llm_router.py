@@ -0,0 +1,372 @@
+"""
+LLM Provider Router
+Latency-aware failover and request hedging across LLM providers.
+
+The router tracks time-to-first-token (TTFT) per provider. When the primary
+has not produced its first token within its p95 TTFT, a hedged request is
+sent to the next healthy provider and whichever answers first wins; the
+other request is cancelled. Providers that keep failing are taken out of
+rotation by a circuit breaker until a cooldown has passed.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """
+    Rolling TTFT samples and circuit breaker state for one provider
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._ttft = deque(maxlen=settings.LLM_ROUTER_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
+    def p95_ttft(self) -> Optional[float]:
+        """95th percentile TTFT in seconds, or None until enough samples exist"""
+        with self._lock:
+            if len(self._ttft) < settings.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self._ttft)
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def hedge_delay(self) -> float:
+        p95 = self.p95_ttft()
+        if p95 is None:
+            return settings.LLM_HEDGE_DELAY_MS / 1000.0
+        return max(p95, settings.LLM_HEDGE_MIN_DELAY_MS / 1000.0)
+
+    def is_available(self) -> bool:
+        """Closed circuits accept calls; open ones allow a trial after the cooldown"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= settings.LLM_CIRCUIT_COOLDOWN_SECONDS:
+                self.state = self.HALF_OPEN
+            return self.state != self.OPEN
+
+    def record_ttft(self, ttft: float):
+        """TTFT of a stream whose outcome is recorded when it ends"""
+        with self._lock:
+            self._ttft.append(ttft)
+
+    def record_success(self, ttft: Optional[float] = None):
+        with self._lock:
+            self.requests += 1
+            if ttft is not None:
+                self._ttft.append(ttft)
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= settings.LLM_CIRCUIT_FAILURE_THRESHOLD:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened for LLM provider '{self.provider}'")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_hedge(self, won: bool = False):
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedges_sent += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95_ttft()
+        with self._lock:
+            samples = list(self._ttft)
+            return {
+                "state": self.state,
+                "requests": self.requests,
+                "failures": self.failures,
+                "consecutive_failures": self.consecutive_failures,
+                "p50_ttft_ms": round(1000 * sorted(samples)[len(samples) // 2], 1) if samples else None,
+                "p95_ttft_ms": round(1000 * p95, 1) if p95 is not None else None,
+                "hedges_sent": self.hedges_sent,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+class LLMRouter:
+    """
+    Registry of provider health shared by all routed models in the process
+    """
+
+    def __init__(self):
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def health(self, provider: str) -> ProviderHealth:
+        with self._lock:
+            if provider not in self._health:
+                self._health[provider] = ProviderHealth(provider)
+            return self._health[provider]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            health = dict(self._health)
+        return {provider: h.get_stats() for provider, h in health.items()}
+
+
+# Global router state
+llm_router = LLMRouter()
+
+
+async def _cancel(task: Optional[asyncio.Task]):
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that fails over and hedges between provider backends.
+
+    Backends are tried in order (primary first). Each backend must expose a
+    `provider` attribute, e.g. ScheduledChatModel. Tools are bound per
+    backend at call time because every provider has its own tool format.
+    For non-streamed calls the full response latency counts as TTFT.
+    """
+
+    backends: List[BaseChatModel]
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"providers": [b.provider for b in self.backends]}
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self.bind(routed_tools=list(tools), routed_tool_kwargs=kwargs)
+
+    def _candidates(self) -> List[BaseChatModel]:
+        available = [b for b in self.backends if llm_router.health(b.provider).is_available()]
+        # With every circuit open, still try the providers rather than failing outright
+        return available or list(self.backends)
+
+    def _backend_kwargs(self, backend: BaseChatModel, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs = dict(kwargs)
+        tools = kwargs.pop("routed_tools", None)
+        tool_kwargs = dict(kwargs.pop("routed_tool_kwargs", None) or {})
+        tool_kwargs.pop("ls_structured_output_format", None)
+        if tools is not None:
+            kwargs.update(backend.bind_tools(tools, **tool_kwargs).kwargs)
+        return kwargs
+
+    # --- Sync path: ordered failover without hedging ---
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for backend in self._candidates():
+            health = llm_router.health(backend.provider)
+            started = time.monotonic()
+            try:
+                result = backend._generate(messages, stop=stop, run_manager=run_manager,
+                                           **self._backend_kwargs(backend, kwargs))
+            except Exception as e:
+                health.record_failure()
+                logger.warning(f"LLM provider '{backend.provider}' failed: {e}")
+                last_error = e
+                continue
+            health.record_success(time.monotonic() - started)
+            return result
+        raise last_error
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        last_error: Optional[Exception] = None
+        for backend in self._candidates():
+            health = llm_router.health(backend.provider)
+            started = time.monotonic()
+            stream = backend._stream(messages, stop=stop, run_manager=run_manager,
+                                     **self._backend_kwargs(backend, kwargs))
+            try:
+                first = next(stream)
+            except StopIteration:
+                health.record_success(time.monotonic() - started)
+                return
+            except Exception as e:
+                health.record_failure()
+                logger.warning(f"LLM provider '{backend.provider}' failed: {e}")
+                last_error = e
+                continue
+            # A stream only succeeds once it ends; failing mid-stream counts for the breaker
+            health.record_ttft(time.monotonic() - started)
+            try:
+                yield first
+                yield from stream
+            except GeneratorExit:
+                health.record_success()
+                raise
+            except Exception as e:
+                health.record_failure()
+                logger.warning(f"LLM provider '{backend.provider}' failed mid-stream: {e}")
+                raise
+            health.record_success()
+            return
+        raise last_error
+
+    # --- Async path: failover plus hedging on slow first token ---
+
+    async def _race(self, start_call, candidates: List[BaseChatModel], streaming: bool = False):
+        """
+        Start the primary and hedge to the next candidate if it is slow.
+
+        Args:
+            start_call: Function(backend) -> awaitable resolving to the
+                backend's first response (result or first stream chunk)
+            candidates: Backends in preference order
+            streaming: Only record the winner's TTFT; the caller records
+                its success or failure when the stream ends
+
+        Returns:
+            (winning backend, its first response, still-running loser tasks)
+        """
+        pending: Dict[asyncio.Task, BaseChatModel] = {}
+        started: Dict[str, float] = {}
+        queue = list(candidates)
+        last_error: Optional[Exception] = None
+
+        def launch():
+            backend = queue.pop(0)
+            started[backend.provider] = time.monotonic()
+            pending[asyncio.ensure_future(start_call(backend))] = backend
+            return backend
+
+        primary = launch()
+        try:
+            while pending:
+                # Hedge only while the original primary is the sole request in flight
+                timeout = None
+                if queue and len(pending) == 1 and any(b is primary for b in pending.values()):
+                    timeout = llm_router.health(primary.provider).hedge_delay()
+
+                done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge = launch()
+                    llm_router.health(primary.provider).record_hedge()
+                    logger.info(f"Hedging LLM request from '{primary.provider}' to '{hedge.provider}'")
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    health = llm_router.health(backend.provider)
+                    if task.exception() is not None:
+                        health.record_failure()
+                        last_error = task.exception()
+                        logger.warning(f"LLM provider '{backend.provider}' failed: {last_error}")
+                        continue
+                    if streaming:
+                        health.record_ttft(time.monotonic() - started[backend.provider])
+                    else:
+                        health.record_success(time.monotonic() - started[backend.provider])
+                    if backend is not primary:
+                        health.record_hedge(won=True)
+                    return backend, task.result(), list(pending.keys())
+
+                # Everything in flight failed: fail over to the next candidate
+                if not pending and queue:
+                    launch()
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        raise last_error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        def start_call(backend):
+            return backend._agenerate(messages, stop=stop, run_manager=run_manager,
+                                      **self._backend_kwargs(backend, kwargs))
+
+        _, result, losers = await self._race(start_call, self._candidates())
+        for task in losers:
+            await _cancel(task)
+        return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        streams: Dict[str, AsyncIterator[ChatGenerationChunk]] = {}
+
+        async def start_call(backend):
+            stream = backend._astream(messages, stop=stop, run_manager=run_manager,
+                                      **self._backend_kwargs(backend, kwargs))
+            streams[backend.provider] = stream
+            try:
+                return await stream.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        winner, first, losers = await self._race(start_call, self._candidates(), streaming=True)
+        for task in losers:
+            await _cancel(task)
+        for provider, stream in streams.items():
+            if provider != winner.provider:
+                await stream.aclose()
+
+        health = llm_router.health(winner.provider)
+        if first is None:
+            health.record_success()
+            return
+        try:
+            yield first
+            async for chunk in streams[winner.provider]:
+                yield chunk
+        except GeneratorExit:
+            health.record_success()
+            raise
+        except Exception as e:
+            health.record_failure()
+            logger.warning(f"LLM provider '{winner.provider}' failed mid-stream: {e}")
+            raise
+        health.record_success()
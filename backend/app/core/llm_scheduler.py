@@ -0,0 +1,491 @@
+"""
+LLM Concurrency Scheduler
+Bounds how many LLM calls run at once per provider.
+
+Each provider gets a fixed number of concurrency slots and an optional
+tokens-per-minute budget. Calls that cannot start immediately wait in a
+priority queue: interactive chat goes before background work, and within a
+priority class conversation threads are served round-robin so one busy
+thread cannot starve the others.
+"""
+import asyncio
+import contextvars
+import copy
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from app.core.config import settings
+from app.core.singleflight import llm_flights, make_key
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority classes for LLM calls (lower value is served first)"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_priority", default=Priority.BACKGROUND
+)
+_current_thread_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "llm_thread_id", default=None
+)
+
+
+@contextmanager
+def llm_call_context(priority: Priority, thread_id: Optional[str] = None):
+    """
+    Tag every LLM call made inside this block with a priority and thread id.
+
+    Context variables are copied into tasks and executor threads, so this
+    covers all graph nodes started from within the block.
+
+    Args:
+        priority: Priority class for the calls
+        thread_id: Conversation thread used for fair sharing
+    """
+    priority_token = _current_priority.set(priority)
+    thread_token = _current_thread_id.set(thread_id)
+    try:
+        yield
+    finally:
+        _current_thread_id.reset(thread_token)
+        _current_priority.reset(priority_token)
+
+
+class _Waiter:
+    """A queued LLM call waiting for a slot (async or blocking caller)"""
+
+    def __init__(self, priority: Priority, thread_id: str, tokens: int,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.priority = priority
+        self.thread_id = thread_id
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self._loop = loop
+        self._future = loop.create_future() if loop else None
+        self._event = None if loop else threading.Event()
+
+    def grant(self):
+        self.granted = True
+        if self._future is not None:
+            self._loop.call_soon_threadsafe(self._resolve)
+        else:
+            self._event.set()
+
+    def _resolve(self):
+        if not self._future.done():
+            self._future.set_result(None)
+
+    async def wait_async(self, timeout: Optional[float]):
+        try:
+            await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def wait_blocking(self, timeout: Optional[float]):
+        self._event.wait(timeout)
+
+
+class ProviderLimiter:
+    """
+    Concurrency slots plus a tokens-per-minute bucket for one provider
+    """
+
+    def __init__(self, provider: str, max_concurrency: int, tokens_per_minute: int = 0):
+        self.provider = provider
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self.in_flight = 0
+
+        self._lock = threading.Lock()
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        # Fair sharing: each thread gets a "round" number per queued call,
+        # so threads with fewer outstanding calls are served first.
+        self._thread_rounds: Dict[str, int] = {}
+        self._current_round = 0
+
+        self._tokens = float(self.tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        self._granted_total = 0
+        self._rate_limited_total = 0
+        self._wait_seconds_total = 0.0
+        self._max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, waiter in self._heap if not waiter.cancelled)
+
+    def _refill(self, now: float):
+        if self.tokens_per_minute:
+            elapsed = now - self._last_refill
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+        self._last_refill = now
+
+    def _enqueue_locked(self, waiter: _Waiter):
+        thread_round = max(self._thread_rounds.get(waiter.thread_id, 0), self._current_round)
+        self._thread_rounds[waiter.thread_id] = thread_round + 1
+        heapq.heappush(self._heap, ((waiter.priority, thread_round, next(self._seq)), waiter))
+        self._max_queue_depth = max(self._max_queue_depth, len(self._heap))
+
+    def _dispatch_locked(self) -> Optional[float]:
+        """
+        Grant queued calls while resources allow.
+
+        Returns:
+            Seconds until the head of the queue could be granted if it is
+            blocked on the token budget or a rate-limit pause, else None
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        while self._heap and self.in_flight < self.max_concurrency:
+            key, waiter = self._heap[0]
+            if waiter.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.tokens_per_minute:
+                # A single call larger than the whole budget still runs once the bucket is full
+                needed = min(waiter.tokens, self.tokens_per_minute)
+                if self._tokens < needed:
+                    return (needed - self._tokens) * 60.0 / self.tokens_per_minute
+
+            heapq.heappop(self._heap)
+            self._tokens -= waiter.tokens
+            self.in_flight += 1
+            self._current_round = key[1]
+            self._granted_total += 1
+            self._wait_seconds_total += now - waiter.enqueued_at
+            waiter.grant()
+
+        # Forget threads that no longer have queued calls ahead of the current round
+        for thread_id in [t for t, r in self._thread_rounds.items() if r <= self._current_round]:
+            del self._thread_rounds[thread_id]
+        return None
+
+    async def acquire(self, tokens: int, priority: Priority, thread_id: str) -> _Waiter:
+        waiter = _Waiter(priority, thread_id, tokens, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._enqueue_locked(waiter)
+            delay = self._dispatch_locked()
+        try:
+            while not waiter.granted:
+                await waiter.wait_async(delay)
+                with self._lock:
+                    delay = self._dispatch_locked()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return waiter
+
+    def acquire_blocking(self, tokens: int, priority: Priority, thread_id: str) -> _Waiter:
+        waiter = _Waiter(priority, thread_id, tokens)
+        with self._lock:
+            self._enqueue_locked(waiter)
+            delay = self._dispatch_locked()
+        try:
+            while not waiter.granted:
+                waiter.wait_blocking(delay)
+                with self._lock:
+                    delay = self._dispatch_locked()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return waiter
+
+    def _abandon(self, waiter: _Waiter):
+        with self._lock:
+            granted = waiter.granted
+            waiter.cancelled = True
+        if granted:
+            self.release(waiter)
+
+    def release(self, waiter: _Waiter, tokens_used: Optional[int] = None):
+        """
+        Return a slot, correcting the token budget with actual usage if known
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if self.tokens_per_minute and tokens_used is not None:
+                self._tokens = min(
+                    float(self.tokens_per_minute),
+                    self._tokens + waiter.tokens - tokens_used
+                )
+            self._dispatch_locked()
+
+    def pause(self, seconds: float):
+        """Stop granting calls for a while (provider returned 429)"""
+        with self._lock:
+            self._rate_limited_total += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            depth_by_priority = {p.name.lower(): 0 for p in Priority}
+            for (priority, _, _), waiter in self._heap:
+                if not waiter.cancelled:
+                    depth_by_priority[Priority(priority).name.lower()] += 1
+            return {
+                "max_concurrency": self.max_concurrency,
+                "tokens_per_minute": self.tokens_per_minute,
+                "in_flight": self.in_flight,
+                "queue_depth": sum(depth_by_priority.values()),
+                "queue_depth_by_priority": depth_by_priority,
+                "max_queue_depth": self._max_queue_depth,
+                "tokens_available": int(self._tokens) if self.tokens_per_minute else None,
+                "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "granted_total": self._granted_total,
+                "rate_limited_total": self._rate_limited_total,
+                "avg_wait_ms": round(1000 * self._wait_seconds_total / self._granted_total, 2)
+                if self._granted_total else 0.0,
+            }
+
+
+class LLMScheduler:
+    """
+    Registry of per-provider limiters configured from settings
+    """
+
+    def __init__(self):
+        self._limiters: Dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, provider: str) -> ProviderLimiter:
+        with self._lock:
+            if provider not in self._limiters:
+                limits = settings.LLM_PROVIDER_LIMITS.get(provider, {})
+                self._limiters[provider] = ProviderLimiter(
+                    provider,
+                    max_concurrency=limits.get("max_concurrency", settings.LLM_MAX_CONCURRENCY),
+                    tokens_per_minute=limits.get("tokens_per_minute", settings.LLM_TOKENS_PER_MINUTE),
+                )
+                logger.info(f"LLM limiter for '{provider}': {self._limiters[provider].max_concurrency} slots, "
+                            f"{self._limiters[provider].tokens_per_minute or 'unlimited'} tokens/min")
+            return self._limiters[provider]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {provider: limiter.get_stats() for provider, limiter in limiters.items()}
+
+
+# Global scheduler instance shared by all LLM clients in the process
+llm_scheduler = LLMScheduler()
+
+
+def _estimate_tokens(messages: List[BaseMessage], **kwargs: Any) -> int:
+    """Rough prompt + completion token estimate (~4 characters per token)"""
+    chars = 0
+    for message in messages:
+        content = message.content
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content, default=str))
+    if kwargs.get("tools"):
+        chars += len(json.dumps(kwargs["tools"], default=str))
+    return chars // 4 + settings.LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+def _tokens_from_result(result: ChatResult) -> Optional[int]:
+    total = 0
+    found = False
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens", 0)
+            found = True
+    if not found and result.llm_output:
+        token_usage = result.llm_output.get("token_usage") or {}
+        if "total_tokens" in token_usage:
+            return token_usage["total_tokens"]
+    return total if found else None
+
+
+def _rate_limit_retry_after(exc: Exception) -> Optional[float]:
+    """Return a backoff in seconds if the exception is a provider 429, else None"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    name = type(exc).__name__
+    if status != 429 and "RateLimit" not in name and "ResourceExhausted" not in name:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return settings.LLM_RATE_LIMIT_BACKOFF_SECONDS
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Chat model wrapper that runs every call through the provider's limiter.
+
+    Tool binding and structured output are delegated to the wrapped model so
+    provider-specific tool formats are preserved. Identical concurrent async
+    requests are coalesced into one provider call (LLM_SINGLE_FLIGHT).
+    """
+
+    inner: BaseChatModel
+    provider: str
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"provider": self.provider, **self.inner._identifying_params}
+
+    def bind_tools(self, tools, **kwargs: Any):
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _call_info(self, messages: List[BaseMessage], run_manager, **kwargs: Any):
+        thread_id = _current_thread_id.get()
+        if thread_id is None and run_manager is not None:
+            thread_id = (run_manager.metadata or {}).get("thread_id")
+        return _estimate_tokens(messages, **kwargs), _current_priority.get(), str(thread_id or "default")
+
+    def _on_error(self, exc: Exception):
+        retry_after = _rate_limit_retry_after(exc)
+        if retry_after is not None:
+            logger.warning(f"Provider '{self.provider}' rate limited, pausing for {retry_after}s")
+            llm_scheduler.get_limiter(self.provider).pause(retry_after)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        limiter = llm_scheduler.get_limiter(self.provider)
+        ticket = limiter.acquire_blocking(*self._call_info(messages, run_manager, **kwargs))
+        tokens_used = None
+        try:
+            result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            tokens_used = _tokens_from_result(result)
+            return result
+        except Exception as e:
+            self._on_error(e)
+            raise
+        finally:
+            limiter.release(ticket, tokens_used)
+
+    def _flight_key(self, mode: str, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> str:
+        normalized = [m.model_dump(exclude={"id", "response_metadata", "usage_metadata"}) for m in messages]
+        return make_key(mode, self.provider, self.inner._identifying_params, normalized, stop, kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        call_info = self._call_info(messages, run_manager, **kwargs)
+        if not settings.LLM_SINGLE_FLIGHT:
+            return await self._agenerate_scheduled(messages, stop, run_manager, call_info, **kwargs)
+
+        key = self._flight_key("generate", messages, stop, **kwargs)
+        result = await llm_flights.do(
+            key, lambda: self._agenerate_scheduled(messages, stop, None, call_info, **kwargs)
+        )
+        # Each caller gets its own copy; LangChain assigns run ids to the messages
+        return copy.deepcopy(result)
+
+    async def _agenerate_scheduled(self, messages, stop, run_manager, call_info, **kwargs: Any) -> ChatResult:
+        limiter = llm_scheduler.get_limiter(self.provider)
+        ticket = await limiter.acquire(*call_info)
+        tokens_used = None
+        try:
+            result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            tokens_used = _tokens_from_result(result)
+            return result
+        except Exception as e:
+            self._on_error(e)
+            raise
+        finally:
+            limiter.release(ticket, tokens_used)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        limiter = llm_scheduler.get_limiter(self.provider)
+        ticket = limiter.acquire_blocking(*self._call_info(messages, run_manager, **kwargs))
+        tokens_used = None
+        try:
+            for chunk in self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                usage = getattr(chunk.message, "usage_metadata", None)
+                if usage:
+                    tokens_used = (tokens_used or 0) + usage.get("total_tokens", 0)
+                yield chunk
+        except Exception as e:
+            self._on_error(e)
+            raise
+        finally:
+            limiter.release(ticket, tokens_used)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        call_info = self._call_info(messages, run_manager, **kwargs)
+        if not settings.LLM_SINGLE_FLIGHT:
+            async for chunk in self._astream_scheduled(messages, stop, run_manager, call_info, **kwargs):
+                yield chunk
+            return
+
+        # Streamed tokens are fanned out to every identical subscriber
+        key = self._flight_key("stream", messages, stop, **kwargs)
+        async for chunk in llm_flights.stream(
+            key, lambda: self._astream_scheduled(messages, stop, None, call_info, **kwargs)
+        ):
+            yield copy.deepcopy(chunk)
+
+    async def _astream_scheduled(self, messages, stop, run_manager, call_info,
+                                 **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        limiter = llm_scheduler.get_limiter(self.provider)
+        ticket = await limiter.acquire(*call_info)
+        tokens_used = None
+        try:
+            async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                usage = getattr(chunk.message, "usage_metadata", None)
+                if usage:
+                    tokens_used = (tokens_used or 0) + usage.get("total_tokens", 0)
+                yield chunk
+        except Exception as e:
+            self._on_error(e)
+            raise
+        finally:
+            limiter.release(ticket, tokens_used)
@@ -1,35 +1,295 @@
 """
 Long-Term Memory Store
 Provides persistent memory across conversations using LangGraph store
+
+The store is a vector-indexed SqliteStore (sqlite-vec) at MEMORY_STORE_PATH,
+partitioned into one namespace per user, so a semantic search only scores
+that user's memories. Python builds that cannot load SQLite extensions
+fall back to the vector-indexed InMemoryStore (not persistent).
+
+SemanticMemory indexes conversation context written by memory_tools in the
+background. Entries the memory database expires, evicts or compacts are
+removed from the index too, and compaction summaries are indexed in their
+place (memory_tools connects the two), so each user's namespace mirrors
+their context entries and shares its MEMORY_MAX_CONTEXT_PER_USER quota.
+As a backstop, the least recently updated items beyond it are evicted.
+
+The store is created on first use, and the embedding model is loaded on
+the first embed call, so importing this module stays cheap. Call
+warm_memory_store() to load the model ahead of time in the background.
 """
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langgraph.store.base import BaseStore, PutOp, SearchItem
 from langgraph.store.memory import InMemoryStore
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from typing import List
+from langgraph.store.sqlite import SqliteStore
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMS = 384  # all-MiniLM-L6-v2 produces 384-dimensional embeddings
+MEMORY_NAMESPACE = "memories"
 
 
 def create_embedding_function():
     """Create embedding function for memory store"""
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
-    
+
     def embed(texts: List[str]) -> List[List[float]]:
-        """Embed texts using HuggingFace embeddings"""
-        return embeddings.embed_documents(texts)
-    
+        """Embed texts using the shared HuggingFace embeddings"""
+        # Imported here so the model (and LLM clients) load only when memory search is used
+        from app.core.llm import get_embeddings
+        return get_embeddings().embed_documents(texts)
+
     return embed
 
 
-# Global memory store instance
-# In production, replace with a database-backed store (PostgreSQL, Redis, etc.)
-memory_store = InMemoryStore(
-    index={
-        "embed": create_embedding_function(),
-        "dims": 384  # all-MiniLM-L6-v2 produces 384-dimensional embeddings
+def create_memory_store(path: Optional[str] = None, embed: Optional[Callable] = None) -> BaseStore:
+    """
+    Open (and migrate) a vector-indexed SQLite store
+
+    Args:
+        path: SQLite file (defaults to MEMORY_STORE_PATH; ":memory:" for tests)
+        embed: Embedding function or Embeddings (defaults to the shared model)
+    """
+    index = {
+        "embed": embed or create_embedding_function(),
+        "dims": EMBEDDING_DIMS,
+        "fields": ["text"],
     }
-)
+    if not hasattr(sqlite3.Connection, "enable_load_extension"):
+        # sqlite-vec is a loadable extension; some Python builds disable loading them
+        logger.warning("SQLite extension loading is unavailable; semantic memory is kept in memory only")
+        return InMemoryStore(index=index)
+
+    path = path or settings.MEMORY_STORE_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    store = SqliteStore(conn, index=index)
+    store.setup()
+    return store
+
+
+# Global memory store instance, created by get_memory_store()
+_memory_store: Optional[BaseStore] = None
+_memory_store_lock = threading.Lock()
+
+
+def get_memory_store() -> BaseStore:
+    """Get the global memory store instance, creating it on first use"""
+    global _memory_store
+    if _memory_store is None:
+        with _memory_store_lock:
+            if _memory_store is None:
+                _memory_store = create_memory_store()
+    return _memory_store
+
+
+def memory_namespace(user_id: str) -> Tuple[str, ...]:
+    """Namespace holding one user's conversation memories"""
+    # Namespace labels may not contain periods (e.g. in email addresses)
+    return (MEMORY_NAMESPACE, user_id.replace("%", "%25").replace(".", "%2E"), "context")
+
+
+class SemanticMemory:
+    """
+    Background-indexed, per-user semantic memory of conversation context
+    """
+
+    def __init__(
+        self,
+        store_factory: Callable[[], BaseStore] = get_memory_store,
+        max_items_per_user: Optional[int] = None,
+        batch_size: int = 32,
+    ):
+        """
+        Args:
+            store_factory: Returns the vector-indexed store
+            max_items_per_user: Items kept per user namespace, 0 = unlimited
+                (defaults to MEMORY_MAX_CONTEXT_PER_USER)
+            batch_size: Max queued memories embedded in one call
+        """
+        self._store_factory = store_factory
+        self.max_items_per_user = (
+            settings.MEMORY_MAX_CONTEXT_PER_USER if max_items_per_user is None else max_items_per_user
+        )
+        self.batch_size = batch_size
+        # (user_id, conversation_id, key, value); value None removes the entry
+        self._queue: "queue.Queue[Tuple[str, str, str, Optional[str]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.indexed = 0
+        self.forgotten = 0
+        self.evicted = 0
+        self.failures = 0
+
+    def _submit(self, entry: Tuple[str, str, str, Optional[str]]):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._index_loop, name="memory-indexer", daemon=True)
+                    self._worker.start()
+        self._queue.put(entry)
+
+    def remember(self, user_id: str, conversation_id: str, key: str, value: str):
+        """Queue a context entry for embedding; returns without waiting for the model"""
+        self._submit((user_id, conversation_id, key, value))
+
+    def forget(self, entries: Iterable[Tuple[str, str, str]]):
+        """
+        Queue removal of context entries that no longer exist
+
+        Removals share the indexing queue, so an entry remembered earlier
+        is never indexed after it was forgotten.
+
+        Args:
+            entries: (user_id, conversation_id, key) triples
+        """
+        for user_id, conversation_id, key in entries:
+            self._submit((user_id, conversation_id, key, None))
+
+    def _index_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._index(batch)
+            except Exception as e:
+                self.failures += len(batch)
+                logger.warning(f"Indexing {len(batch)} memories failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _index(self, batch: List[Tuple[str, str, str, Optional[str]]]):
+        store = self._store_factory()
+        # Later writes (and removals) of the same entry replace earlier ones in the batch
+        latest: Dict[Tuple[str, str, str], Optional[str]] = {}
+        for user_id, conversation_id, key, value in batch:
+            latest[(user_id, conversation_id, key)] = value
+        removals = [
+            PutOp(memory_namespace(user_id), f"{conversation_id}:{key}", None)
+            for (user_id, conversation_id, key), value in latest.items()
+            if value is None
+        ]
+        if removals:
+            store.batch(removals)
+            self.forgotten += len(removals)
+        # One batch call embeds every entry with a single model call. InMemoryStore
+        # cannot embed the same text twice in one batch, so repeats go in a later round
+        rounds: List[Dict[str, PutOp]] = []
+        written = set()
+        for (user_id, conversation_id, key), value in latest.items():
+            if value is None:
+                continue
+            written.add(user_id)
+            text = f"{key}: {value}"
+            op = PutOp(
+                memory_namespace(user_id),
+                f"{conversation_id}:{key}",
+                # indexed_at orders eviction; the store's updated_at has one-second resolution
+                {"text": text, "conversation_id": conversation_id, "key": key, "value": value, "indexed_at": time.time()},
+            )
+            target = next((ops for ops in rounds if text not in ops), None)
+            if target is None:
+                target = {}
+                rounds.append(target)
+            target[text] = op
+        for ops in rounds:
+            store.batch(list(ops.values()))
+        self.indexed += len(latest) - len(removals)
+        for user_id in written:
+            self._evict(store, user_id)
+
+    def _evict(self, store: BaseStore, user_id: str):
+        if self.max_items_per_user <= 0:
+            return
+        namespace = memory_namespace(user_id)
+        # Stores list a namespace in no particular recency order, so page through all
+        # of it; each batch evicts back to the cap, so that is usually cap + batch_size
+        page = self.max_items_per_user + self.batch_size + 1
+        items: List[SearchItem] = []
+        while True:
+            found = store.search(namespace, limit=page, offset=len(items))
+            items.extend(found)
+            if len(found) < page:
+                break
+        if len(items) <= self.max_items_per_user:
+            return
+        items.sort(key=lambda item: (item.updated_at, item.value.get("indexed_at", 0.0)), reverse=True)
+        stale = items[self.max_items_per_user:]
+        store.batch([PutOp(namespace, item.key, None) for item in stale])
+        self.evicted += len(stale)
+
+    def recall(self, user_id: str, query: str, limit: int = 5) -> List[SearchItem]:
+        """
+        Top-k semantic search over one user's memories
+
+        Returns:
+            Items with value {"text", "conversation_id", "key", "value"} and a
+            similarity score, best first
+        """
+        return self._store_factory().search(memory_namespace(user_id), query=query, limit=limit)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued memory has been indexed
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.unfinished_tasks,
+            "indexed": self.indexed,
+            "forgotten": self.forgotten,
+            "evicted": self.evicted,
+            "failures": self.failures,
+            "max_items_per_user": self.max_items_per_user,
+        }
+
+
+# Global semantic memory used by memory_tools
+semantic_memory = SemanticMemory()
+
+
+def warm_memory_store(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Create the store and load its embedding model ahead of the first search
+
+    Args:
+        background: Load in a daemon thread instead of blocking the caller
 
+    Returns:
+        The warm-up thread when background is True, otherwise None
+    """
+    def warm():
+        try:
+            from app.core.llm import get_embeddings
+            get_memory_store()
+            get_embeddings()
+            logger.info("Memory store warmed")
+        except Exception as e:
+            logger.warning(f"Memory store warm-up failed: {e}")
 
-def get_memory_store():
-    """Get the global memory store instance"""
-    return memory_store
+    if not background:
+        warm()
+        return None
+    thread = threading.Thread(target=warm, name="memory-store-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,683 @@
+"""
+Memory Database
+SQLite storage for user preferences and conversation context (memory_tools).
+
+Preferences are keyed by (user_id, key) and context entries by
+(user_id, conversation_id, key); both lookups are primary-key/index seeks.
+Context values are mirrored into an FTS5 table so history search is a
+full-text query instead of a scan over every conversation.
+
+Writes go to an in-process write-behind buffer that a background thread
+flushes in one transaction every MEMORY_WRITE_BUFFER_SECONDS (or when it
+holds MEMORY_WRITE_BUFFER_MAX entries). Reads in the same process see
+buffered writes immediately; other processes sharing the file (e.g. the
+A2A server) see them after the next flush.
+
+Storage is bounded per user: entries expire after a per-key TTL, users
+over their quota lose their least recently used entries, and a periodic
+compaction pass merges conversations idle for MEMORY_COMPACT_AFTER_SECONDS
+into a single summary entry. Other indexes of the context (the semantic
+memory) can follow along through on_context_removed, told which entries
+were expired, evicted or compacted away, and on_context_summarized, given
+each new summary.
+"""
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_preferences (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (user_id, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS conversation_context (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    accessed_at REAL NOT NULL DEFAULT 0,
+    expires_at REAL,
+    UNIQUE (user_id, conversation_id, key)
+);
+
+-- Contentless index; "owner" is the user id as a single hex token ('u' || hex(user_id)),
+-- so restricting a search to one user is a seek on a short doclist
+CREATE VIRTUAL TABLE IF NOT EXISTS conversation_fts USING fts5(
+    owner, key, value, content='', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS conversation_context_ai AFTER INSERT ON conversation_context BEGIN
+    INSERT INTO conversation_fts (rowid, owner, key, value)
+    VALUES (new.id, 'u' || hex(new.user_id), new.key, new.value);
+END;
+CREATE TRIGGER IF NOT EXISTS conversation_context_ad AFTER DELETE ON conversation_context BEGIN
+    INSERT INTO conversation_fts (conversation_fts, rowid, owner, key, value)
+    VALUES ('delete', old.id, 'u' || hex(old.user_id), old.key, old.value);
+END;
+"""
+
+# Access-time updates leave the full-text index alone
+UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS conversation_context_au AFTER UPDATE OF key, value ON conversation_context BEGIN
+    INSERT INTO conversation_fts (conversation_fts, rowid, owner, key, value)
+    VALUES ('delete', old.id, 'u' || hex(old.user_id), old.key, old.value);
+    INSERT INTO conversation_fts (rowid, owner, key, value)
+    VALUES (new.id, 'u' || hex(new.user_id), new.key, new.value);
+END;
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS conversation_context_lru ON conversation_context (user_id, accessed_at);
+CREATE INDEX IF NOT EXISTS conversation_context_expiry ON conversation_context (expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS user_preferences_expiry ON user_preferences (expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+# Databases created before TTLs and LRU eviction lack these columns
+MIGRATION = [
+    "DROP TRIGGER IF EXISTS conversation_context_au",
+    "ALTER TABLE user_preferences ADD COLUMN expires_at REAL",
+    "ALTER TABLE conversation_context ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0",
+    "ALTER TABLE conversation_context ADD COLUMN expires_at REAL",
+    "UPDATE conversation_context SET accessed_at = updated_at",
+]
+
+SUMMARY_KEY = "summary"
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_Entry = Tuple[str, float, Optional[float]]
+# (user_id, conversation_id, key) of a context entry
+_ContextKey = Tuple[str, str, str]
+
+
+def owner_token(user_id: str) -> str:
+    """Single FTS token for a user id, matching the triggers' 'u' || hex(user_id)"""
+    return "u" + user_id.encode("utf-8").hex().upper()
+
+
+def fts_query(text: str, user_id: Optional[str] = None) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression requiring every word of the text
+
+    Words are quoted so FTS operators in user input are taken literally;
+    the porter tokenizer matches word forms ("tickets" finds "ticket").
+    """
+    words = TERM_PATTERN.findall(text.lower())
+    if not words:
+        return None
+    expression = " AND ".join(f'"{w}"' for w in words)
+    if user_id is not None:
+        expression = f'owner : "{owner_token(user_id)}" AND {{key value}} : ({expression})'
+    return expression
+
+
+def merge_context(entries: List[Tuple[str, str]], max_chars: int) -> str:
+    """
+    Default compaction summary: the entries as "key: value" lines, oldest first
+
+    An earlier summary keeps its text unprefixed. When the result is longer
+    than max_chars, the oldest text is cut.
+    """
+    text = "\n".join(value if key == SUMMARY_KEY else f"{key}: {value}" for key, value in entries)
+    if len(text) > max_chars:
+        text = "..." + text[len(text) - max_chars + 3:]
+    return text
+
+
+class MemoryDatabase:
+    """
+    Preferences and conversation context in SQLite behind a write-behind buffer
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        flush_max: Optional[int] = None,
+        max_context_per_user: Optional[int] = None,
+        max_preferences_per_user: Optional[int] = None,
+        compact_interval: Optional[float] = None,
+        compact_after: Optional[float] = None,
+        summarize: Optional[Callable[[List[Tuple[str, str]]], str]] = None,
+        on_context_removed: Optional[Callable[[List[_ContextKey]], None]] = None,
+        on_context_summarized: Optional[Callable[[str, str, str, str], None]] = None,
+    ):
+        """
+        Args:
+            path: SQLite file (defaults to MEMORY_DB_PATH; ":memory:" for tests)
+            flush_interval: Seconds between background flushes
+            flush_max: Buffered writes that trigger an immediate flush
+            max_context_per_user: Context entries kept per user (0 = unlimited)
+            max_preferences_per_user: Preferences kept per user (0 = unlimited)
+            compact_interval: Seconds between background compactions (0 = off)
+            compact_after: Idle seconds before a conversation is summarized
+            summarize: Turns a conversation's (key, value) entries, oldest
+                first, into one summary (defaults to merge_context)
+            on_context_removed: Called with the (user_id, conversation_id, key)
+                of context entries deleted by expiry, eviction or compaction
+            on_context_summarized: Called with (user_id, conversation_id,
+                SUMMARY_KEY, summary) for each compacted conversation
+        """
+        self.path = path or settings.MEMORY_DB_PATH
+        self.flush_interval = settings.MEMORY_WRITE_BUFFER_SECONDS if flush_interval is None else flush_interval
+        self.flush_max = flush_max or settings.MEMORY_WRITE_BUFFER_MAX
+        self.max_context_per_user = (
+            settings.MEMORY_MAX_CONTEXT_PER_USER if max_context_per_user is None else max_context_per_user
+        )
+        self.max_preferences_per_user = (
+            settings.MEMORY_MAX_PREFERENCES_PER_USER if max_preferences_per_user is None else max_preferences_per_user
+        )
+        self.compact_interval = settings.MEMORY_COMPACT_INTERVAL_SECONDS if compact_interval is None else compact_interval
+        self.compact_after = settings.MEMORY_COMPACT_AFTER_SECONDS if compact_after is None else compact_after
+        self.summarize = summarize or (lambda entries: merge_context(entries, settings.MEMORY_SUMMARY_MAX_CHARS))
+        self.on_context_removed = on_context_removed
+        self.on_context_summarized = on_context_summarized
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # Serializes use of the connection
+        self._buffer_lock = threading.Lock()
+        # Buffered entries are key -> (value, updated_at, expires_at)
+        self._pending_preferences: Dict[str, Dict[str, _Entry]] = {}
+        self._pending_context: Dict[Tuple[str, str], Dict[str, _Entry]] = {}
+        self._pending_count = 0
+        # Entries being written by flush(); still served to readers until committed
+        self._flushing_preferences: Dict[str, Dict[str, _Entry]] = {}
+        self._flushing_context: Dict[Tuple[str, str], Dict[str, _Entry]] = {}
+        # Last read of each conversation, written with the next flush (for LRU eviction)
+        self._accessed: Dict[Tuple[str, str], float] = {}
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._next_compaction = time.monotonic() + self.compact_interval
+        self._closed = False
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.compactions = 0
+        self.conversations_compacted = 0
+        self.last_compaction: Optional[Dict[str, Any]] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._db_lock:
+                if self._conn is None:
+                    if self.path != ":memory:":
+                        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    conn.executescript(UPDATE_TRIGGER + INDEXES)
+                    conn.commit()
+                    self._conn = conn
+                    atexit.register(self.close)
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(conversation_context)")}
+        if "accessed_at" in columns:
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the lock
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(conversation_context)")}
+            if "accessed_at" not in columns:
+                for statement in MIGRATION:
+                    conn.execute(statement)
+                logger.info("Migrated memory database for TTLs and LRU eviction")
+
+    # Writes
+
+    @staticmethod
+    def _expires_at(key: str, now: float, ttl: Optional[float], default_ttl: float) -> Optional[float]:
+        if ttl is None:
+            ttl = settings.MEMORY_KEY_TTL_SECONDS.get(key, default_ttl)
+        return now + ttl if ttl and ttl > 0 else None
+
+    def set_preference(self, user_id: str, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Args:
+            ttl: Seconds until the preference expires (defaults to
+                MEMORY_KEY_TTL_SECONDS for the key, else never)
+        """
+        now = time.time()
+        expires_at = self._expires_at(key, now, ttl, 0)
+        with self._buffer_lock:
+            self._pending_preferences.setdefault(user_id, {})[key] = (value, now, expires_at)
+            self._pending_count += 1
+            full = self._pending_count >= self.flush_max
+        self._after_write(full)
+
+    def set_context(self, user_id: str, conversation_id: str, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Args:
+            ttl: Seconds until the entry expires (defaults to
+                MEMORY_KEY_TTL_SECONDS for the key, else MEMORY_CONTEXT_TTL_SECONDS)
+        """
+        now = time.time()
+        expires_at = self._expires_at(key, now, ttl, settings.MEMORY_CONTEXT_TTL_SECONDS)
+        with self._buffer_lock:
+            self._pending_context.setdefault((user_id, conversation_id), {})[key] = (value, now, expires_at)
+            self._pending_count += 1
+            full = self._pending_count >= self.flush_max
+        self._after_write(full)
+
+    def _after_write(self, full: bool):
+        if full or self.flush_interval <= 0:
+            self.flush()
+            return
+        if self._flusher is None:
+            with self._buffer_lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="memory-db-flush", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Memory write-behind flush failed, will retry: {e}")
+            if self.compact_interval > 0 and time.monotonic() >= self._next_compaction:
+                self._next_compaction = time.monotonic() + self.compact_interval
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.warning(f"Memory compaction failed: {e}")
+
+    def flush(self) -> int:
+        """
+        Write buffered entries to SQLite in one transaction
+
+        Returns:
+            Number of rows written
+        """
+        conn = self._connection()
+        with self._flush_lock:
+            with self._buffer_lock:
+                preferences, self._pending_preferences = self._pending_preferences, {}
+                context, self._pending_context = self._pending_context, {}
+                self._flushing_preferences, self._flushing_context = preferences, context
+                self._pending_count = 0
+                accessed, self._accessed = self._accessed, {}
+            evicted: List[_ContextKey] = []
+            preference_rows = [
+                (user_id, key, value, updated_at, expires_at)
+                for user_id, entries in preferences.items()
+                for key, (value, updated_at, expires_at) in entries.items()
+            ]
+            context_rows = [
+                (user_id, conversation_id, key, value, updated_at, updated_at, expires_at)
+                for (user_id, conversation_id), entries in context.items()
+                for key, (value, updated_at, expires_at) in entries.items()
+            ]
+            try:
+                if preference_rows or context_rows or accessed:
+                    with self._db_lock, conn:
+                        conn.executemany(
+                            "INSERT INTO user_preferences (user_id, key, value, updated_at, expires_at) "
+                            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (user_id, key) DO UPDATE SET value = excluded.value, "
+                            "updated_at = excluded.updated_at, expires_at = excluded.expires_at",
+                            preference_rows,
+                        )
+                        conn.executemany(
+                            "INSERT INTO conversation_context "
+                            "(user_id, conversation_id, key, value, updated_at, accessed_at, expires_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, conversation_id, key) "
+                            "DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at, "
+                            "accessed_at = excluded.accessed_at, expires_at = excluded.expires_at",
+                            context_rows,
+                        )
+                        conn.executemany(
+                            "UPDATE conversation_context SET accessed_at = ? "
+                            "WHERE user_id = ? AND conversation_id = ? AND accessed_at < ?",
+                            [(at, user_id, conversation_id, at) for (user_id, conversation_id), at in accessed.items()],
+                        )
+                        # Only users who just wrote can have gone over quota
+                        for user_id in preferences:
+                            self._enforce_quota(conn, user_id, preferences=True)
+                        for user_id in {user_id for user_id, _ in context}:
+                            evicted += self._enforce_quota(conn, user_id, preferences=False)
+            except sqlite3.Error:
+                # Put the entries back (newer buffered writes win) so nothing is lost
+                with self._buffer_lock:
+                    for user_id, entries in preferences.items():
+                        self._pending_preferences[user_id] = {**entries, **self._pending_preferences.get(user_id, {})}
+                    for key, entries in context.items():
+                        self._pending_context[key] = {**entries, **self._pending_context.get(key, {})}
+                    self._pending_count += len(preference_rows) + len(context_rows)
+                raise
+            finally:
+                with self._buffer_lock:
+                    self._flushing_preferences, self._flushing_context = {}, {}
+
+        self._notify(evicted, [])
+        if preference_rows or context_rows:
+            self.flushes += 1
+            self.rows_flushed += len(preference_rows) + len(context_rows)
+        return len(preference_rows) + len(context_rows)
+
+    # Bounds
+
+    def _enforce_quota(self, conn: sqlite3.Connection, user_id: str, preferences: bool) -> List[Tuple[str, ...]]:
+        """
+        Delete a user's least recently used entries beyond their quota (caller holds the DB lock)
+
+        Returns:
+            Keys of the deleted entries: (user_id, key) for preferences,
+            (user_id, conversation_id, key) for context
+        """
+        if preferences:
+            table, quota = "user_preferences", self.max_preferences_per_user
+            # Preferences are read all at once, so recency of update stands in for recency of use
+            delete = (
+                "DELETE FROM user_preferences WHERE (user_id, key) IN "
+                "(SELECT user_id, key FROM user_preferences WHERE user_id = ? ORDER BY updated_at LIMIT ?) "
+                "RETURNING user_id, key"
+            )
+        else:
+            table, quota = "conversation_context", self.max_context_per_user
+            delete = (
+                "DELETE FROM conversation_context WHERE id IN "
+                "(SELECT id FROM conversation_context WHERE user_id = ? ORDER BY accessed_at, updated_at LIMIT ?) "
+                "RETURNING user_id, conversation_id, key"
+            )
+        if quota <= 0:
+            return []
+        count = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = ?", (user_id,)).fetchone()[0]
+        if count <= quota:
+            return []
+        deleted = [tuple(row) for row in conn.execute(delete, (user_id, count - quota)).fetchall()]
+        self.evicted += len(deleted)
+        return deleted
+
+    def _notify(self, removed: List[_ContextKey], summaries: List[Tuple[str, str, str]]):
+        """Pass committed removals and summaries on (outside the DB lock)"""
+        try:
+            if removed and self.on_context_removed is not None:
+                self.on_context_removed(removed)
+            if self.on_context_summarized is not None:
+                for user_id, conversation_id, summary in summaries:
+                    self.on_context_summarized(user_id, conversation_id, SUMMARY_KEY, summary)
+        except Exception as e:
+            logger.warning(f"Could not pass memory removals on: {e}")
+
+    def compact(self, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Drop expired entries, summarize idle conversations and re-apply quotas
+
+        A conversation not updated for compact_after seconds and holding
+        more than one entry is replaced by a single SUMMARY_KEY entry built
+        by summarize(). Conversations with buffered writes are left alone.
+
+        Args:
+            batch_size: Max conversations summarized per pass
+
+        Returns:
+            Counts for this pass: expired, summarized, evicted, seconds
+        """
+        started = time.perf_counter()
+        self.flush()
+        conn = self._connection()
+        now = time.time()
+        evicted_before = self.evicted
+        removed: List[_ContextKey] = []
+        summaries: List[Tuple[str, str, str]] = []
+        with self._db_lock, conn:
+            removed += [tuple(row) for row in conn.execute(
+                "DELETE FROM conversation_context WHERE expires_at IS NOT NULL AND expires_at <= ? "
+                "RETURNING user_id, conversation_id, key",
+                (now,),
+            ).fetchall()]
+            expired = len(removed)
+            expired += conn.execute(
+                "DELETE FROM user_preferences WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).rowcount
+
+            stale = conn.execute(
+                "SELECT user_id, conversation_id FROM conversation_context "
+                "GROUP BY user_id, conversation_id HAVING COUNT(*) > 1 AND MAX(updated_at) < ? LIMIT ?",
+                (now - self.compact_after, batch_size),
+            ).fetchall() if self.compact_after > 0 else []
+            with self._buffer_lock:
+                busy = set(self._pending_context) | set(self._flushing_context)
+            summarized = 0
+            for scope in stale:
+                if scope in busy:
+                    continue
+                rows = conn.execute(
+                    "SELECT key, value, updated_at, accessed_at, expires_at FROM conversation_context "
+                    "WHERE user_id = ? AND conversation_id = ? ORDER BY updated_at, key",
+                    scope,
+                ).fetchall()
+                summary = self.summarize([(key, value) for key, value, *_ in rows])
+                expiries = [row[4] for row in rows]
+                conn.execute("DELETE FROM conversation_context WHERE user_id = ? AND conversation_id = ?", scope)
+                conn.execute(
+                    "INSERT INTO conversation_context "
+                    "(user_id, conversation_id, key, value, updated_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *scope, SUMMARY_KEY, summary,
+                        max(row[2] for row in rows),
+                        max(row[3] for row in rows),
+                        None if None in expiries else max(expiries),
+                    ),
+                )
+                removed += [(*scope, key) for key, *_ in rows if key != SUMMARY_KEY]
+                summaries.append((*scope, summary))
+                summarized += 1
+
+            # Quotas may have been lowered since the entries were written
+            for table, quota, preferences in (
+                ("conversation_context", self.max_context_per_user, False),
+                ("user_preferences", self.max_preferences_per_user, True),
+            ):
+                if quota > 0:
+                    over = conn.execute(
+                        f"SELECT user_id FROM {table} GROUP BY user_id HAVING COUNT(*) > ?", (quota,)
+                    ).fetchall()
+                    for (user_id,) in over:
+                        deleted = self._enforce_quota(conn, user_id, preferences)
+                        if not preferences:
+                            removed += deleted
+
+        self._notify(removed, summaries)
+        self.expired += expired
+        self.conversations_compacted += summarized
+        self.compactions += 1
+        self.last_compaction = {
+            "expired": expired,
+            "summarized": summarized,
+            "evicted": self.evicted - evicted_before,
+            "seconds": round(time.perf_counter() - started, 3),
+            "at": now,
+        }
+        if expired or summarized:
+            logger.info(f"Memory compaction: {expired} expired, {summarized} conversations summarized")
+        return self.last_compaction
+
+    # Reads
+
+    @staticmethod
+    def _merge(rows: List[Tuple[str, str, float]], buffered: Dict[str, _Entry]) -> Dict[str, str]:
+        # Newest write wins between the table and the buffer
+        now = time.time()
+        merged = {key: (value, updated_at) for key, value, updated_at in rows}
+        for key, (value, updated_at, expires_at) in buffered.items():
+            if key not in merged or updated_at >= merged[key][1]:
+                if expires_at is not None and expires_at <= now:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = (value, updated_at)
+        return {key: value for key, (value, _) in merged.items()}
+
+    def get_preferences(self, user_id: str) -> Dict[str, str]:
+        conn = self._connection()
+        # Snapshot the buffer first so entries committed meanwhile are read from the table
+        with self._buffer_lock:
+            buffered = {**self._flushing_preferences.get(user_id, {}), **self._pending_preferences.get(user_id, {})}
+        with self._db_lock:
+            rows = conn.execute(
+                "SELECT key, value, updated_at FROM user_preferences "
+                "WHERE user_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (user_id, time.time()),
+            ).fetchall()
+        return self._merge(rows, buffered)
+
+    def get_context(self, user_id: str, conversation_id: str) -> Dict[str, str]:
+        conn = self._connection()
+        scope = (user_id, conversation_id)
+        now = time.time()
+        with self._buffer_lock:
+            buffered = {**self._flushing_context.get(scope, {}), **self._pending_context.get(scope, {})}
+            self._accessed[scope] = now
+        with self._db_lock:
+            rows = conn.execute(
+                "SELECT key, value, updated_at FROM conversation_context "
+                "WHERE user_id = ? AND conversation_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (*scope, now),
+            ).fetchall()
+        return self._merge(rows, buffered)
+
+    def search_context(self, user_id: str, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Full-text search over one user's conversation context
+
+        Args:
+            user_id: Whose conversations to search
+            query: Words that must all appear in a context key or value
+            limit: Max conversations to return
+
+        Returns:
+            [{"conversation_id", "context"}], most recently updated first
+        """
+        expression = fts_query(query, user_id)
+        if expression is None:
+            return []
+        # Buffered writes must be searchable too
+        self.flush()
+        conn = self._connection()
+        with self._db_lock:
+            rows = conn.execute(
+                # MATERIALIZED runs the MATCH once instead of once per joined row
+                "WITH m AS MATERIALIZED (SELECT rowid FROM conversation_fts WHERE conversation_fts MATCH ?) "
+                "SELECT c.conversation_id, MAX(c.updated_at) AS last_updated "
+                "FROM m JOIN conversation_context c ON c.id = m.rowid "
+                "WHERE c.user_id = ? AND (c.expires_at IS NULL OR c.expires_at > ?) "
+                "GROUP BY c.conversation_id ORDER BY last_updated DESC LIMIT ?",
+                (expression, user_id, time.time(), limit),
+            ).fetchall()
+        return [
+            {"conversation_id": conversation_id, "context": self.get_context(user_id, conversation_id)}
+            for conversation_id, _ in rows
+        ]
+
+    # Metrics
+
+    def get_user_usage(self, user_id: str) -> Dict[str, Any]:
+        """Stored entries and bytes for one user (buffered writes not included)"""
+        conn = self._connection()
+        with self._db_lock:
+            conversations, context_entries, context_bytes = conn.execute(
+                "SELECT COUNT(DISTINCT conversation_id), COUNT(*), "
+                "COALESCE(SUM(length(CAST(key AS BLOB)) + length(CAST(value AS BLOB))), 0) "
+                "FROM conversation_context WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            preferences, preference_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(CAST(key AS BLOB)) + length(CAST(value AS BLOB))), 0) "
+                "FROM user_preferences WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        return {
+            "user_id": user_id,
+            "conversations": conversations,
+            "context_entries": context_entries,
+            "preferences": preferences,
+            "bytes": context_bytes + preference_bytes,
+            "max_context_entries": self.max_context_per_user,
+            "max_preferences": self.max_preferences_per_user,
+        }
+
+    def get_usage(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Stored entries and bytes in total, plus the largest users
+
+        Scans both tables; meant for the metrics endpoint, not hot paths.
+        """
+        conn = self._connection()
+        size = "length(CAST(key AS BLOB)) + length(CAST(value AS BLOB))"
+        with self._db_lock:
+            per_user = conn.execute(
+                f"SELECT user_id, SUM(entries), SUM(bytes) FROM ("
+                f"SELECT user_id, COUNT(*) AS entries, SUM({size}) AS bytes FROM conversation_context GROUP BY user_id "
+                f"UNION ALL "
+                f"SELECT user_id, COUNT(*), SUM({size}) FROM user_preferences GROUP BY user_id"
+                f") GROUP BY user_id ORDER BY SUM(bytes) DESC"
+            ).fetchall()
+            context_entries = conn.execute("SELECT COUNT(*) FROM conversation_context").fetchone()[0]
+        return {
+            "users": len(per_user),
+            "entries": sum(entries for _, entries, _ in per_user),
+            "context_entries": context_entries,
+            "bytes": sum(size for _, _, size in per_user),
+            "top_users": [
+                {"user_id": user_id, "entries": entries, "bytes": size}
+                for user_id, entries, size in per_user[:top]
+            ],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._buffer_lock:
+            pending = self._pending_count
+        return {
+            "path": self.path,
+            "pending_writes": pending,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "flush_interval_seconds": self.flush_interval,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "compactions": self.compactions,
+            "conversations_compacted": self.conversations_compacted,
+            "last_compaction": self.last_compaction,
+        }
+
+    def close(self):
+        """Flush outstanding writes and close the connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._conn is not None or self._pending_count:
+            try:
+                self.flush()
+            finally:
+                with self._db_lock:
+                    self._conn.close()
+                    self._conn = None
+
+
+# Global database used by memory_tools
+memory_db = MemoryDatabase()
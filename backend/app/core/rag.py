@@ -1,40 +1,297 @@
+"""
+RAG Knowledge Base
+Builds the FAISS index and serves retrieval from a process-wide cached store.
+
+The embedding model and the loaded index are shared by every query. The
+index directory is watched by file signature, so a rebuilt index is loaded
+on the next query and swapped in atomically; queries arriving during the
+reload keep using the previous index.
+
+Retrieval is hybrid: a BM25 index saved next to the FAISS index catches
+exact identifiers, and its ranking is fused with the vector ranking.
+"""
 import os
-from glob import glob
-from langchain_community.document_loaders import TextLoader, DirectoryLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.core import llm
+from app.core.bm25 import BM25_FILE, BM25Index, is_decisive, reciprocal_rank_fusion
+from app.core.config import settings
+from app.core.embedding_cache import embed_queries
+from app.core.vector_index import load_store, search_index_file
 from app.core.llm import get_embeddings
+from app.core.ingestion import ingest_documents
+
+logger = logging.getLogger(__name__)
 
 VECTOR_STORE_PATH = "faiss_index"
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+
+@dataclass
+class _Snapshot:
+    """Indexes loaded together from one version of the index directory"""
+    signature: Optional[Tuple]
+    store: FAISS
+    bm25: Optional[BM25Index]
+
 
 def build_index():
     """
     Loads docs from data/docs, splits, embeds, and saves FAISS index.
+    Only new or changed chunks are embedded (see app.core.ingestion).
     """
     if not os.path.exists("data/docs"):
         print("No docs found.")
         return
 
-    loader = DirectoryLoader("data/docs", glob="*.txt", loader_cls=TextLoader)
-    docs = loader.load()
-    
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    splits = splitter.split_documents(docs)
-    
-    embeddings = get_embeddings()
-    vectorstore = FAISS.from_documents(splits, embeddings)
-    vectorstore.save_local(VECTOR_STORE_PATH)
-    print(f"Index built with {len(splits)} chunks.")
+    report = ingest_documents(
+        "data/docs",
+        VECTOR_STORE_PATH,
+        get_embeddings(),
+        patterns=("*.txt",),
+    )
+    print(
+        f"Index built with {report['chunks_total']} chunks "
+        f"({report['chunks_embedded']} embedded, {report['chunks_skipped']} skipped, "
+        f"{report['chunks_deleted']} deleted)."
+    )
+
+
+class VectorStoreRegistry:
+    """
+    Holds the loaded FAISS store for one index directory.
+
+    The store is loaded once and reused; every lookup compares the index
+    files' signature (mtime and size) and reloads when they change.
+    """
+
+    def __init__(
+        self,
+        index_path: str = VECTOR_STORE_PATH,
+        embeddings_factory: Callable[[], Embeddings] = get_embeddings,
+        build_missing: Optional[Callable[[], None]] = None,
+        latency_window: int = 500,
+        index_type: Optional[str] = None,
+    ):
+        self.index_path = index_path
+        self.index_type = index_type or settings.RAG_INDEX_TYPE
+        self._embeddings_factory = embeddings_factory
+        self._build_missing = build_missing
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._query_seconds = deque(maxlen=latency_window)
+        self.loads = 0
+        self.queries = 0
+        self.queries_by_mode = {"vector": 0, "hybrid": 0, "bm25_fast_path": 0}
+        self.last_load_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+
+    def _index_signature(self) -> Optional[Tuple]:
+        signature = []
+        optional = (BM25_FILE, search_index_file(self.index_type))
+        for name in INDEX_FILES + optional:
+            try:
+                stat = os.stat(os.path.join(self.index_path, name))
+            except FileNotFoundError:
+                if name in optional:
+                    # The lexical and derived search indexes are optional
+                    continue
+                return None
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def get_vectorstore(self) -> FAISS:
+        """
+        Get the loaded vector store, (re)loading it if the index changed on disk
+        """
+        return self._current().store
+
+    def _current(self) -> _Snapshot:
+        """The loaded FAISS and BM25 indexes, (re)loaded together if the index changed on disk"""
+        signature = self._index_signature()
+        snapshot = self._snapshot
+        if snapshot is not None and signature == snapshot.signature:
+            return snapshot
+
+        # Another thread is already reloading: keep serving the current index
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            signature = self._index_signature()
+            snapshot = self._snapshot
+            if snapshot is not None and signature == snapshot.signature:
+                return snapshot
+
+            if signature is None:
+                if snapshot is not None:
+                    # Index is being rewritten; keep the loaded copy
+                    return snapshot
+                if self._build_missing is None:
+                    raise FileNotFoundError(f"FAISS index not found at {self.index_path}")
+                # Build functionality on demand or warn
+                print("Index not found. Building now...")
+                self._build_missing()
+                signature = self._index_signature()
+
+            started = time.perf_counter()
+            store = load_store(self.index_path, self._embeddings_factory(), index_type=self.index_type)
+            bm25 = BM25Index.load(self.index_path)
+            self.last_load_seconds = time.perf_counter() - started
+            self.loaded_at = time.time()
+            self.loads += 1
+            if snapshot is not None:
+                logger.info(f"FAISS index at {self.index_path} changed on disk, reloaded")
+            # Swap only once the new index is fully loaded; in-flight queries keep the old one.
+            # FAISS and BM25 are swapped as one object, so a query never mixes two versions
+            self._snapshot = _Snapshot(signature, store, bm25)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def warm(self):
+        """Load the embedding model and the index ahead of the first query"""
+        self._embeddings_factory()
+        self.get_vectorstore()
+
+    def search(self, query: str, k: int = 3, mode: Optional[str] = None) -> List[Document]:
+        """
+        Search the current index
+
+        In hybrid mode BM25 and vector results are fused with reciprocal rank
+        fusion; when the BM25 top hit is decisive (see RAG_BM25_DECISIVE_RATIO)
+        the lexical results are returned without embedding the query.
+
+        Args:
+            query: Natural language query
+            k: Number of chunks to return
+            mode: "hybrid", "vector" or "bm25" (defaults to hybrid when
+                RAG_HYBRID is on and a BM25 index exists)
+
+        Returns:
+            The k best matching document chunks
+        """
+        return self.search_batch([(query, k, mode)])[0]
+
+    def search_batch(self, requests: List[Tuple[str, int, Optional[str]]]) -> List[List[Document]]:
+        """
+        Search several queries at once
+
+        Queries that need vectors are embedded in one model call and looked
+        up with one FAISS search; results are the same as calling search()
+        for each (query, k, mode) request.
+        """
+        snapshot = self._current()
+        store, bm25 = snapshot.store, snapshot.bm25
+        started = time.perf_counter()
+
+        modes, lexical, vector_needed = [], [], []
+        for i, (query, k, mode) in enumerate(requests):
+            if mode is None:
+                mode = "hybrid" if settings.RAG_HYBRID and bm25 is not None else "vector"
+            if mode != "vector" and bm25 is None:
+                mode = "vector"
+            hits = []
+            if mode != "vector":
+                hits = bm25.search_with_coverage(query, k=max(k, settings.RAG_HYBRID_CANDIDATES))
+                if mode == "bm25" or is_decisive(hits, settings.RAG_BM25_DECISIVE_RATIO, settings.RAG_BM25_MIN_COVERAGE):
+                    mode = "bm25_fast_path"
+            modes.append(mode)
+            lexical.append(hits)
+            if mode in ("vector", "hybrid"):
+                vector_needed.append(i)
+
+        vector_ids: Dict[int, List[str]] = {}
+        if vector_needed:
+            fetch = max(
+                requests[i][1] if modes[i] == "vector" else max(requests[i][1], settings.RAG_HYBRID_CANDIDATES)
+                for i in vector_needed
+            )
+            vectors = embed_queries(store.embedding_function, [requests[i][0] for i in vector_needed])
+            matrix = np.asarray(vectors, dtype=np.float32)
+            if store._normalize_L2:
+                faiss.normalize_L2(matrix)
+            _, positions = store.index.search(matrix, fetch)
+            for i, row in zip(vector_needed, positions):
+                vector_ids[i] = [store.index_to_docstore_id[p] for p in row if p != -1]
+
+        results = []
+        for i, (query, k, _) in enumerate(requests):
+            mode = modes[i]
+            if mode == "vector":
+                doc_ids = vector_ids[i][:k]
+            elif mode == "bm25_fast_path":
+                doc_ids = [doc_id for doc_id, _, _ in lexical[i][:k]]
+            else:
+                fused = reciprocal_rank_fusion(
+                    [[doc_id for doc_id, _, _ in lexical[i]], vector_ids[i][:max(k, settings.RAG_HYBRID_CANDIDATES)]],
+                    k=settings.RAG_RRF_K,
+                )
+                doc_ids = [doc_id for doc_id, _ in fused[:k]]
+            docs = [self._document(store, doc_id) for doc_id in doc_ids]
+            results.append([doc for doc in docs if doc is not None])
+
+        elapsed = time.perf_counter() - started
+        for mode in modes:
+            self._query_seconds.append(elapsed)
+            self.queries += 1
+            self.queries_by_mode[mode] = self.queries_by_mode.get(mode, 0) + 1
+        return results
+
+    @staticmethod
+    def _document(store: FAISS, doc_id: str) -> Optional[Document]:
+        doc = store.docstore.search(doc_id)
+        if not isinstance(doc, Document):
+            return None
+        return Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = sorted(self._query_seconds)
+
+        def percentile(p):
+            return round(1000 * samples[min(len(samples) - 1, int(p * len(samples)))], 2) if samples else None
+
+        snapshot = self._snapshot
+        store = snapshot.store if snapshot is not None else None
+        bm25 = snapshot.bm25 if snapshot is not None else None
+        return {
+            "index_path": self.index_path,
+            "loaded": store is not None,
+            "vectors": store.index.ntotal if store is not None else 0,
+            "index_type": self.index_type,
+            "index_class": type(store.index).__name__ if store is not None else None,
+            "bm25_documents": len(bm25) if bm25 is not None else 0,
+            "loads": self.loads,
+            "last_load_ms": round(1000 * self.last_load_seconds, 1) if self.last_load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+            "embeddings_load_ms": round(1000 * llm.embeddings_load_seconds, 1) if llm.embeddings_load_seconds is not None else None,
+            "queries": self.queries,
+            "queries_by_mode": dict(self.queries_by_mode),
+            "query_p50_ms": percentile(0.5),
+            "query_p95_ms": percentile(0.95),
+        }
+
+
+# Global registry for the default index
+vector_store_registry = VectorStoreRegistry(build_missing=build_index)
+
 
 def get_retriever():
     """
-    Returns a retriever from the local FAISS index.
+    Returns a retriever from the cached local FAISS index.
     """
-    embeddings = get_embeddings()
-    if not os.path.exists(VECTOR_STORE_PATH):
-        # Build functionality on demand or warn
-        print("Index not found. Building now...")
-        build_index()
-    
-    vectorstore = FAISS.load_local(VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
+    vectorstore = vector_store_registry.get_vectorstore()
     return vectorstore.as_retriever(search_kwargs={"k": 3})
+
+
+def search_documents(query: str, k: int = 3) -> List[Document]:
+    """Search the default knowledge base index"""
+    return vector_store_registry.search(query, k=k)
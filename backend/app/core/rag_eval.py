@@ -0,0 +1,173 @@
+"""
+RAG Evaluation
+Scores knowledge base retrieval against a labelled question set.
+
+Each question names the SOP file that answers it and a short answer phrase
+copied from that file. A retrieved chunk is relevant when it comes from
+that file and contains the phrase, so the labels stay valid for any chunk
+size or overlap and the same question set can score every configuration.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.ingestion import ingest_documents
+from app.core.rag import VectorStoreRegistry
+from app.core.vector_index import load_store, write_search_index
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+QUESTIONS_PATH = os.path.join(BASE_DIR, "data", "eval", "sop_questions.json")
+DOCS_PATH = os.path.join(BASE_DIR, "docs")
+
+
+@dataclass
+class EvalQuestion:
+    question: str
+    source: str  # File name of the SOP holding the answer
+    answer: str  # Phrase copied verbatim from that SOP
+
+
+def load_questions(path: str = QUESTIONS_PATH) -> List[EvalQuestion]:
+    """Load the labelled question set"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [EvalQuestion(**item) for item in json.load(f)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def is_relevant(doc: Document, question: EvalQuestion) -> bool:
+    """True when a retrieved chunk comes from the labelled SOP and contains the answer"""
+    source = os.path.basename(doc.metadata.get("source", ""))
+    return source == question.source and _normalize(question.answer) in _normalize(doc.page_content)
+
+
+def first_relevant_rank(docs: List[Document], question: EvalQuestion) -> Optional[int]:
+    """1-based rank of the first relevant chunk, or None"""
+    for rank, doc in enumerate(docs, start=1):
+        if is_relevant(doc, question):
+            return rank
+    return None
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def evaluate(
+    search: Callable[[str, int], List[Document]],
+    questions: List[EvalQuestion],
+    k: int,
+) -> Dict[str, Any]:
+    """
+    Score one retrieval configuration
+
+    Every query is run once untimed first, so cached query embeddings do
+    not favour whichever configuration happens to run later.
+
+    Args:
+        search: (query, k) -> ranked chunks
+        questions: Labelled questions
+        k: Chunks retrieved per question
+
+    Returns:
+        recall (share of questions with a relevant chunk in the top k),
+        mrr (mean reciprocal rank, 0 when missed), p50/p99 latency and the
+        questions that were missed
+    """
+    for q in questions:
+        search(q.question, k)
+
+    latencies, ranks = [], []
+    for q in questions:
+        started = time.perf_counter()
+        docs = search(q.question, k)
+        latencies.append(time.perf_counter() - started)
+        ranks.append(first_relevant_rank(docs[:k], q))
+
+    latencies.sort()
+    return {
+        "k": k,
+        "recall": round(sum(r is not None for r in ranks) / len(questions), 4),
+        "mrr": round(sum(1 / r for r in ranks if r) / len(questions), 4),
+        "p50_ms": round(1000 * _percentile(latencies, 0.5), 3),
+        "p99_ms": round(1000 * _percentile(latencies, 0.99), 3),
+        "missed": [q.question for q, r in zip(questions, ranks) if r is None],
+    }
+
+
+def run_sweep(
+    embeddings: Embeddings,
+    work_dir: str,
+    chunk_sizes: Iterable[int],
+    chunk_overlaps: Iterable[int],
+    ks: Iterable[int],
+    index_types: Iterable[str] = ("flat",),
+    modes: Iterable[str] = ("vector", "hybrid"),
+    questions: Optional[List[EvalQuestion]] = None,
+    docs_path: str = DOCS_PATH,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate every combination of chunking, index type, search mode and k
+
+    Each (chunk size, overlap) pair is ingested into its own index under
+    work_dir, and each index type is derived from it.
+
+    Returns:
+        One result row per combination
+    """
+    questions = questions or load_questions()
+    ks, index_types, modes = list(ks), list(index_types), list(modes)
+    rows = []
+    for chunk_size in chunk_sizes:
+        for chunk_overlap in chunk_overlaps:
+            if chunk_overlap >= chunk_size:
+                continue
+            index_path = os.path.join(work_dir, f"index_{chunk_size}_{chunk_overlap}")
+            started = time.perf_counter()
+            report = ingest_documents(docs_path, index_path, embeddings, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            ingest_seconds = time.perf_counter() - started
+
+            for index_type in index_types:
+                started = time.perf_counter()
+                write_search_index(index_path, load_store(index_path, embeddings, "flat", mmap=False).index, index_type)
+                derive_seconds = time.perf_counter() - started
+                registry = VectorStoreRegistry(index_path, lambda: embeddings, index_type=index_type)
+                registry.warm()
+                index_class = registry.get_stats()["index_class"]
+
+                for mode in modes:
+                    for k in ks:
+                        result = evaluate(lambda query, k: registry.search(query, k=k, mode=mode), questions, k)
+                        rows.append({
+                            "chunk_size": chunk_size,
+                            "chunk_overlap": chunk_overlap,
+                            "chunks": report["chunks_total"],
+                            "index_type": index_type,
+                            "index_class": index_class,
+                            "mode": mode,
+                            "build_seconds": round(ingest_seconds + derive_seconds, 3),
+                            **result,
+                        })
+                        logger.info(
+                            f"chunk={chunk_size}/{chunk_overlap} index={index_type} mode={mode} k={k}: "
+                            f"recall={result['recall']} mrr={result['mrr']} p50={result['p50_ms']}ms"
+                        )
+    return rows
+
+
+def best_configuration(rows: List[Dict[str, Any]], k: int) -> Optional[Dict[str, Any]]:
+    """Highest recall at k, then MRR, then lowest p50 latency"""
+    candidates = [row for row in rows if row["k"] == k]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda row: (row["recall"], row["mrr"], -row["p50_ms"]))
@@ -0,0 +1,143 @@
+"""
+Retrieval Service
+Async, micro-batched front end for knowledge base search.
+
+Queries arriving within RAG_BATCH_WAIT_MS of each other are collected into
+one batch (up to RAG_BATCH_MAX_SIZE). The batch is embedded with a single
+model call and searched with a single FAISS query matrix on a dedicated
+thread pool, then each caller's future is resolved with its own results.
+Callers never run CPU-bound embedding or search on the event loop.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.core.rag import VectorStoreRegistry, vector_store_registry
+
+logger = logging.getLogger(__name__)
+
+_Request = Tuple[str, int, Optional[str], asyncio.Future]
+
+
+class RetrievalService:
+    """
+    Collects concurrent searches into batches for VectorStoreRegistry.search_batch
+    """
+
+    def __init__(
+        self,
+        registry: VectorStoreRegistry,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            registry: Index to search
+            max_batch: Queries per batch (defaults to RAG_BATCH_MAX_SIZE)
+            max_wait_ms: How long the first query of a batch waits for
+                others (defaults to RAG_BATCH_WAIT_MS)
+            workers: Threads running batches (defaults to RAG_SEARCH_WORKERS)
+        """
+        self.registry = registry
+        self.max_batch = max_batch or settings.RAG_BATCH_MAX_SIZE
+        self.max_wait = (settings.RAG_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.workers = workers or settings.RAG_SEARCH_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # Pending batch and its flush timer, kept for the current event loop only
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_Request] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.queries = 0
+        self.max_batch_seen = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rag-search")
+        return self._executor
+
+    async def search(self, query: str, k: int = 3, mode: Optional[str] = None) -> List[Document]:
+        """
+        Search the knowledge base without blocking the event loop
+
+        Args:
+            query: Natural language query
+            k: Number of chunks to return
+            mode: See VectorStoreRegistry.search
+
+        Returns:
+            The k best matching document chunks
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First call on this loop (e.g. a new asyncio.run in tests/scripts)
+            self._loop, self._pending, self._timer = loop, [], None
+
+        future = loop.create_future()
+        self._pending.append((query, k, mode, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        batch = [request for request in batch if not request[3].cancelled()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.queries += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        task = self._loop.run_in_executor(
+            self._get_executor(),
+            self.registry.search_batch,
+            [(query, k, mode) for query, k, mode, _ in batch],
+        )
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch: List[_Request], done: asyncio.Future):
+        error = done.exception()
+        if error is not None:
+            logger.warning(f"Knowledge base search failed for a batch of {len(batch)}: {error}")
+        for i, (*_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": round(self.queries / self.batches, 2) if self.batches else None,
+            "max_batch_size": self.max_batch_seen,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(1000 * self.max_wait, 2),
+            "workers": self.workers,
+        }
+
+
+# Global service over the default knowledge base index
+retrieval_service = RetrievalService(vector_store_registry)
+
+
+async def asearch_documents(query: str, k: int = 3) -> List[Document]:
+    """Search the default knowledge base index from async code"""
+    return await retrieval_service.search(query, k=k)
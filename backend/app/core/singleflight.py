@@ -0,0 +1,154 @@
+"""
+Single-Flight Call Coalescing
+Concurrent calls with the same key share one in-flight execution.
+
+The first caller starts the work as a shared task; identical callers that
+arrive while it is running await the same result instead of repeating it.
+Streams are fanned out: every subscriber receives all chunks from the
+start, including subscribers that join after the first chunk arrived.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable key from JSON-serializable request parts
+
+    Dict ordering is normalized so equivalent requests map to the same key.
+    """
+    normalized = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One shared in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+        # Stream state (unused for plain calls)
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls and counts how many were collapsed
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self._executions = 0
+        self._collapsed = 0
+
+    def _release(self, key: str, flight: _Flight):
+        flight.subscribers -= 1
+        # Cancel shared work nobody is waiting for anymore
+        if flight.subscribers == 0 and not flight.task.done():
+            flight.task.cancel()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _start(self, key: str, make_coro: Callable[[_Flight], Awaitable[Any]]) -> _Flight:
+        flight = _Flight()
+        flight.task = asyncio.ensure_future(make_coro(flight))
+        self._flights[key] = flight
+        self._executions += 1
+
+        def _forget(_task, key=key, flight=flight):
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        flight.task.add_done_callback(_forget)
+        return flight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Normalized request key (see make_key)
+            fn: Zero-argument coroutine factory doing the actual work
+
+        Returns:
+            The shared result (callers must not mutate it)
+        """
+        flight = self._flights.get(key)
+        if flight is not None and not flight.task.done():
+            self._collapsed += 1
+        else:
+            flight = self._start(key, lambda _flight: fn())
+
+        flight.subscribers += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            self._release(key, flight)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Consume fn's stream once and replay every chunk to each subscriber
+
+        Args:
+            key: Normalized request key (see make_key)
+            fn: Zero-argument factory returning the source async iterator
+
+        Yields:
+            Shared chunks (callers must copy before mutating)
+        """
+        flight = self._flights.get(key)
+        if flight is not None and not flight.task.done():
+            self._collapsed += 1
+        else:
+            flight = self._start(key, lambda _flight: self._pump(_flight, fn))
+
+        flight.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.done:
+                    break
+                flight.changed.clear()
+                if index < len(flight.chunks) or flight.done:
+                    continue
+                await flight.changed.wait()
+            # Surface errors from the shared source to every subscriber
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            self._release(key, flight)
+
+    async def _pump(self, flight: _Flight, fn: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for chunk in fn():
+                flight.chunks.append(chunk)
+                flight.changed.set()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.changed.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "executions": self._executions,
+            "collapsed": self._collapsed,
+        }
+
+
+# Shared coalescers for LLM requests and read-only MCP tool calls
+llm_flights = SingleFlight("llm")
+tool_flights = SingleFlight("mcp_tools")
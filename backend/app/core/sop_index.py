@@ -0,0 +1,229 @@
+"""
+SOP Section Index
+In-memory section index over every SOP document in backend/docs.
+
+Each SOP is split into sections at its `##` / `###` headings. Every section
+keeps its lowercase text and token set, and an inverted term -> section map
+finds candidate sections for a query without scanning any text. The index
+is built on first use and rebuilt when an SOP file is added, removed or
+modified.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+SOP_DIR = os.path.join(BASE_DIR, "docs")
+
+HEADING_PATTERN = re.compile(r"^(#{2,3}) +(.+?)\s*$", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[_-][a-z0-9]+)*")
+SUFFIXES = ("ments", "ment", "ings", "ing", "ions", "ion", "ed", "es", "s")
+
+# Extra names agents may use for a domain; domains are otherwise derived from file names
+DOMAIN_ALIASES = {
+    "device": "intune",
+    "devices": "intune",
+    "ticket": "servicenow",
+    "tickets": "servicenow",
+    "sap": "access",
+    "grc": "access",
+    "users": "m365",
+    "new_user": "onboarding",
+}
+
+
+def _stem(word: str) -> str:
+    # Light suffix stripping so "enroll" matches "enrollment" and "wipe" matches "wiped"
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Lowercase, stemmed terms of a text"""
+    return [_stem(w) for w in WORD_PATTERN.findall(text.lower())]
+
+
+def domain_for_file(filename: str) -> str:
+    """
+    Domain key of an SOP file name
+
+    e.g. intune_device_provisioning_sop_v1.txt -> intune,
+    user_access_management_sap_sop_v1.txt -> access,
+    new_user_onboarding_sop_v1.txt -> onboarding
+    """
+    stem = re.sub(r"_sop(_v\d+)?$", "", os.path.splitext(filename)[0])
+    words = stem.split("_")
+    for known in ("intune", "m365", "servicenow", "access", "onboarding"):
+        if known in words:
+            return known
+    return words[0]
+
+
+@dataclass
+class Section:
+    domain: str
+    title: str
+    text: str  # Heading + body as shown to the agent
+    lower: str
+    tokens: FrozenSet[str]
+    order: int
+
+
+@dataclass
+class _Snapshot:
+    signature: Tuple
+    sections: List[Section] = field(default_factory=list)
+    postings: Dict[str, Set[int]] = field(default_factory=dict)
+    documents: Dict[str, str] = field(default_factory=dict)  # domain -> file name
+
+
+class SOPIndex:
+    """
+    Section index over a directory of SOP documents
+    """
+
+    def __init__(self, sop_dir: str = SOP_DIR, check_interval: float = 2.0):
+        self.sop_dir = sop_dir
+        self.check_interval = check_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _signature(self) -> Tuple:
+        try:
+            entries = [e for e in os.scandir(self.sop_dir) if e.name.endswith((".txt", ".md"))]
+        except FileNotFoundError:
+            return ()
+        signature = []
+        for entry in sorted(entries, key=lambda e: e.name):
+            stat = entry.stat()
+            signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _build(self, signature: Tuple) -> _Snapshot:
+        snapshot = _Snapshot(signature=signature)
+        postings = defaultdict(set)
+        for name, _, _ in signature:
+            domain = domain_for_file(name)
+            snapshot.documents[domain] = name
+            with open(os.path.join(self.sop_dir, name), "r", encoding="utf-8") as f:
+                content = f.read()
+            for title, body in _split_sections(content):
+                text = f"## {title}\n{body}".rstrip()
+                position = len(snapshot.sections)
+                tokens = frozenset(terms(text))
+                snapshot.sections.append(Section(
+                    domain=domain, title=title, text=text, lower=text.lower(),
+                    tokens=tokens, order=position,
+                ))
+                for token in tokens:
+                    postings[token].add(position)
+        snapshot.postings = dict(postings)
+        self.builds += 1
+        logger.info(f"SOP index built: {len(snapshot.sections)} sections from {len(signature)} documents")
+        return snapshot
+
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.check_interval:
+                return self._snapshot
+            signature = self._signature()
+            if self._snapshot is None or signature != self._snapshot.signature:
+                self._snapshot = self._build(signature)
+            self._checked_at = now
+            return self._snapshot
+
+    def domains(self) -> Dict[str, str]:
+        """Indexed domains and the SOP file each one comes from"""
+        return dict(self._current().documents)
+
+    def resolve_domain(self, domain: Optional[str]) -> Optional[str]:
+        """
+        Map a caller-supplied domain name to an indexed domain
+
+        Returns:
+            The domain key, "" for all SOPs, or None if unknown
+        """
+        if not domain or domain.lower() in ("all", "any", "*"):
+            return ""
+        key = domain.lower().strip().replace(" ", "_")
+        documents = self._current().documents
+        if key in documents:
+            return key
+        if key in DOMAIN_ALIASES and DOMAIN_ALIASES[key] in documents:
+            return DOMAIN_ALIASES[key]
+        # Unique match on a word of the SOP file name, e.g. "provisioning" -> intune
+        matches = [d for d, name in documents.items() if key in name.lower().split("_")]
+        return matches[0] if len(matches) == 1 else None
+
+    def search(self, query: str, domain: Optional[str] = None, limit: int = 3) -> List[Section]:
+        """
+        Find the sections matching a query
+
+        A section matches when it contains the whole query phrase, or at
+        least half of the query's significant words (longer than 3 chars).
+
+        Args:
+            query: Search text
+            domain: Domain key from resolve_domain ("" or None = all SOPs)
+            limit: Max sections to return
+
+        Returns:
+            Matching sections, phrase matches and higher word overlap first
+        """
+        snapshot = self._current()
+        query_lower = query.lower().strip()
+        words = {w for w in terms(query) if len(w) > 3}
+
+        candidates: Dict[int, int] = defaultdict(int)
+        for word in words:
+            for position in snapshot.postings.get(word, ()):
+                candidates[position] += 1
+        if not words and query_lower:
+            # Only short words (e.g. "sla", "vpn"): fall back to phrase matching
+            candidates = {s.order: 0 for s in snapshot.sections if query_lower in s.lower}
+
+        scored = []
+        for position, matched in candidates.items():
+            section = snapshot.sections[position]
+            if domain and section.domain != domain:
+                continue
+            occurrences = section.lower.count(query_lower) if query_lower else 0
+            if occurrences or matched >= len(words) * 0.5:
+                scored.append((not occurrences, -matched, -occurrences, section.order, section))
+        scored.sort(key=lambda item: item[:4])
+        return [section for *_, section in scored[:limit]]
+
+
+def _split_sections(content: str) -> List[Tuple[str, str]]:
+    """Split a document into (heading, body) pairs at ## / ### headings"""
+    headings = list(HEADING_PATTERN.finditer(content))
+    sections = []
+    parent = None
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        title = match.group(2)
+        if len(match.group(1)) == 2:
+            parent = title
+        elif parent:
+            title = f"{parent} > {title}"
+        sections.append((title, content[match.end():end].strip()))
+    return sections
+
+
+# Global index over backend/docs
+sop_index = SOPIndex()
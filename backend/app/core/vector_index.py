@@ -0,0 +1,195 @@
+"""
+Vector Index Types
+Builds and loads the FAISS search index used by the knowledge base.
+
+Ingestion keeps an exact flat index (index.faiss) as the source of truth,
+because it supports incremental adds and deletes. When RAG_INDEX_TYPE is
+not "flat", a search index of that type (IVF, HNSW, product-quantized or
+int8 scalar-quantized) is derived from it and saved as index.<type>.faiss.
+Derived files are deleted whenever the flat index is rewritten, and one
+that does not hold exactly the docstore's vectors is never loaded, so a
+type derived from an older corpus cannot map hits to the wrong chunks.
+Indexes are loaded memory-mapped and read-only, so several uvicorn workers
+share the same page cache instead of each holding a private copy.
+"""
+import logging
+import math
+import os
+import pickle
+from typing import Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "pq", "sq8")
+FLAT_INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "index.pkl"
+
+# Below this many vectors k-means training is unreliable; quantized types fall back to flat
+MIN_TRAINING_POINTS = {"ivf": 1000, "pq": 10000}
+
+
+def search_index_file(index_type: str) -> str:
+    """File name of the search index for a type"""
+    return FLAT_INDEX_FILE if index_type == "flat" else f"index.{index_type}.faiss"
+
+
+def _nlist(n: int) -> int:
+    if settings.RAG_IVF_NLIST:
+        return settings.RAG_IVF_NLIST
+    # Rule of thumb: ~4 * sqrt(n) lists, with at least 39 training points per list
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def _pq_m(dim: int) -> int:
+    # Sub-quantizer count must divide the dimension
+    m = min(settings.RAG_PQ_M, dim)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_index_of_type(vectors: np.ndarray, index_type: str, metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """
+    Build and fill a FAISS index of the given type
+
+    Args:
+        vectors: (n, dim) float32 matrix
+        index_type: One of INDEX_TYPES
+        metric: faiss.METRIC_L2 or faiss.METRIC_INNER_PRODUCT
+
+    Returns:
+        Trained index holding all vectors, in input order
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    n, dim = vectors.shape
+    if n < MIN_TRAINING_POINTS.get(index_type, 0):
+        logger.info(f"{n} vectors are too few to train a '{index_type}' index; using flat")
+        index_type = "flat"
+
+    if index_type == "flat":
+        index = faiss.IndexFlat(dim, metric)
+    elif index_type == "ivf":
+        index = faiss.IndexIVFFlat(faiss.IndexFlat(dim, metric), dim, _nlist(n), metric)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.RAG_HNSW_M, metric)
+    elif index_type == "pq":
+        index = faiss.IndexIVFPQ(faiss.IndexFlat(dim, metric), dim, _nlist(n), _pq_m(dim), 8, metric)
+    else:  # sq8
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, metric)
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    configure_search(index)
+    return index
+
+
+def configure_search(index: faiss.Index):
+    """Apply query-time parameters (nprobe, efSearch) from Settings"""
+    try:
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = min(settings.RAG_IVF_NPROBE, ivf.nlist)
+    except RuntimeError:
+        pass
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = settings.RAG_HNSW_EF_SEARCH
+
+
+def write_search_index(index_path: str, flat_index: faiss.Index, index_type: Optional[str] = None) -> Optional[str]:
+    """
+    Derive the configured search index from the exact flat index
+
+    Returns:
+        Path of the written file, or None for the flat type
+    """
+    index_type = index_type or settings.RAG_INDEX_TYPE
+    if index_type == "flat":
+        return None
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal) if flat_index.ntotal else np.zeros((0, flat_index.d), "float32")
+    index = build_index_of_type(np.ascontiguousarray(vectors, dtype="float32"), index_type, flat_index.metric_type)
+    path = os.path.join(index_path, search_index_file(index_type))
+    tmp_path = path + ".tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def remove_search_indexes(index_path: str):
+    """Delete every derived index (before the flat index they came from is replaced)"""
+    for index_type in INDEX_TYPES:
+        if index_type == "flat":
+            continue
+        path = os.path.join(index_path, search_index_file(index_type))
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def search_index_is_current(index_path: str, index_type: Optional[str] = None) -> bool:
+    """Whether the derived index exists and holds as many vectors as the flat index"""
+    index_type = index_type or settings.RAG_INDEX_TYPE
+    if index_type == "flat":
+        return True
+    path = os.path.join(index_path, search_index_file(index_type))
+    if not os.path.exists(path):
+        return False
+    flat = read_faiss_index(os.path.join(index_path, FLAT_INDEX_FILE), mmap=True)
+    return read_faiss_index(path, mmap=True).ntotal == flat.ntotal
+
+
+def read_faiss_index(path: str, mmap: bool) -> faiss.Index:
+    """Read an index file, memory-mapped and read-only when mmap is set"""
+    if not mmap:
+        return faiss.read_index(path)
+    read_only = faiss.IO_FLAG_READ_ONLY
+    # Flat codes (flat, sq8, HNSW storage) map with IO_FLAG_MMAP_IFC (faiss >= 1.8);
+    # IVF inverted lists only accept the plain IO_FLAG_MMAP
+    mmap_ifc = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    if mmap_ifc:
+        try:
+            return faiss.read_index(path, mmap_ifc | faiss.IO_FLAG_MMAP | read_only)
+        except RuntimeError:
+            pass
+    return faiss.read_index(path, faiss.IO_FLAG_MMAP | read_only)
+
+
+def load_store(
+    index_path: str,
+    embeddings: Embeddings,
+    index_type: Optional[str] = None,
+    mmap: Optional[bool] = None,
+) -> FAISS:
+    """
+    Load a LangChain FAISS store using the configured search index
+
+    Falls back to the flat index when the derived index has not been built
+    yet (e.g. RAG_INDEX_TYPE was changed without re-running ingestion) or
+    does not match the docstore.
+    """
+    index_type = index_type or settings.RAG_INDEX_TYPE
+    mmap = settings.RAG_INDEX_MMAP if mmap is None else mmap
+
+    path = os.path.join(index_path, search_index_file(index_type))
+    if not os.path.exists(path):
+        if index_type != "flat":
+            logger.warning(f"No '{index_type}' index at {index_path}; using flat. Re-run ingestion to build it.")
+        path = os.path.join(index_path, FLAT_INDEX_FILE)
+
+    index = read_faiss_index(path, mmap)
+    with open(os.path.join(index_path, DOCSTORE_FILE), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    if index.ntotal != len(index_to_docstore_id):
+        logger.warning(
+            f"'{index_type}' index at {index_path} holds {index.ntotal} vectors for "
+            f"{len(index_to_docstore_id)} chunks; using flat. Re-run ingestion to rebuild it."
+        )
+        index = read_faiss_index(os.path.join(index_path, FLAT_INDEX_FILE), mmap)
+    configure_search(index)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
@@ -0,0 +1,74 @@
+"""
+MCP Batch Calls
+Runs several tool calls of one FastMCP server concurrently in the server.
+
+Backs the composite server's batch_call tool: an agent that needs five
+tickets or every device of a user sends one MCP request instead of one per
+lookup. Each call goes through the server's middleware (result cache, ...)
+exactly like a call made by a client.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastmcp import FastMCP
+from fastmcp.tools.tool import ToolResult
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOOL = "batch_call"
+
+
+def _result_value(result: ToolResult) -> Any:
+    structured = result.structured_content
+    if structured is not None:
+        # Non-object returns are wrapped as {"result": ...}
+        if isinstance(structured, dict) and set(structured) == {"result"}:
+            return structured["result"]
+        return structured
+    texts = [block.text for block in result.content if getattr(block, "text", None) is not None]
+    return texts[0] if len(texts) == 1 else texts
+
+
+async def run_batch(
+    server: FastMCP,
+    calls: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run tool calls concurrently and collect their results in order
+
+    Args:
+        server: Server whose tools are called
+        calls: [{"tool": name, "args": {...}}, ...]
+        max_concurrency: Calls running at once (defaults to MCP_BATCH_MAX_CONCURRENCY)
+
+    Returns:
+        One entry per call, in order: {"tool", "ok": True, "result"} or
+        {"tool", "ok": False, "error"}. A failing call does not affect the others.
+    """
+    if len(calls) > settings.MCP_BATCH_MAX_CALLS:
+        raise ValueError(f"batch_call accepts at most {settings.MCP_BATCH_MAX_CALLS} calls, got {len(calls)}")
+    semaphore = asyncio.Semaphore(max_concurrency or settings.MCP_BATCH_MAX_CONCURRENCY)
+
+    async def run_one(call: Dict[str, Any]) -> Dict[str, Any]:
+        name = call.get("tool") if isinstance(call, dict) else None
+        if not isinstance(name, str) or not name:
+            return {"tool": name, "ok": False, "error": "Each call needs a 'tool' name"}
+        if name == BATCH_TOOL:
+            return {"tool": name, "ok": False, "error": "batch_call cannot be nested"}
+        arguments = call.get("args") or {}
+        async with semaphore:
+            try:
+                # Private FastMCP API (no public call runs the middleware): the same
+                # path as a client request without a client session per batch.
+                # fastmcp is pinned; test_mcp_batch checks this method still exists.
+                result = await server._call_tool_middleware(name, arguments)
+            except Exception as e:
+                logger.info(f"batch_call: {name} failed: {e}")
+                return {"tool": name, "ok": False, "error": str(e) or type(e).__name__}
+        return {"tool": name, "ok": True, "result": _result_value(result)}
+
+    return await asyncio.gather(*[run_one(call) for call in calls])
@@ -11,9 +11,18 @@ EnterpriseHub provides unified access to:
 - Outlook email operations
 - Workflow orchestration
 - Resource provisioning (VMs, App Services, etc.)
+
+Read-only tool results are cached in the server and invalidated when a
+mutating tool changes the same entities (see app.mcp.result_cache). The
+cache is per process, so it is off when running several workers.
+
+batch_call runs several of these tools concurrently in one request
+(see app.mcp.batch). get_server_stats and GET /metrics report per-tool
+latency, payload sizes and error rates (see app.mcp.tool_metrics).
 """
 import sys
 import os
+from typing import Any, Dict, List
 
 # Add backend directory to path so we can import app modules
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -21,6 +30,11 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 from fastmcp import FastMCP
+from app.core.config import settings
+from app.mcp.batch import BATCH_TOOL, run_batch
+from app.mcp.config import in_worker_process
+from app.mcp.result_cache import tool_result_cache
+from app.mcp.tool_metrics import install_tool_metrics
 
 # Import sub-servers
 from app.mcp.servers.servicenow_mcp import mcp as servicenow_mcp
@@ -47,7 +61,31 @@ mcp.mount(outlook_mcp, prefix="outlook")
 mcp.mount(workflow_mcp, prefix="workflow")
 mcp.mount(resource_mcp, prefix="resource")
 
+
+@mcp.tool(name=BATCH_TOOL)
+async def batch_call(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Runs several EnterpriseHub tools concurrently and returns their results in order.
+
+    Use it for independent lookups, e.g. several tickets or the status of
+    several requests. A failing call is reported in its own entry and does
+    not stop the others.
+
+    Args:
+        calls: List of {"tool": tool name, "args": {argument: value}}, e.g.
+            [{"tool": "servicenow_get_servicenow_ticket", "args": {"ticket_id": "INC0000001"}}]
+    """
+    return await run_batch(mcp, calls)
+
+
+# A write on one worker could not invalidate reads cached by the others
+if settings.MCP_RESULT_CACHE and not in_worker_process():
+    mcp.add_middleware(tool_result_cache)
+    install_tool_metrics(mcp, extra_stats=lambda: {"result_cache": tool_result_cache.get_stats()})
+else:
+    install_tool_metrics(mcp)
+
 if __name__ == "__main__":
     # Start the composite server with configured transport (HTTP with CORS by default)
+    # Pass --workers N to serve HTTP from N processes
     from app.mcp.config import run_server
-    run_server(mcp, "EnterpriseHub")
+    run_server(mcp, "EnterpriseHub", import_path="app.mcp.composite_server:mcp")
@@ -1,8 +1,24 @@
 """
 MCP Server Configuration
 Supports both stdio (for MCP Inspector) and streamable-http (for web clients) transports
+
+The HTTP transport is stateless, so a server can run as several uvicorn
+worker processes (--workers N or MCP_WORKERS) behind one port. Tool state
+lives in the shared database. Consecutive requests of one client can land
+on different workers, so the composite server's per-process result cache
+is off in multi-worker mode (see in_worker_process()).
+
+Every server gets per-tool metrics (app.mcp.tool_metrics): GET /metrics in
+Prometheus format and a get_server_stats tool. Workers share their counters
+through a temporary directory, so either reports the whole server.
 """
+import argparse
+import importlib
 import os
+import shutil
+import tempfile
+
+from app.mcp.tool_metrics import METRICS_DIR_ENV, install_tool_metrics
 
 # Transport mode: 'stdio' for MCP Inspector, 'http' for web clients
 MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "http")
@@ -10,7 +26,67 @@ MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "http")
 # Port for composite server (can be overridden by MCP_SERVER_PORT)
 COMPOSITE_PORT = int(os.getenv("MCP_COMPOSITE_PORT", "8001"))
 
-def run_server(mcp_instance, server_name: str, port: int = None):
+# Worker processes for HTTP transport (overridden by --workers N)
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+
+# "module:attribute" of the FastMCP instance served by worker processes
+WORKER_SERVER_ENV = "MCP_WORKER_SERVER"
+
+# Readiness/liveness endpoint of HTTP servers
+HEALTH_PATH = "/health"
+
+
+def in_worker_process() -> bool:
+    """Whether this process is one of the workers of a multi-worker server"""
+    return WORKER_SERVER_ENV in os.environ
+
+
+def parse_workers() -> int:
+    """Read --workers N from the command line (defaults to MCP_WORKERS)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--workers", type=int, default=MCP_WORKERS)
+    args, _ = parser.parse_known_args()
+    return max(1, args.workers)
+
+
+def _add_cors(app):
+    from fastapi.middleware.cors import CORSMiddleware
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+
+def add_health_route(mcp_instance, server_name: str):
+    """
+    Serve GET /health for readiness probes (scripts/start_mcp_servers.py)
+    """
+    from starlette.responses import JSONResponse
+
+    @mcp_instance.custom_route(HEALTH_PATH, methods=["GET"], include_in_schema=False)
+    async def health(request):
+        return JSONResponse({"status": "ok", "server": server_name, "pid": os.getpid()})
+
+
+def create_worker_app():
+    """
+    uvicorn app factory run in each worker process of a multi-worker server
+    """
+    module_name, attribute = os.environ[WORKER_SERVER_ENV].split(":")
+    mcp_instance = getattr(importlib.import_module(module_name), attribute)
+    install_tool_metrics(mcp_instance)
+    add_health_route(mcp_instance, mcp_instance.name)
+    app = mcp_instance.http_app(transport="streamable-http", stateless_http=True)
+    _add_cors(app)
+    return app
+
+
+def run_server(mcp_instance, server_name: str, port: int = None, workers: int = None, import_path: str = None):
     """
     Run MCP server with configured transport
     
@@ -18,8 +94,11 @@ def run_server(mcp_instance, server_name: str, port: int = None):
         mcp_instance: FastMCP instance
         server_name: Name of the server for logging
         port: Port number for HTTP transport (optional, uses default if not provided)
+        workers: Worker processes for HTTP transport (defaults to --workers / MCP_WORKERS)
+        import_path: "module:attribute" of mcp_instance; required for more than one worker
     """
     transport = MCP_TRANSPORT.lower()
+    install_tool_metrics(mcp_instance)
     
     if transport == "stdio":
         print(f"Starting {server_name} MCP server with STDIO transport")
@@ -31,28 +110,45 @@ def run_server(mcp_instance, server_name: str, port: int = None):
         if port is None:
             port = int(os.getenv("MCP_SERVER_PORT", COMPOSITE_PORT))
             
+        if workers is None:
+            workers = parse_workers()
+        if workers > 1 and import_path is None:
+            print(f"{server_name} cannot run multiple workers without an import path, using 1")
+            workers = 1
+            
         print(f"Starting {server_name} MCP server with Streamable HTTP transport")
         print(f"Server URL: http://localhost:{port}")
         print(f"CORS enabled for all origins")
         
-        # Add CORS middleware
-        from fastapi.middleware.cors import CORSMiddleware
         import uvicorn
         
+        if workers > 1:
+            # Workers import the server themselves, so uvicorn needs an app factory path
+            print(f"Running {workers} worker processes")
+            os.environ[WORKER_SERVER_ENV] = import_path
+            metrics_dir = tempfile.mkdtemp(prefix="mcp-metrics-")
+            os.environ[METRICS_DIR_ENV] = metrics_dir
+            try:
+                uvicorn.run(
+                    f"{__name__}:create_worker_app",
+                    factory=True,
+                    host="0.0.0.0",
+                    port=port,
+                    workers=workers,
+                )
+            finally:
+                shutil.rmtree(metrics_dir, ignore_errors=True)
+            return
+        
+        add_health_route(mcp_instance, server_name)
+        
         # Patch uvicorn.run to add CORS middleware
         original_uvicorn_run = uvicorn.run
         
         def patched_uvicorn_run(app, *args, **kwargs):
             # Add CORS middleware to the app
             if hasattr(app, 'add_middleware'):
-                app.add_middleware(
-                    CORSMiddleware,
-                    allow_origins=["*"],
-                    allow_credentials=True,
-                    allow_methods=["*"],
-                    allow_headers=["*"],
-                    expose_headers=["*"],
-                )
+                _add_cors(app)
                 print(f"✓ CORS middleware added to {server_name}")
             
             # Call original uvicorn.run
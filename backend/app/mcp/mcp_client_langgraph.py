@@ -1,63 +1,211 @@
 """
 LangGraph MCP Client for accessing MCP tools via HTTP
+
+Tools share a pool of persistent MCP sessions (app.mcp.session_pool) instead
+of opening a session per tool listing and per call. If the MCP server is
+unreachable, tool loading returns no tools rather than failing, and the
+pool keeps reconnecting with backoff in the background.
+
+The tool definitions are saved to MCP_TOOL_CATALOG_PATH (app.mcp.tool_catalog).
+At startup tools are built from that file without contacting the server and
+the catalog is revalidated in the background; prefix and name lookups use
+maps precomputed whenever the catalog changes.
+
+With MCP_TRANSPORT=inprocess the composite FastMCP server is imported and
+called through FastMCP's in-memory client instead, so co-located
+deployments skip HTTP and the separate server process. Tool names and
+prefixes are the same on every transport.
 """
-from typing import List, Optional
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_core.tools import BaseTool
+import asyncio
+from typing import Any, Dict, List, Optional
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from langchain_core.tools import BaseTool, ToolException
 from app.core.config import settings
+from app.core.singleflight import tool_flights, make_key
+from app.mcp.batch import BATCH_TOOL
+from app.mcp.session_pool import MCPSessionPool, MCPUnavailableError
+from app.mcp.tool_catalog import catalog_hash, load_catalog, save_catalog
+from app.mcp.tool_policy import is_read_only
+from mcp import types as mt
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _coalesce_read_only_tool(tool: BaseTool) -> BaseTool:
+    """
+    Make concurrent identical calls of a read-only tool share one MCP request
+    """
+    original = tool.coroutine
+
+    async def coalesced(**kwargs):
+        # The injected LangGraph runtime is not part of the request identity
+        arguments = {k: v for k, v in kwargs.items() if k != "runtime"}
+        key = make_key(tool.name, arguments)
+        return await tool_flights.do(key, lambda: original(**kwargs))
+
+    tool.coroutine = coalesced
+    return tool
+
+
 class MCPClientManager:
     """
     Manages MCP client connections and tool retrieval for LangGraph agents
     """
     
     def __init__(self):
-        self._client: Optional[MultiServerMCPClient] = None
         self._tools_cache: Optional[List[BaseTool]] = None
-        
-    async def get_client(self) -> MultiServerMCPClient:
+        # Session pool bound to the event loop that created it
+        self._pool: Optional[MCPSessionPool] = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Tool definitions behind _tools_cache, from disk or the live server
+        self._catalog: Optional[List[mt.Tool]] = None
+        self._catalog_hash: Optional[str] = None
+        self._revalidation: Optional[asyncio.Task] = None
+        # Lookup maps rebuilt with _tools_cache; other prefixes are added on first use
+        self._by_name: Dict[str, BaseTool] = {}
+        self._by_prefix: Dict[str, List[BaseTool]] = {}
+
+    @property
+    def inprocess(self) -> bool:
+        return settings.MCP_TRANSPORT.lower() == "inprocess"
+
+    @property
+    def _source(self) -> str:
+        return "inprocess" if self.inprocess else settings.MCP_COMPOSITE_URL
+
+    def _client_factory(self):
+        from fastmcp import Client
+
+        if self.inprocess:
+            # Imported here: loads every MCP server module and its tools
+            from app.mcp.composite_server import mcp
+            return lambda: Client(mcp)
+        url = settings.MCP_COMPOSITE_URL
+        return lambda: Client(url)
+
+    async def get_pool(self) -> MCPSessionPool:
         """
-        Get or create MCP client instance
+        Get or create the session pool for the running event loop
+
+        The sessions are kept open and shared by all tools; a new pool is
+        made if the event loop changed (e.g. a new asyncio.run in scripts/tests).
         """
-        if self._client is None:
-            logger.info(f"Initializing MCP client with URL: {settings.MCP_COMPOSITE_URL}")
-            
-            # Configure composite server connection
-            server_config = {
-                "composite": {
-                    "transport": settings.MCP_TRANSPORT,
-                    "url": settings.MCP_COMPOSITE_URL,
-                }
-            }
-            
-            self._client = MultiServerMCPClient(server_config)
-            logger.info("MCP client initialized successfully")
-            
-        return self._client
-    
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool_loop is not loop:
+            if self.inprocess:
+                logger.info("Connecting in-process MCP client to the composite server")
+                # In-memory sessions never drop, and one serves any concurrency
+                pool = MCPSessionPool(self._client_factory(), size=1, health_interval=0)
+            else:
+                logger.info(f"Connecting MCP session pool to {settings.MCP_COMPOSITE_URL}")
+                pool = MCPSessionPool(self._client_factory())
+            await pool.start()
+            self._pool, self._pool_loop = pool, loop
+            self._tools_cache = None
+        return self._pool
+
+    def get_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Session pool metrics, or None before the first tool request"""
+        return self._pool.get_stats() if self._pool is not None else None
+
+    def _set_tools(self, pool: MCPSessionPool, catalog: List[mt.Tool], digest: str):
+        # The pool stands in for an mcp ClientSession
+        tools = [convert_mcp_tool_to_langchain_tool(pool, tool) for tool in catalog]
+        if settings.MCP_SINGLE_FLIGHT:
+            tools = [
+                _coalesce_read_only_tool(tool) if is_read_only(tool.name) and tool.coroutine else tool
+                for tool in tools
+            ]
+        by_prefix: Dict[str, List[BaseTool]] = {}
+        for tool in tools:
+            # servicenow_get_servicenow_ticket -> servicenow_
+            by_prefix.setdefault(tool.name.split("_", 1)[0] + "_", []).append(tool)
+        self._catalog, self._catalog_hash = catalog, digest
+        self._tools_cache = tools
+        self._by_name = {tool.name: tool for tool in tools}
+        self._by_prefix = by_prefix
+
+    async def _fetch_catalog(self, pool: MCPSessionPool) -> bool:
+        """
+        List tools on the live server; rebuild tools and save if the catalog changed
+
+        Returns:
+            True if the catalog changed
+        """
+        catalog: List[mt.Tool] = []
+        cursor = None
+        while True:
+            page = await pool.list_tools(cursor=cursor)
+            catalog.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                break
+        digest = catalog_hash(catalog)
+        if digest == self._catalog_hash and self._tools_cache is not None:
+            return False
+        self._set_tools(pool, catalog, digest)
+        if settings.MCP_TOOL_CATALOG_PATH:
+            try:
+                await asyncio.to_thread(save_catalog, settings.MCP_TOOL_CATALOG_PATH, self._source, catalog)
+            except OSError as e:
+                logger.warning(f"Could not save tool catalog to {settings.MCP_TOOL_CATALOG_PATH}: {e}")
+        return True
+
+    async def _revalidate(self, pool: MCPSessionPool):
+        """Compare the catalog with the live server once it is reachable"""
+        while not await pool.wait_connected():
+            if pool is not self._pool:
+                return  # Closed meanwhile
+        try:
+            if await self._fetch_catalog(pool):
+                logger.info(f"Tool catalog changed on the MCP server, now {len(self._tools_cache)} tools")
+        except Exception as e:
+            logger.warning(f"Tool catalog revalidation failed: {e}")
+
     async def get_all_tools(self, force_refresh: bool = False) -> List[BaseTool]:
         """
         Get all tools from the MCP composite server
-        
+
+        Served from the saved catalog when there is one (revalidated in the
+        background), otherwise listed from the live server.
+
         Args:
-            force_refresh: Force refresh the tools cache
-            
+            force_refresh: List tools from the live server now
+
         Returns:
-            List of LangChain tools from MCP server
+            List of LangChain tools from MCP server; empty (and not cached)
+            if there is no catalog and no session could be connected within
+            MCP_CONNECT_TIMEOUT_SECONDS
         """
+        if self._pool_loop is not asyncio.get_running_loop():
+            # Tools are bound to the previous event loop's pool
+            self._tools_cache = None
         if self._tools_cache is None or force_refresh:
+            pool = await self.get_pool()
+            if self._catalog is None and settings.MCP_TOOL_CATALOG_PATH:
+                saved = await asyncio.to_thread(load_catalog, settings.MCP_TOOL_CATALOG_PATH, self._source)
+                if saved is not None:
+                    self._catalog, self._catalog_hash = saved
+            if self._catalog is not None and not force_refresh:
+                self._set_tools(pool, self._catalog, self._catalog_hash)
+                logger.info(f"Loaded {len(self._tools_cache)} tools from the tool catalog")
+                if self._revalidation is None or self._revalidation.done():
+                    self._revalidation = asyncio.create_task(self._revalidate(pool))
+                return self._tools_cache
             try:
-                client = await self.get_client()
-                self._tools_cache = await client.get_tools()
+                await self._fetch_catalog(pool)
                 logger.info(f"Retrieved {len(self._tools_cache)} tools from MCP server")
+            except MCPUnavailableError as e:
+                if self._tools_cache is not None:
+                    logger.warning(f"MCP server unavailable, keeping the current tools: {e}")
+                    return self._tools_cache
+                logger.warning(f"MCP server unavailable, continuing without tools: {e}")
+                return []
             except Exception as e:
                 logger.error(f"Failed to get tools from MCP server: {e}")
                 raise
-                
+
         return self._tools_cache
     
     async def get_tools_by_prefix(self, prefix: str) -> List[BaseTool]:
@@ -71,9 +219,14 @@ class MCPClientManager:
             List of filtered tools
         """
         all_tools = await self.get_all_tools()
-        filtered_tools = [tool for tool in all_tools if tool.name.startswith(prefix)]
-        logger.info(f"Found {len(filtered_tools)} tools with prefix '{prefix}'")
-        return filtered_tools
+        if all_tools is not self._tools_cache:
+            return []  # MCP server unavailable
+        filtered_tools = self._by_prefix.get(prefix)
+        if filtered_tools is None:
+            filtered_tools = [tool for tool in all_tools if tool.name.startswith(prefix)]
+            self._by_prefix[prefix] = filtered_tools
+        logger.debug(f"Found {len(filtered_tools)} tools with prefix '{prefix}'")
+        return list(filtered_tools)
     
     async def get_tools_by_names(self, tool_names: List[str]) -> List[BaseTool]:
         """
@@ -85,28 +238,51 @@ class MCPClientManager:
         Returns:
             List of matching tools
         """
-        all_tools = await self.get_all_tools()
-        tool_dict = {tool.name: tool for tool in all_tools}
+        await self.get_all_tools()
         
         filtered_tools = []
         for name in tool_names:
-            if name in tool_dict:
-                filtered_tools.append(tool_dict[name])
+            if name in self._by_name:
+                filtered_tools.append(self._by_name[name])
             else:
                 logger.warning(f"Tool '{name}' not found in MCP server")
                 
-        logger.info(f"Found {len(filtered_tools)} out of {len(tool_names)} requested tools")
+        logger.debug(f"Found {len(filtered_tools)} out of {len(tool_names)} requested tools")
         return filtered_tools
     
+    async def batch_call(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several tools in one MCP request (the composite server's batch_call)
+
+        Args:
+            calls: [{"tool": tool name, "args": {...}}, ...]
+
+        Returns:
+            One {"tool", "ok", "result" or "error"} entry per call, in order
+        """
+        if not calls:
+            return []
+        pool = await self.get_pool()
+        result = await pool.call_tool(BATCH_TOOL, {"calls": calls})
+        if result.isError:
+            raise ToolException(" ".join(getattr(block, "text", "") for block in result.content))
+        return result.structuredContent["result"]
+    
     async def close(self):
         """
         Close the MCP client connection
         """
-        if self._client is not None:
-            # MultiServerMCPClient doesn't have explicit close, but we clear cache
+        if self._revalidation is not None:
+            if self._pool_loop is asyncio.get_running_loop():
+                self._revalidation.cancel()
+            self._revalidation = None
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
             self._tools_cache = None
-            self._client = None
-            logger.info("MCP client closed")
+            if self._pool_loop is asyncio.get_running_loop():
+                await pool.close()
+            self._pool_loop = None
+            logger.info("MCP session pool closed")
 
 
 # Global MCP client manager instance
@@ -130,3 +306,16 @@ async def get_mcp_tools(prefix: Optional[str] = None, tool_names: Optional[List[
         return await mcp_manager.get_tools_by_prefix(prefix)
     else:
         return await mcp_manager.get_all_tools()
+
+
+async def batch_call_mcp_tools(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convenience function to run several MCP tools in one request
+
+    Args:
+        calls: [{"tool": tool name, "args": {...}}, ...]
+
+    Returns:
+        One {"tool", "ok", "result" or "error"} entry per call, in order
+    """
+    return await mcp_manager.batch_call(calls)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.core.config import settings
+from app.mcp.mcp_client_langgraph import mcp_manager
 
 router = APIRouter(prefix="/mcp", tags=["MCP"])
 
@@ -7,6 +8,9 @@ router = APIRouter(prefix="/mcp", tags=["MCP"])
 async def get_mcp_info():
     return {
         "status": "active",
-        "url": settings.MCP_COMPOSITE_URL,
-        "transport": settings.MCP_TRANSPORT
+        # In-process mode calls the composite server without a URL
+        "url": None if settings.MCP_TRANSPORT.lower() == "inprocess" else settings.MCP_COMPOSITE_URL,
+        "transport": settings.MCP_TRANSPORT,
+        # Session pool connections, reconnects, timeouts and retries
+        "pool": mcp_manager.get_pool_stats(),
     }
@@ -0,0 +1,202 @@
+"""
+MCP Tool Result Cache
+Read-through cache for read-only tools on the composite server.
+
+Results of read-only tools (see app.mcp.tool_policy) are cached per tool
+and argument tuple for MCP_RESULT_CACHE_TTL_SECONDS. A mutating call drops
+the cached reads of every domain it changes that either list the whole
+collection or name one of the entities in its arguments, so updating
+INC0000001 invalidates get_servicenow_ticket("INC0000001") and ticket
+searches, but not get_servicenow_ticket("INC0000002").
+
+Reads that were in flight while a mutation ran are not cached. Error
+results ({"error": ...}, e.g. "not found") are never cached. Each server
+process has its own cache; the TTL bounds staleness from writes made by
+other processes.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp import types as mt
+
+from app.core.config import settings
+from app.mcp.tool_policy import (
+    IDENTITY_ARGUMENTS,
+    Entity,
+    entities,
+    is_read_only,
+    mutated_domains,
+    tool_domain,
+)
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]
+
+
+class _Entry:
+    __slots__ = ("result", "expires_at", "domain", "entities")
+
+    def __init__(self, result: ToolResult, expires_at: float, domain: Optional[str], entities: FrozenSet[Entity]):
+        self.result = result
+        self.expires_at = expires_at
+        self.domain = domain
+        # Empty for collection reads (lists, searches)
+        self.entities = entities
+
+
+def is_error_result(result: ToolResult) -> bool:
+    """Whether a tool returned an error payload ({"error": ...}) instead of raising"""
+    structured = result.structured_content
+    if isinstance(structured, dict):
+        # Non-object returns are wrapped as {"result": ...}
+        value = structured.get("result", structured)
+        return isinstance(value, dict) and "error" in value
+    return False
+
+
+class ToolResultCache(Middleware):
+    """
+    FastMCP middleware caching read-only tool results with entity-based invalidation
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            ttl: Seconds a result is served from cache (defaults to
+                MCP_RESULT_CACHE_TTL_SECONDS)
+            max_entries: Cached results kept, least recently used dropped
+                first (defaults to MCP_RESULT_CACHE_MAX_ENTRIES)
+        """
+        self.ttl = settings.MCP_RESULT_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or settings.MCP_RESULT_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        # Invalidation indexes: entity -> keys, and domain -> collection read keys
+        self._by_entity: Dict[Entity, Set[_Key]] = {}
+        self._collections: Dict[str, Set[_Key]] = {}
+        # Bumped by every mutation of a domain; reads that straddle a bump are not stored
+        self._epochs: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(tool_name: str, arguments: Dict[str, Any]) -> _Key:
+        # Omitted and None arguments select the same defaults
+        normalized = {k: v for k, v in arguments.items() if v is not None}
+        return tool_name, json.dumps(normalized, sort_keys=True, default=str, separators=(",", ":"))
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        tool_name = context.message.name
+        arguments = context.message.arguments or {}
+        if not is_read_only(tool_name):
+            return await self._mutate(tool_name, arguments, context, call_next)
+
+        key = self._key(tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            self._remove(key)
+
+        self.misses += 1
+        domain = tool_domain(tool_name)
+        epoch = self._epochs.get(domain, 0)
+        result = await call_next(context)
+        if self._epochs.get(domain, 0) == epoch and not is_error_result(result):
+            identity = IDENTITY_ARGUMENTS.get(domain, frozenset())
+            self._store(key, _Entry(result, time.monotonic() + self.ttl, domain, entities(arguments, identity)))
+        return result
+
+    async def _mutate(self, tool_name: str, arguments: Dict[str, Any], context, call_next) -> ToolResult:
+        domains = mutated_domains(tool_name)
+        touched = entities(arguments)
+        # Before: nothing stale is served while the write runs; after: drop reads that ran meanwhile
+        self.invalidate(domains, touched)
+        try:
+            return await call_next(context)
+        finally:
+            self.invalidate(domains, touched)
+
+    def invalidate(self, domains: FrozenSet[str], touched: FrozenSet[Entity]) -> int:
+        """
+        Drop cached reads a write to these domains and entities can have changed
+
+        Args:
+            domains: Domains the write changes
+            touched: Entities named by the write
+
+        Returns:
+            Number of cached results dropped
+        """
+        for domain in domains:
+            self._epochs[domain] = self._epochs.get(domain, 0) + 1
+        stale: Set[_Key] = set()
+        for domain in domains:
+            stale |= self._collections.get(domain, set())
+        for entity in touched:
+            stale |= {key for key in self._by_entity.get(entity, ()) if self._entries[key].domain in domains}
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def _store(self, key: _Key, entry: _Entry):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        if entry.entities:
+            for entity in entry.entities:
+                self._by_entity.setdefault(entity, set()).add(key)
+        elif entry.domain is not None:
+            self._collections.setdefault(entry.domain, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: _Key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for entity in entry.entities:
+            keys = self._by_entity.get(entity)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_entity[entity]
+        if not entry.entities and entry.domain is not None:
+            self._collections.get(entry.domain, set()).discard(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_entity.clear()
+        self._collections.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+        }
+
+
+# Cache installed on the composite server (app.mcp.composite_server)
+tool_result_cache = ToolResultCache()
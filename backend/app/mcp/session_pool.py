@@ -0,0 +1,289 @@
+"""
+MCP Session Pool
+Persistent, health-checked client sessions to the composite MCP server.
+
+Opening an MCP session costs a connection plus an initialize round trip,
+so the pool keeps MCP_POOL_SIZE fastmcp clients connected and routes each
+call to the least busy one. Idle sessions are pinged every
+MCP_HEALTH_CHECK_INTERVAL_SECONDS, which also keeps their connections
+alive. A session that fails is dropped and reconnected in the background
+with exponential backoff (MCP_RECONNECT_BACKOFF_SECONDS doubling up to
+MCP_RECONNECT_BACKOFF_MAX_SECONDS), so a server that is down at startup
+is picked up once it comes back.
+
+Every call is bounded by MCP_CALL_TIMEOUT_SECONDS. A read-only call that
+fails on a broken session is retried once on another session; mutating
+calls are never retried, since the first attempt may have run.
+
+The pool implements the list_tools/call_tool part of mcp.ClientSession, so
+langchain_mcp_adapters' load_mcp_tools can build tools on top of it.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp import McpError
+from mcp import types as mt
+
+from app.core.config import settings
+from app.mcp.tool_policy import is_read_only
+
+logger = logging.getLogger(__name__)
+
+
+class MCPUnavailableError(ConnectionError):
+    """No pooled session could be connected in time"""
+
+
+class _Slot:
+    """One pooled client and its connection state"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client = None  # Connected fastmcp Client, or None
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self.next_attempt_at: Optional[float] = None
+        self.connector: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None
+
+
+class MCPSessionPool:
+    """
+    Keeps MCP client sessions open and routes calls across them
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        size: Optional[int] = None,
+        call_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        health_interval: Optional[float] = None,
+        backoff: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        """
+        Args:
+            client_factory: Returns a new, unconnected fastmcp Client
+            size: Sessions kept open (defaults to MCP_POOL_SIZE)
+            call_timeout: Seconds per call (defaults to MCP_CALL_TIMEOUT_SECONDS)
+            connect_timeout: Seconds per connection attempt, and how long a
+                call waits for a session (defaults to MCP_CONNECT_TIMEOUT_SECONDS)
+            health_interval: Seconds between pings of idle sessions, 0 = off
+                (defaults to MCP_HEALTH_CHECK_INTERVAL_SECONDS)
+            backoff: First reconnect delay, doubled after each failure
+                (defaults to MCP_RECONNECT_BACKOFF_SECONDS)
+            backoff_max: Longest reconnect delay (defaults to
+                MCP_RECONNECT_BACKOFF_MAX_SECONDS)
+        """
+        self._client_factory = client_factory
+        self.size = size or settings.MCP_POOL_SIZE
+        self.call_timeout = call_timeout or settings.MCP_CALL_TIMEOUT_SECONDS
+        self.connect_timeout = connect_timeout or settings.MCP_CONNECT_TIMEOUT_SECONDS
+        self.health_interval = settings.MCP_HEALTH_CHECK_INTERVAL_SECONDS if health_interval is None else health_interval
+        self.backoff = backoff or settings.MCP_RECONNECT_BACKOFF_SECONDS
+        self.backoff_max = backoff_max or settings.MCP_RECONNECT_BACKOFF_MAX_SECONDS
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self._available = asyncio.Event()
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._closed = False
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.health_checks = 0
+        self.health_failures = 0
+
+    async def start(self):
+        """Begin connecting every session in the background; never raises"""
+        if self._started:
+            return
+        self._started = True
+        for slot in self._slots:
+            slot.connector = asyncio.create_task(self._connect(slot))
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Wait until at least one session is connected"""
+        await self.start()
+        try:
+            await asyncio.wait_for(self._available.wait(), self.connect_timeout if timeout is None else timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _connect(self, slot: _Slot):
+        attempt = 0
+        while not self._closed:
+            client = self._client_factory()
+            try:
+                await asyncio.wait_for(client.__aenter__(), self.connect_timeout)
+            except Exception as e:
+                delay = min(self.backoff_max, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                slot.consecutive_failures += 1
+                slot.last_error = f"{type(e).__name__}: {e}"
+                slot.next_attempt_at = time.time() + delay
+                if attempt == 1:
+                    logger.warning(f"MCP session {slot.index} could not connect, retrying with backoff: {slot.last_error}")
+                asyncio.create_task(self._discard(client))
+                await asyncio.sleep(delay)
+                continue
+            slot.client, slot.next_attempt_at = client, None
+            slot.consecutive_failures = 0
+            if attempt:
+                logger.info(f"MCP session {slot.index} connected after {attempt} failed attempts")
+            self._available.set()
+            return
+
+    @staticmethod
+    async def _discard(client):
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    def _fail(self, slot: _Slot, error: BaseException):
+        """Drop a broken session and reconnect it in the background"""
+        slot.last_error = f"{type(error).__name__}: {error}"
+        if slot.client is None:
+            return
+        client, slot.client = slot.client, None
+        slot.reconnects += 1
+        logger.warning(f"MCP session {slot.index} failed, reconnecting: {slot.last_error}")
+        if not any(s.connected for s in self._slots):
+            self._available.clear()
+        asyncio.create_task(self._discard(client))
+        if not self._closed:
+            slot.connector = asyncio.create_task(self._connect(slot))
+
+    async def _acquire(self, exclude: Optional[_Slot] = None) -> _Slot:
+        await self.start()
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            candidates = [s for s in self._slots if s.connected and s is not exclude]
+            if candidates:
+                return min(candidates, key=lambda s: s.in_flight)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (exclude is not None and not self._available.is_set()):
+                errors = "; ".join(sorted({s.last_error for s in self._slots if s.last_error}))
+                raise MCPUnavailableError(f"No MCP session available: {errors or 'not connected'}")
+            try:
+                await asyncio.wait_for(self._available.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+            if exclude is not None and not any(s.connected and s is not exclude for s in self._slots):
+                # Only the failed session is connected; don't retry on it
+                raise MCPUnavailableError("No other MCP session available for a retry")
+
+    async def _run(self, operation: str, call: Callable[[Any], Any], retryable: bool):
+        self.calls += 1
+        failed: Optional[_Slot] = None
+        for attempt in range(2 if retryable else 1):
+            slot = await self._acquire(exclude=failed)
+            slot.in_flight += 1
+            try:
+                return await asyncio.wait_for(call(slot.client.session), self.call_timeout)
+            except asyncio.TimeoutError:
+                # A slow server is not a broken session; retrying would only add load
+                self.timeouts += 1
+                raise TimeoutError(f"MCP {operation} timed out after {self.call_timeout}s")
+            except McpError:
+                # The server answered with a protocol error; the session is fine
+                self.errors += 1
+                raise
+            except Exception as e:
+                self.errors += 1
+                self._fail(slot, e)
+                if not retryable or attempt:
+                    raise
+                failed = slot
+                self.retries += 1
+            finally:
+                slot.in_flight -= 1
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            for slot in self._slots:
+                if not slot.connected or slot.in_flight:
+                    continue
+                self.health_checks += 1
+                try:
+                    if not await asyncio.wait_for(slot.client.ping(), self.connect_timeout):
+                        raise ConnectionError("ping failed")
+                except Exception as e:
+                    self.health_failures += 1
+                    self._fail(slot, e)
+
+    # mcp.ClientSession subset used by langchain_mcp_adapters
+
+    async def list_tools(self, cursor: Optional[str] = None) -> mt.ListToolsResult:
+        return await self._run("list_tools", lambda session: session.list_tools(cursor=cursor), retryable=True)
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds=None,
+        progress_callback=None,
+    ) -> mt.CallToolResult:
+        return await self._run(
+            f"tool {name}",
+            lambda session: session.call_tool(
+                name, arguments, read_timeout_seconds=read_timeout_seconds, progress_callback=progress_callback
+            ),
+            retryable=is_read_only(name),
+        )
+
+    async def close(self):
+        """Disconnect every session and stop reconnecting"""
+        self._closed = True
+        tasks: List[asyncio.Task] = [s.connector for s in self._slots if s.connector and not s.connector.done()]
+        if self._health_task is not None:
+            tasks.append(self._health_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for slot in self._slots:
+            if slot.client is not None:
+                client, slot.client = slot.client, None
+                await self._discard(client)
+        self._available.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "connected": sum(s.connected for s in self._slots),
+            "in_flight": sum(s.in_flight for s in self._slots),
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "reconnects": sum(s.reconnects for s in self._slots),
+            "health_checks": self.health_checks,
+            "health_failures": self.health_failures,
+            "call_timeout_seconds": self.call_timeout,
+            "sessions": [
+                {
+                    "connected": s.connected,
+                    "in_flight": s.in_flight,
+                    "consecutive_failures": s.consecutive_failures,
+                    "last_error": s.last_error,
+                    "next_attempt_in_seconds": (
+                        round(max(0.0, s.next_attempt_at - time.time()), 1) if s.next_attempt_at else None
+                    ),
+                }
+                for s in self._slots
+            ],
+        }
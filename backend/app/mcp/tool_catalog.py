@@ -0,0 +1,87 @@
+"""
+MCP Tool Catalog
+On-disk copy of the composite server's tool definitions.
+
+MCPClientManager builds its LangChain tools from this file at startup, so
+agents and graphs get their tools without waiting for (or even reaching)
+the MCP server, then revalidates it against the live server in the
+background. The file records a hash of the definitions and the server it
+came from; a catalog for another transport or URL is ignored.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from mcp import types as mt
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+def catalog_hash(tools: List[mt.Tool]) -> str:
+    """Stable hash of tool names, descriptions and schemas (order-independent)"""
+    definitions = sorted(
+        (tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools),
+        key=lambda definition: definition["name"],
+    )
+    encoded = json.dumps(definitions, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_catalog(path: str, source: str) -> Optional[Tuple[List[mt.Tool], str]]:
+    """
+    Read a saved catalog
+
+    Args:
+        path: Catalog file
+        source: Server the caller talks to ("inprocess" or the composite URL)
+
+    Returns:
+        (tools, hash), or None if the file is missing, unreadable, or was
+        saved for another source
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CATALOG_VERSION or data.get("source") != source:
+            logger.info(f"Ignoring tool catalog {path}: saved for {data.get('source')}")
+            return None
+        tools = [mt.Tool.model_validate(definition) for definition in data["tools"]]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable tool catalog {path}: {e}")
+        return None
+    digest = catalog_hash(tools)
+    if digest != data.get("hash"):
+        logger.warning(f"Ignoring tool catalog {path}: hash mismatch")
+        return None
+    return tools, digest
+
+
+def save_catalog(path: str, source: str, tools: List[mt.Tool]) -> str:
+    """
+    Write the catalog atomically
+
+    Returns:
+        Hash of the saved definitions
+    """
+    digest = catalog_hash(tools)
+    data = {
+        "version": CATALOG_VERSION,
+        "source": source,
+        "hash": digest,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+        "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+    return digest
@@ -0,0 +1,307 @@
+"""
+MCP Tool Metrics
+Per-tool call counts, latency and payload size histograms, and error rates.
+
+ToolMetrics is FastMCP middleware; install_tool_metrics() adds it to a
+server together with a Prometheus text endpoint (GET /metrics on HTTP
+transport) and a get_server_stats tool. A call costs two clock reads, a
+few counter updates and a bisect per histogram; payload sizes are measured
+from argument JSON and the text of the result blocks, without serializing
+the result again.
+
+Errors count both raised exceptions and error payloads ({"error": ...}).
+
+With several worker processes (run_server(..., workers=N)), a scrape can
+reach any worker, so each worker also writes its counters to a file in a
+shared directory (MCP_METRICS_DIR, set up by run_server) about once a
+second, and /metrics and get_server_stats report the sum over all files.
+The answering worker writes its own file first. Files only ever grow, so
+totals never go backwards between scrapes; other workers' most recent
+calls can show up a second late.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp import types as mt
+
+from app.core.config import settings
+from app.mcp.result_cache import is_error_result
+
+logger = logging.getLogger(__name__)
+
+STATS_TOOL = "get_server_stats"
+METRICS_PATH = "/metrics"
+
+# Directory shared by the workers of one server (see run_server)
+METRICS_DIR_ENV = "MCP_METRICS_DIR"
+FLUSH_INTERVAL_SECONDS = 1.0
+
+# Histogram upper bounds (Prometheus "le")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot: above every bound
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        n = sum(self.counts)
+        if not n:
+            return None
+        rank, seen = q * n, 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def add(self, data: Dict[str, Any]):
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.total += data["total"]
+
+
+class _ToolStats:
+    __slots__ = ("calls", "errors", "latency", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.request_bytes = _Histogram(SIZE_BUCKETS)
+        self.response_bytes = _Histogram(SIZE_BUCKETS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"calls": self.calls, "errors": self.errors}
+        for attribute in ("latency", "request_bytes", "response_bytes"):
+            histogram = getattr(self, attribute)
+            data[attribute] = {"counts": histogram.counts, "total": histogram.total}
+        return data
+
+    def add(self, data: Dict[str, Any]):
+        self.calls += data["calls"]
+        self.errors += data["errors"]
+        for attribute in ("latency", "request_bytes", "response_bytes"):
+            getattr(self, attribute).add(data[attribute])
+
+
+def _response_size(result: ToolResult) -> int:
+    return sum(len(block.text) for block in result.content if block.type == "text")
+
+
+class ToolMetrics(Middleware):
+    """
+    FastMCP middleware recording per-tool latency, payload sizes and errors
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        shared_dir: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            clock: Monotonic seconds used to time calls
+            shared_dir: Directory where the workers of one server share
+                their counters (None: this process only)
+            worker_id: This worker's file name in shared_dir (defaults to the pid)
+        """
+        self.clock = clock
+        self.shared_dir = shared_dir
+        self.worker_id = worker_id or str(os.getpid())
+        self._tools: Dict[str, _ToolStats] = {}
+        self._dirty = False
+        self._flusher: Optional[asyncio.Task] = None
+        self.started_at = time.time()
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        stats = self._tools.get(name)
+        if stats is None:
+            stats = self._tools[name] = _ToolStats()
+        if self.shared_dir is not None:
+            self._dirty = True
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.ensure_future(self._flush_loop())
+        arguments = context.message.arguments
+        stats.request_bytes.observe(len(json.dumps(arguments, default=str)) if arguments else 0)
+        started = self.clock()
+        try:
+            result = await call_next(context)
+        except Exception:
+            stats.latency.observe(self.clock() - started)
+            stats.calls += 1
+            stats.errors += 1
+            raise
+        stats.latency.observe(self.clock() - started)
+        stats.calls += 1
+        if is_error_result(result):
+            stats.errors += 1
+        stats.response_bytes.observe(_response_size(result))
+        return result
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            if self._dirty:
+                self.flush()
+
+    def flush(self):
+        """Write this worker's counters to the shared directory"""
+        if self.shared_dir is None:
+            return
+        self._dirty = False
+        path = os.path.join(self.shared_dir, f"{self.worker_id}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({name: stats.to_dict() for name, stats in self._tools.items()}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write tool metrics to {path}: {e}")
+
+    def _collect(self) -> Tuple[Dict[str, _ToolStats], int]:
+        """Per-tool stats of this process, or summed over every worker; and the worker count"""
+        if self.shared_dir is None:
+            return self._tools, 1
+        self.flush()
+        merged: Dict[str, _ToolStats] = {}
+        workers = 0
+        for file_name in sorted(os.listdir(self.shared_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.shared_dir, file_name), "r", encoding="utf-8") as f:
+                    tools = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping tool metrics file {file_name}: {e}")
+                continue
+            workers += 1
+            for name, data in tools.items():
+                merged.setdefault(name, _ToolStats()).add(data)
+        return merged, workers
+
+    def clear(self):
+        self._tools.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tool summary, slowest tools (by total time) first"""
+        collected, workers = self._collect()
+        tools = {}
+        for name, stats in sorted(collected.items(), key=lambda item: -item[1].latency.total):
+            latency = stats.latency
+            tools[name] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / stats.calls, 4) if stats.calls else None,
+                "avg_ms": round(1000 * latency.total / stats.calls, 3) if stats.calls else None,
+                # Bucket upper bounds, so these over-estimate by at most one bucket
+                "p50_ms_le": 1000 * latency.quantile(0.5) if stats.calls else None,
+                "p99_ms_le": 1000 * latency.quantile(0.99) if stats.calls else None,
+                "total_seconds": round(latency.total, 3),
+                "avg_request_bytes": round(stats.request_bytes.total / max(1, sum(stats.request_bytes.counts))),
+                "avg_response_bytes": round(stats.response_bytes.total / max(1, sum(stats.response_bytes.counts))),
+            }
+        return {
+            "pid": os.getpid(),
+            "workers": workers,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "calls": sum(s.calls for s in collected.values()),
+            "errors": sum(s.errors for s in collected.values()),
+            "tools": tools,
+        }
+
+    def render_prometheus(self, server: str) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        collected, _ = self._collect()
+        lines: List[str] = []
+        families = (
+            ("mcp_tool_call_duration_seconds", "Tool call latency", "latency"),
+            ("mcp_tool_request_bytes", "Tool call argument size (JSON)", "request_bytes"),
+            ("mcp_tool_response_bytes", "Tool result text size", "response_bytes"),
+        )
+        lines += [
+            "# HELP mcp_tool_calls_total Tool calls",
+            "# TYPE mcp_tool_calls_total counter",
+        ]
+        for name, stats in collected.items():
+            lines.append(f'mcp_tool_calls_total{{server="{server}",tool="{name}"}} {stats.calls}')
+        lines += [
+            "# HELP mcp_tool_errors_total Tool calls that raised or returned an error",
+            "# TYPE mcp_tool_errors_total counter",
+        ]
+        for name, stats in collected.items():
+            lines.append(f'mcp_tool_errors_total{{server="{server}",tool="{name}"}} {stats.errors}')
+        for family, help_text, attribute in families:
+            lines += [f"# HELP {family} {help_text}", f"# TYPE {family} histogram"]
+            for name, stats in collected.items():
+                histogram: _Histogram = getattr(stats, attribute)
+                labels = f'server="{server}",tool="{name}"'
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{family}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                cumulative += histogram.counts[-1]
+                lines.append(f'{family}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"{family}_sum{{{labels}}} {histogram.total:g}")
+                lines.append(f"{family}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+# Metrics of the server running in this process (shared with the other
+# workers when run_server started it as one of several)
+tool_metrics = ToolMetrics(shared_dir=os.getenv(METRICS_DIR_ENV) or None)
+
+
+def install_tool_metrics(mcp_instance, extra_stats: Optional[Callable[[], Dict[str, Any]]] = None):
+    """
+    Add tool metrics, GET /metrics and the get_server_stats tool to a server
+
+    Does nothing if the server already has them or MCP_TOOL_METRICS is off.
+
+    Args:
+        mcp_instance: FastMCP server
+        extra_stats: Returns more sections for get_server_stats (e.g. cache stats)
+    """
+    if not settings.MCP_TOOL_METRICS or tool_metrics in mcp_instance.middleware:
+        return
+    from starlette.responses import PlainTextResponse
+
+    # Outermost, so latency is what clients see (including cache hits)
+    mcp_instance.middleware.insert(0, tool_metrics)
+
+    @mcp_instance.custom_route(METRICS_PATH, methods=["GET"], include_in_schema=False)
+    async def metrics(request):
+        return PlainTextResponse(
+            tool_metrics.render_prometheus(mcp_instance.name),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    @mcp_instance.tool(name=STATS_TOOL)
+    async def get_server_stats() -> dict:
+        """Returns per-tool call counts, latency, payload sizes and error rates of this MCP server."""
+        stats = tool_metrics.get_stats()
+        if extra_stats is not None:
+            stats.update(extra_stats())
+        return stats
@@ -0,0 +1,118 @@
+"""
+MCP Tool Policy
+Classifies composite server tools (prefixed names) as read-only or mutating.
+Read-only tools have no side effects, so identical concurrent calls can
+safely share one result.
+
+Each tool also belongs to a domain (the entity collection behind its
+server), and some arguments name a single entity (a ticket, device, user,
+...). The composite server's result cache uses this to drop only the
+cached reads a mutating call can have changed.
+"""
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+READ_ONLY_TOOLS = frozenset({
+    # ServiceNow
+    "servicenow_get_servicenow_ticket",
+    "servicenow_search_servicenow_tickets",
+    # Intune
+    "intune_get_intune_device_profile",
+    "intune_list_intune_devices",
+    # M365
+    "m365_get_m365_user_roles",
+    "m365_list_m365_users",
+    # Access
+    "access_calculate_access_risk",
+    "access_get_access_workflow_status",
+    "access_list_rbac_role_assignments",
+    # Outlook
+    "outlook_get_outlook_emails",
+    "outlook_extract_outlook_approval",
+    # Resource provisioning
+    "resource_list_resource_groups",
+    "resource_list_vms",
+    "resource_get_vm_status",
+    "resource_validate_vm_parameters",
+    "resource_list_app_services",
+    "resource_list_service_accounts",
+})
+
+
+# Server prefix -> domain
+PREFIX_DOMAINS = {
+    "servicenow": "ticket",
+    "intune": "device",
+    "m365": "user",
+    "access": "access",
+    "outlook": "email",
+    "workflow": "workflow",
+    "resource": "resource",
+}
+
+# Mutating tools that also change other servers' data
+EXTRA_MUTATED_DOMAINS = {
+    # Creates and activates the M365 user and provisions their device
+    "access_onboard_new_user": frozenset({"user", "device"}),
+}
+
+# Argument -> entity type it identifies
+ENTITY_ARGUMENTS = {
+    "ticket_id": "ticket",
+    "device_id": "device",
+    "serial_number": "device",
+    "device_serial": "device",
+    "user_email": "user",
+    "email": "user",
+    "request_id": "access_request",
+    "email_id": "email",
+    "workflow_id": "workflow",
+}
+
+# Arguments that narrow a read in a domain to one entity; reads without
+# them (lists, searches, filters) depend on the whole collection
+IDENTITY_ARGUMENTS = {
+    "ticket": frozenset({"ticket_id"}),
+    "device": frozenset({"device_id"}),
+    "user": frozenset({"user_email", "email"}),
+    "access": frozenset({"request_id"}),
+    "email": frozenset({"email_id"}),
+    "workflow": frozenset({"workflow_id"}),
+    "resource": frozenset(),
+}
+
+Entity = Tuple[str, str]
+
+
+def is_read_only(tool_name: str) -> bool:
+    """Check whether a tool is known to be free of side effects"""
+    return tool_name in READ_ONLY_TOOLS
+
+
+def tool_domain(tool_name: str) -> Optional[str]:
+    """Domain of a prefixed tool name, or None for unknown servers"""
+    return PREFIX_DOMAINS.get(tool_name.split("_", 1)[0])
+
+
+def mutated_domains(tool_name: str) -> FrozenSet[str]:
+    """Domains whose data a mutating tool can change"""
+    domain = tool_domain(tool_name)
+    own = frozenset({domain}) if domain else frozenset()
+    return own | EXTRA_MUTATED_DOMAINS.get(tool_name, frozenset())
+
+
+def entities(arguments: Dict[str, Any], only: Optional[FrozenSet[str]] = None) -> FrozenSet[Entity]:
+    """
+    Entities named by a call's arguments
+
+    Args:
+        arguments: Tool call arguments
+        only: Restrict to these argument names
+
+    Returns:
+        (entity type, id) pairs, e.g. ("ticket", "INC0000001")
+    """
+    return frozenset(
+        (ENTITY_ARGUMENTS[name], str(value))
+        for name, value in arguments.items()
+        if name in ENTITY_ARGUMENTS and value not in (None, "") and (only is None or name in only)
+    )
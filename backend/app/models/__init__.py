@@ -6,7 +6,9 @@ from .ticket import Ticket
 from .device import Device
 from .email import Email
 
-from .rbac import UserFlavor, Application, AppRole, AppPermission, UserAppRoleLink
+from .rbac import UserFlavor, Application, AppRole, AppPermission, UserAppRoleLink, RoleAssignment
+from .resource import ResourceGroup, VirtualMachine, AppService, ServiceAccount
 
 __all__ = ["User", "Role", "Token", "Conversation", "Message", "GraphCheckpoint", "AccessRequest", "Ticket", "Device", "Email", 
-           "UserFlavor", "Application", "AppRole", "AppPermission", "UserAppRoleLink"]
+           "UserFlavor", "Application", "AppRole", "AppPermission", "UserAppRoleLink", "RoleAssignment",
+           "ResourceGroup", "VirtualMachine", "AppService", "ServiceAccount"]
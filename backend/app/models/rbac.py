@@ -1,7 +1,8 @@
 
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from datetime import datetime, timezone
 
 class UserFlavor(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -50,3 +51,14 @@ class UserAppRoleLink(SQLModel, table=True):
     assigned_at: datetime = Field(default_factory=datetime.utcnow)
     
     role: Optional[AppRole] = Relationship(back_populates="users")
+
+class RoleAssignment(SQLModel, table=True):
+    """
+    Azure-style RBAC role assignment (user, role, scope).
+    """
+    __table_args__ = (UniqueConstraint("user_email", "role", "scope"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_email: str = Field(index=True)
+    role: str # e.g. "Owner", "Contributor", "Reader"
+    scope: str # Subscription, resource group or resource ID
+    assigned_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
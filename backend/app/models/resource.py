@@ -0,0 +1,59 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from datetime import datetime, timezone
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class ResourceGroup(SQLModel, table=True):
+    """Model for mock Azure resource groups"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)  # e.g., default-rg
+    location: str  # eastus, westeurope, etc.
+    tags: str = "{}"  # JSON string of resource tags
+    provisioning_state: str = "Succeeded"
+    created_date: datetime = Field(default_factory=_utcnow)
+
+class VirtualMachine(SQLModel, table=True):
+    """Model for mock Azure virtual machines (unique per resource group)"""
+    __table_args__ = (UniqueConstraint("resource_group", "name"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True)
+    resource_group: str = Field(index=True)
+    resource_id: str  # /subscriptions/.../virtualMachines/<name>
+    location: str
+    size: str  # e.g., Standard_D2s_v3
+    image: str  # e.g., UbuntuLTS
+    admin_username: str
+    private_ip: str
+    public_ip: str
+    tags: str = "{}"  # JSON string of resource tags
+    provisioning_state: str = "Succeeded"
+    power_state: str = "VM running"  # VM running, VM deallocated
+    created_date: datetime = Field(default_factory=_utcnow)
+
+class AppService(SQLModel, table=True):
+    """Model for mock Azure App Services (unique per resource group)"""
+    __table_args__ = (UniqueConstraint("resource_group", "name"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True)
+    resource_group: str = Field(index=True)
+    resource_id: str
+    location: str
+    plan: str  # F1, B1, S1, ...
+    runtime: str  # e.g., PYTHON|3.9
+    default_host_name: str
+    state: str = "Running"
+    created_date: datetime = Field(default_factory=_utcnow)
+
+class ServiceAccount(SQLModel, table=True):
+    """Model for mock service principals / managed identities (unique per resource group)"""
+    __table_args__ = (UniqueConstraint("resource_group", "name"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True)
+    resource_group: str = Field(index=True)
+    account_type: str = "ManagedIdentity"
+    client_id: str
+    object_id: str
+    created_date: datetime = Field(default_factory=_utcnow)
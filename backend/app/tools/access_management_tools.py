@@ -4,12 +4,13 @@ Handles SAP-like access request workflows, approvals, and onboarding
 Exposed via MCP server, not as LangChain tools
 """
 from typing import List, Dict, Any, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime
 
-from app.models import AccessRequest, User, Device
-from app.core.database import engine
+from app.models import AccessRequest, User, Device, RoleAssignment
+from app.core.database import engine, ensure_tables
 
 
 async def submit_access_request(user_email: str, resource: str, action: str) -> Dict[str, Any]:
@@ -251,11 +252,39 @@ async def calculate_risk(user_email: str, resource: str, action: str) -> Dict[st
 
 # --- RBAC Mock Tools ---
 
-ROLE_ASSIGNMENTS = [
+# Role assignments every environment starts with
+DEFAULT_ROLE_ASSIGNMENTS = [
     {"user_email": "alice@example.com", "role": "Contributor", "scope": "/subscriptions/sub-123/resourceGroups/default-rg"},
     {"user_email": "bob@example.com", "role": "Reader", "scope": "/subscriptions/sub-123"}
 ]
 
+_role_assignments_seeded = False
+
+async def _ensure_role_assignments():
+    """Create and seed the role assignment table on first use"""
+    global _role_assignments_seeded
+    if _role_assignments_seeded:
+        return
+    await ensure_tables(RoleAssignment)
+    async with AsyncSession(engine) as session:
+        result = await session.execute(select(RoleAssignment.id))
+        if result.first() is None:
+            for assignment in DEFAULT_ROLE_ASSIGNMENTS:
+                session.add(RoleAssignment(**assignment))
+            try:
+                await session.commit()
+            except IntegrityError:
+                pass  # Seeded concurrently by another worker
+    _role_assignments_seeded = True
+
+def _role_assignment_dict(assignment: RoleAssignment) -> Dict[str, Any]:
+    return {
+        "user_email": assignment.user_email,
+        "role": assignment.role,
+        "scope": assignment.scope,
+        "assigned_at": assignment.assigned_at.isoformat()
+    }
+
 async def assign_role(user_email: str, role: str, scope: str):
     """Assign an RBAC role to a user.
     
@@ -264,13 +293,16 @@ async def assign_role(user_email: str, role: str, scope: str):
         role: Role name (e.g., Owner, Contributor, Reader).
         scope: Azure Scope (Subscription, RG, or Resource ID).
     """
-    assignment = {
-        "user_email": user_email,
-        "role": role,
-        "scope": scope,
-        "assigned_at": datetime.utcnow().isoformat()
-    }
-    ROLE_ASSIGNMENTS.append(assignment)
+    await _ensure_role_assignments()
+    async with AsyncSession(engine) as session:
+        session.add(RoleAssignment(user_email=user_email, role=role, scope=scope))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return {
+                "status": "Success",
+                "message": f"Role '{role}' is already assigned to '{user_email}' at scope '{scope}'."
+            }
     return {
         "status": "Success",
         "message": f"Assigned role '{role}' to '{user_email}' at scope '{scope}'."
@@ -282,7 +314,11 @@ async def list_role_assignments(user_email: Optional[str] = None):
     Args:
         user_email: Filter by user email.
     """
-    if user_email:
-        return [r for r in ROLE_ASSIGNMENTS if r['user_email'] == user_email]
-    return ROLE_ASSIGNMENTS
+    await _ensure_role_assignments()
+    async with AsyncSession(engine) as session:
+        query = select(RoleAssignment).order_by(RoleAssignment.id)
+        if user_email:
+            query = query.where(RoleAssignment.user_email == user_email)
+        result = await session.execute(query)
+        return [_role_assignment_dict(r) for r in result.scalars().all()]
 
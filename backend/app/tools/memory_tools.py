@@ -1,18 +1,39 @@
 """
 Memory Tools
 Tools for reading and writing long-term memory across conversations
+
+Backed by the SQLite memory database (app.core.memory_db), so memory
+survives restarts and is shared with the A2A server process. Conversation
+context is also indexed for semantic recall (app.core.memory); entries the
+database expires, evicts or compacts leave that index too.
 """
+import logging
 from langchain.tools import tool
-from typing import Dict, Any, List
-from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple
+
+from app.core.config import settings
+from app.core.memory import semantic_memory
+from app.core.memory_db import MemoryDatabase, memory_db
+
+logger = logging.getLogger(__name__)
+
+
+def _forget(entries: List[Tuple[str, str, str]]):
+    semantic_memory.forget(entries)
+
+
+def _remember(user_id: str, conversation_id: str, key: str, value: str):
+    semantic_memory.remember(user_id, conversation_id, key, value)
 
 
-# Simple in-memory storage for demo purposes
-# In production, this should use a proper database
-_memory_store: Dict[str, Dict[str, Any]] = {
-    "user_preferences": {},
-    "conversation_context": {}
-}
+def connect_semantic_memory(db: MemoryDatabase):
+    """Keep the semantic memory in step with the context entries of db"""
+    if settings.MEMORY_SEMANTIC_SEARCH:
+        db.on_context_removed = _forget
+        db.on_context_summarized = _remember
+
+
+connect_semantic_memory(memory_db)
 
 
 @tool
@@ -38,10 +59,7 @@ def save_user_preference(
     Returns:
         Confirmation message
     """
-    if user_id not in _memory_store["user_preferences"]:
-        _memory_store["user_preferences"][user_id] = {}
-    
-    _memory_store["user_preferences"][user_id][preference_key] = preference_value
+    memory_db.set_preference(user_id, preference_key, preference_value)
     
     return f"Saved preference: {preference_key} = {preference_value}"
 
@@ -58,7 +76,7 @@ def get_user_preferences(
     Returns:
         Dictionary of user preferences
     """
-    return _memory_store["user_preferences"].get(user_id, {})
+    return memory_db.get_preferences(user_id)
 
 
 @tool
@@ -85,12 +103,9 @@ def save_conversation_context(
     Returns:
         Confirmation message
     """
-    key = f"{user_id}:{conversation_id}"
-    
-    if key not in _memory_store["conversation_context"]:
-        _memory_store["conversation_context"][key] = {}
-    
-    _memory_store["conversation_context"][key][context_key] = context_value
+    memory_db.set_context(user_id, conversation_id, context_key, context_value)
+    if settings.MEMORY_SEMANTIC_SEARCH:
+        semantic_memory.remember(user_id, conversation_id, context_key, context_value)
     
     return f"Saved context: {context_key} = {context_value}"
 
@@ -109,8 +124,7 @@ def get_conversation_context(
     Returns:
         Dictionary of conversation context
     """
-    key = f"{user_id}:{conversation_id}"
-    return _memory_store["conversation_context"].get(key, {})
+    return memory_db.get_context(user_id, conversation_id)
 
 
 @tool
@@ -127,26 +141,34 @@ def search_conversation_history(
         limit: Maximum number of results to return
     
     Returns:
-        List of matching conversation contexts
+        List of matching conversation contexts: full-text matches, then semantic matches.
+        Each has "conversation_id", "context", "source" ("full_text" or "semantic")
+        and "score" (embedding similarity; None for full-text matches)
     """
-    results = []
-    
-    # Simple keyword search through conversation contexts
-    for key, context in _memory_store["conversation_context"].items():
-        if key.startswith(f"{user_id}:"):
-            # Check if query matches any context values
-            context_str = str(context).lower()
-            if query.lower() in context_str:
-                conversation_id = key.split(":", 1)[1]
-                results.append({
-                    "conversation_id": conversation_id,
-                    "context": context
-                })
-                
-                if len(results) >= limit:
-                    break
-    
-    return results
+    # Conversations containing every query word come first (includes unindexed recent writes)
+    results = [
+        {**result, "source": "full_text", "score": None}
+        for result in memory_db.search_context(user_id, query, limit=limit)
+    ]
+    if settings.MEMORY_SEMANTIC_SEARCH and len(results) < limit:
+        try:
+            # Then the closest conversations by meaning, best-scoring entry per conversation
+            for item in semantic_memory.recall(user_id, query, limit=limit * 3):
+                conversation_id = item.value["conversation_id"]
+                if all(r["conversation_id"] != conversation_id for r in results):
+                    context = memory_db.get_context(user_id, conversation_id)
+                    # Skip entries removed since they were indexed
+                    if item.value["key"] not in context:
+                        continue
+                    results.append({
+                        "conversation_id": conversation_id,
+                        "context": context,
+                        "source": "semantic",
+                        "score": round(item.score, 4) if item.score is not None else None,
+                    })
+        except Exception as e:
+            logger.warning(f"Semantic memory search failed, using full-text results only: {e}")
+    return results[:limit]
 
 
 # List of all memory tools
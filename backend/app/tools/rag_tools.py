@@ -1,14 +1,50 @@
-
 """
 RAG Tools
 Tools for retrieving information from static documentation/SOPs.
+
+Lookups go through the in-memory SOP section index (app.core.sop_index),
+which covers every SOP in backend/docs and reloads when a file changes.
 """
 from langchain.tools import tool
-import os
+from app.core.sop_index import sop_index
+
+
+@tool
+def consult_sop(domain: str, query: str) -> str:
+    """
+    Consults the Standard Operating Procedures (SOPs).
+    Available domains:
+    - intune: Device provisioning, profiles, compliance, wipe procedures
+    - m365: M365 user creation, licenses, role assignment
+    - onboarding: New user onboarding workflow and checklist
+    - servicenow: Ticket lifecycle, priorities, SLAs, escalation
+    - access: SAP/GRC access requests, risk assessment, approvals
+    Use "all" to search every SOP.
+    
+    Args:
+        domain: SOP domain to search (see above), or "all"
+        query: The search query or question (e.g., "how to wipe device", "SLA for P1 tickets")
+        
+    Returns:
+        Relevant sections of the SOP text that match the query.
+    """
+    try:
+        resolved = sop_index.resolve_domain(domain)
+        if resolved is None:
+            available = ", ".join(sorted(sop_index.domains()))
+            return f"Error: unknown SOP domain '{domain}'. Available domains: {available}, all"
+        if not sop_index.domains():
+            return f"Error: no SOP documents found in {sop_index.sop_dir}"
+            
+        sections = sop_index.search(query, domain=resolved)
+        if not sections:
+            return "No specific sections found matching your query in the SOP. Please try a broader search term like 'enrollment' or 'compliance'."
+            
+        return "\n---\n".join(section.text for section in sections) # Return top 3 matching sections
+        
+    except Exception as e:
+        return f"Error reading SOP: {str(e)}"
 
-# Define path to SOPs relative to possible execution contexts or absolute
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-SOP_PATH = os.path.join(BASE_DIR, "docs", "intune_device_provisioning_sop_v1.txt")
 
 @tool
 def consult_intune_sop(query: str) -> str:
@@ -27,45 +63,4 @@ def consult_intune_sop(query: str) -> str:
     Returns:
         Relevant sections of the SOP text that match the query.
     """
-    if not os.path.exists(SOP_PATH):
-        return f"Error: SOP document not found at {SOP_PATH}"
-        
-    try:
-        with open(SOP_PATH, "r", encoding="utf-8") as f:
-            content = f.read()
-            
-        # Simple keyword/semantic-ish search strategy for this single file:
-        # 1. If query is very short, return list of headers
-        # 2. Split content by headers (##) or sections
-        # 3. Return sections containing the keywords from the query
-        
-        query_lower = query.lower()
-        
-        # Split into sections based on Markdown headers
-        # This is a naive split but effective for structured MD/Text
-        sections = content.split("## ")
-        
-        results = []
-        for section in sections:
-            section_lower = section.lower()
-            # Simple keyword matching: check if any significant word from query is in section
-            # Excluding common stop words is better, but naive check works for specific nouns provided in definitions.
-            
-            # Check for exact phrase matching or significant keyword overlap
-            if query_lower in section_lower:
-                results.append("## " + section)
-                continue
-                
-            # Fallback: Check if words match
-            words = [w for w in query_lower.split() if len(w) > 3]
-            match_count = sum(1 for w in words if w in section_lower)
-            if match_count > 0 and match_count >= len(words) * 0.5: # 50% keyword match
-                results.append("## " + section)
-                
-        if not results:
-            return "No specific sections found matching your query in the SOP. Please try a broader search term like 'enrollment' or 'compliance'."
-            
-        return "\n---\n".join(results[:3]) # Return top 3 matching sections
-        
-    except Exception as e:
-        return f"Error reading SOP: {str(e)}"
+    return consult_sop.invoke({"domain": "intune", "query": query})
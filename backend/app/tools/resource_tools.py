@@ -1,25 +1,28 @@
+"""
+Resource Provisioning Tools
+Mock Azure resource groups, VMs, App Services and service accounts.
 
+State lives in the shared database (app.models.resource), so every
+composite MCP server worker and the backend see the same resources.
+"""
 from typing import List, Optional, Dict
+import json
 import random
 import uuid
 import datetime
 
-# Mock database simulating Azure Resources
-# Structure: {
-#   "resource_groups": { "rg-name": { "location": "eastus", "tags": {} } },
-#   "vms": { "vm-name": { ...vm_details... } },
-#   "app_services": { "app-name": { ...app_details... } },
-#   "service_accounts": { "sa-name": { ...sa_details... } }
-# }
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-RESOURCE_GROUPS = {
+from app.core.database import engine, ensure_tables
+from app.models import ResourceGroup, VirtualMachine, AppService, ServiceAccount
+
+# Resource groups every environment starts with
+DEFAULT_RESOURCE_GROUPS = {
     "default-rg": {"location": "eastus", "tags": {"environment": "dev"}}
 }
 
-VMS = {}
-APP_SERVICES = {}
-SERVICE_ACCOUNTS = {}
-
 # Common Azure VM Sizes
 VM_SIZES = [
     "Standard_B1s", "Standard_B2s", "Standard_D2s_v3", "Standard_D4s_v3", 
@@ -42,11 +45,81 @@ IMAGES = [
 
 LOCATIONS = ["eastus", "westus", "northeurope", "westeurope", "southeastasia"]
 
-def list_resource_groups():
+_seeded = False
+
+async def _session() -> AsyncSession:
+    """Session on the shared database, creating and seeding the resource tables on first use"""
+    global _seeded
+    if not _seeded:
+        await ensure_tables(ResourceGroup, VirtualMachine, AppService, ServiceAccount)
+        async with AsyncSession(engine) as session:
+            existing = set((await session.execute(select(ResourceGroup.name))).scalars().all())
+            for name, group in DEFAULT_RESOURCE_GROUPS.items():
+                if name not in existing:
+                    session.add(ResourceGroup(name=name, location=group["location"], tags=json.dumps(group["tags"])))
+            try:
+                await session.commit()
+            except IntegrityError:
+                pass  # Seeded concurrently by another worker
+        _seeded = True
+    return AsyncSession(engine)
+
+async def _group_exists(session: AsyncSession, name: str) -> bool:
+    result = await session.execute(select(ResourceGroup.id).where(ResourceGroup.name == name))
+    return result.first() is not None
+
+def _vm_dict(vm: VirtualMachine) -> Dict:
+    return {
+        "id": vm.resource_id,
+        "name": vm.name,
+        "resource_group": vm.resource_group,
+        "location": vm.location,
+        "size": vm.size,
+        "image": vm.image,
+        "os_profile": {
+            "admin_username": vm.admin_username,
+            "computer_name": vm.name
+        },
+        "network_profile": {
+            "private_ip": vm.private_ip,
+            "public_ip": vm.public_ip
+        },
+        "tags": json.loads(vm.tags),
+        "provisioning_state": vm.provisioning_state,
+        "power_state": vm.power_state,
+        "created_at": vm.created_date.isoformat()
+    }
+
+def _app_dict(app: AppService) -> Dict:
+    return {
+        "id": app.resource_id,
+        "name": app.name,
+        "resource_group": app.resource_group,
+        "location": app.location,
+        "plan": app.plan,
+        "runtime": app.runtime,
+        "default_host_name": app.default_host_name,
+        "state": app.state,
+        "created_at": app.created_date.isoformat()
+    }
+
+def _service_account_dict(sa: ServiceAccount) -> Dict:
+    return {
+        "name": sa.name,
+        "resource_group": sa.resource_group,
+        "type": sa.account_type,
+        "client_id": sa.client_id,
+        "object_id": sa.object_id,
+        "created_at": sa.created_date.isoformat()
+    }
+
+async def list_resource_groups():
     """List all available Azure Resource Groups."""
-    return list(RESOURCE_GROUPS.keys())
+    async with await _session() as session:
+        result = await session.execute(select(ResourceGroup.name).order_by(ResourceGroup.id))
+        return list(result.scalars().all())
 
-def create_resource_group(name: str, location: str, tags: Optional[Dict[str, str]] = None):
+async def create_resource_group(name: str, location: str, tags: Optional[Dict[str, str]] = None):
     """Create a new Azure Resource Group.
     
     Args:
@@ -54,53 +127,62 @@ def create_resource_group(name: str, location: str, tags: Optional[Dict[str, str
         location: Azure region (e.g., 'eastus', 'westeurope').
         tags: Optional dictionary of tags (e.g., {'env': 'production'}).
     """
-    if name in RESOURCE_GROUPS:
-        return f"Resource Group '{name}' already exists."
-    
     if location not in LOCATIONS:
         return f"Invalid location. Allowed values: {', '.join(LOCATIONS)}"
 
-    RESOURCE_GROUPS[name] = {
-        "location": location,
-        "tags": tags or {},
-        "provisioning_state": "Succeeded"
-    }
+    async with await _session() as session:
+        if await _group_exists(session, name):
+            return f"Resource Group '{name}' already exists."
+        session.add(ResourceGroup(name=name, location=location, tags=json.dumps(tags or {})))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return f"Resource Group '{name}' already exists."
     return f"Successfully created Resource Group '{name}' in '{location}'."
 
 # --- VM Tools ---
 
-def list_vms(resource_group: Optional[str] = None):
+async def list_vms(resource_group: Optional[str] = None):
     """List virtual machines, optionally filtered by resource group.
     
     Args:
         resource_group: Filter by specific resource group name.
     """
-    if resource_group:
-        if resource_group not in RESOURCE_GROUPS:
-            return f"Resource group '{resource_group}' does not exist."
-        return [vm for vm in VMS.values() if vm['resource_group'] == resource_group]
-    return list(VMS.values())
+    async with await _session() as session:
+        query = select(VirtualMachine).order_by(VirtualMachine.id)
+        if resource_group:
+            if not await _group_exists(session, resource_group):
+                return f"Resource group '{resource_group}' does not exist."
+            query = query.where(VirtualMachine.resource_group == resource_group)
+        result = await session.execute(query)
+        return [_vm_dict(vm) for vm in result.scalars().all()]
+
+async def _get_vm(session: AsyncSession, name: str, resource_group: str) -> Optional[VirtualMachine]:
+    result = await session.execute(
+        select(VirtualMachine).where(VirtualMachine.resource_group == resource_group, VirtualMachine.name == name)
+    )
+    return result.scalars().first()
 
-def get_vm_status(name: str, resource_group: str):
+async def get_vm_status(name: str, resource_group: str):
     """Get the runtime view and status of a specific VM.
     
     Args:
         name: The name of the VM.
         resource_group: The resource group the VM belongs to.
     """
-    key = f"{resource_group}/{name}"
-    vm = VMS.get(key)
+    async with await _session() as session:
+        vm = await _get_vm(session, name, resource_group)
     if not vm:
         return f"VM '{name}' not found in resource group '{resource_group}'."
     
     return {
-        "name": vm['name'],
-        "status": vm['provisioning_state'], # "Succeeded", "Failed" etc for provisioning
-        "power_state": vm['power_state'],   # "VM running", "VM deallocated"
-        "public_ip": vm.get('public_ip', 'N/A')
+        "name": vm.name,
+        "status": vm.provisioning_state, # "Succeeded", "Failed" etc for provisioning
+        "power_state": vm.power_state,   # "VM running", "VM deallocated"
+        "public_ip": vm.public_ip or 'N/A'
     }
 
-def validate_vm_parameters(name: str, resource_group: str, image: str, size: str, location: str):
+async def validate_vm_parameters(name: str, resource_group: str, image: str, size: str, location: str):
     """Validate parameters before creating a VM. Returns 'Valid' or error message.
     
     Args:
@@ -111,8 +193,9 @@ def validate_vm_parameters(name: str, resource_group: str, image: str, size: str
         location: Azure Region.
     """
     errors = []
-    if resource_group not in RESOURCE_GROUPS:
-        errors.append(f"Resource Group '{resource_group}' does not exist.")
+    async with await _session() as session:
+        if not await _group_exists(session, resource_group):
+            errors.append(f"Resource Group '{resource_group}' does not exist.")
     if image not in IMAGES:
         # Allow custom string but warn
         pass 
@@ -125,7 +208,7 @@ def validate_vm_parameters(name: str, resource_group: str, image: str, size: str
         return "Validation Failed: " + "; ".join(errors)
     return "Valid"
 
-def provision_vm(
+async def provision_vm(
     name: str, 
     resource_group: str, 
     image: str, 
@@ -145,104 +228,104 @@ def provision_vm(
         location: Azure Region (e.g., 'eastus').
         tags: Optional resource tags.
     """
-    # 1. Validation
-    if resource_group not in RESOURCE_GROUPS:
-        return f"Error: Resource Group '{resource_group}' does not exist. Please create it first."
-    
-    key = f"{resource_group}/{name}"
-    if key in VMS:
-        return f"Error: VM '{name}' already exists in '{resource_group}'."
-
-    # 2. Mock Creation Process
-    vm_id = str(uuid.uuid4())
-    private_ip = f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}"
-    public_ip = f"{random.randint(20, 200)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
-    
-    vm_data = {
-        "id": f"/subscriptions/{uuid.uuid4()}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{name}",
-        "name": name,
-        "resource_group": resource_group,
-        "location": location,
-        "size": size,
-        "image": image,
-        "os_profile": {
-            "admin_username": admin_username,
-            "computer_name": name
-        },
-        "network_profile": {
-            "private_ip": private_ip,
-            "public_ip": public_ip
-        },
-        "tags": tags or {},
-        "provisioning_state": "Succeeded",
-        "power_state": "VM running",
-        "created_at": datetime.datetime.now().isoformat()
-    }
-    
-    VMS[key] = vm_data
+    async with await _session() as session:
+        # 1. Validation
+        if not await _group_exists(session, resource_group):
+            return f"Error: Resource Group '{resource_group}' does not exist. Please create it first."
+        
+        if await _get_vm(session, name, resource_group):
+            return f"Error: VM '{name}' already exists in '{resource_group}'."
+
+        # 2. Mock Creation Process
+        private_ip = f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        public_ip = f"{random.randint(20, 200)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        
+        resource_id = f"/subscriptions/{uuid.uuid4()}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{name}"
+        session.add(VirtualMachine(
+            name=name,
+            resource_group=resource_group,
+            resource_id=resource_id,
+            location=location,
+            size=size,
+            image=image,
+            admin_username=admin_username,
+            private_ip=private_ip,
+            public_ip=public_ip,
+            tags=json.dumps(tags or {}),
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Created concurrently (e.g. by another server worker)
+            return f"Error: VM '{name}' already exists in '{resource_group}'."
     
     return {
         "status": "Success",
         "message": f"VM '{name}' provisioned successfully in '{resource_group}'.",
         "details": {
-            "id": vm_data["id"],
+            "id": resource_id,
             "public_ip": public_ip,
             "private_ip": private_ip
         }
     }
 
-def stop_vm(name: str, resource_group: str):
+async def _set_power_state(name: str, resource_group: str, power_state: str, unchanged: str, done: str):
+    async with await _session() as session:
+        vm = await _get_vm(session, name, resource_group)
+        if not vm:
+            return f"VM '{name}' not found in '{resource_group}'."
+        if vm.power_state == power_state:
+            return unchanged
+        vm.power_state = power_state
+        session.add(vm)
+        await session.commit()
+    return done
+
+async def stop_vm(name: str, resource_group: str):
     """Stop (Deallocate) a running VM.
     
     Args:
         name: Name of the VM.
         resource_group: Resource Group of the VM.
     """
-    key = f"{resource_group}/{name}"
-    vm = VMS.get(key)
-    if not vm:
-        return f"VM '{name}' not found in '{resource_group}'."
-    
-    if vm['power_state'] == "VM deallocated":
-        return f"VM '{name}' is already stopped (deallocated)."
-        
-    vm['power_state'] = "VM deallocated"
-    return f"VM '{name}' in '{resource_group}' has been successfully deallocated."
+    return await _set_power_state(
+        name, resource_group, "VM deallocated",
+        f"VM '{name}' is already stopped (deallocated).",
+        f"VM '{name}' in '{resource_group}' has been successfully deallocated."
+    )
 
-def start_vm(name: str, resource_group: str):
+async def start_vm(name: str, resource_group: str):
     """Start a stopped VM.
     
     Args:
         name: Name of the VM.
         resource_group: Resource Group of the VM.
     """
-    key = f"{resource_group}/{name}"
-    vm = VMS.get(key)
-    if not vm:
-        return f"VM '{name}' not found in '{resource_group}'."
-    
-    if vm['power_state'] == "VM running":
-        return f"VM '{name}' is already running."
-        
-    vm['power_state'] = "VM running"
-    return f"VM '{name}' in '{resource_group}' has been started."
+    return await _set_power_state(
+        name, resource_group, "VM running",
+        f"VM '{name}' is already running.",
+        f"VM '{name}' in '{resource_group}' has been started."
+    )
 
 
 # --- App Service Tools ---
 
-def list_app_services(resource_group: Optional[str] = None):
+async def list_app_services(resource_group: Optional[str] = None):
     """List App Services, optionally filtered by resource group.
     
     Args:
         resource_group: Filter by specific resource group name.
     """
-    if resource_group:
-        if resource_group not in RESOURCE_GROUPS:
-            return f"Resource group '{resource_group}' does not exist."
-        return [app for app in APP_SERVICES.values() if app['resource_group'] == resource_group]
-    return list(APP_SERVICES.values())
+    async with await _session() as session:
+        query = select(AppService).order_by(AppService.id)
+        if resource_group:
+            if not await _group_exists(session, resource_group):
+                return f"Resource group '{resource_group}' does not exist."
+            query = query.where(AppService.resource_group == resource_group)
+        result = await session.execute(query)
+        return [_app_dict(app) for app in result.scalars().all()]
 
-def create_app_service(
+async def create_app_service(
     name: str,
     resource_group: str,
     plan: str,
@@ -258,31 +341,34 @@ def create_app_service(
         runtime: Runtime stack (e.g., 'DOTNET|6.0', 'PYTHON|3.9', 'NODE|16-lts').
         location: Azure Region.
     """
-    if resource_group not in RESOURCE_GROUPS:
-        return f"Error: Resource Group '{resource_group}' does not exist."
-    
-    key = f"{resource_group}/{name}"
-    if key in APP_SERVICES:
-        return f"Error: App Service '{name}' already exists in '{resource_group}'."
+    async with await _session() as session:
+        if not await _group_exists(session, resource_group):
+            return f"Error: Resource Group '{resource_group}' does not exist."
         
-    if plan not in APP_SERVICE_PLANS:
-        return f"Error: Invalid plan '{plan}'. Allowed: {', '.join(APP_SERVICE_PLANS)}"
+        existing = await session.execute(
+            select(AppService.id).where(AppService.resource_group == resource_group, AppService.name == name)
+        )
+        if existing.first() is not None:
+            return f"Error: App Service '{name}' already exists in '{resource_group}'."
+            
+        if plan not in APP_SERVICE_PLANS:
+            return f"Error: Invalid plan '{plan}'. Allowed: {', '.join(APP_SERVICE_PLANS)}"
 
-    default_host = f"{name}.azurewebsites.net"
-    
-    app_data = {
-        "id": f"/subscriptions/{uuid.uuid4()}/resourceGroups/{resource_group}/providers/Microsoft.Web/sites/{name}",
-        "name": name,
-        "resource_group": resource_group,
-        "location": location,
-        "plan": plan,
-        "runtime": runtime,
-        "default_host_name": default_host,
-        "state": "Running",
-        "created_at": datetime.datetime.now().isoformat()
-    }
-    
-    APP_SERVICES[key] = app_data
+        default_host = f"{name}.azurewebsites.net"
+        
+        session.add(AppService(
+            name=name,
+            resource_group=resource_group,
+            resource_id=f"/subscriptions/{uuid.uuid4()}/resourceGroups/{resource_group}/providers/Microsoft.Web/sites/{name}",
+            location=location,
+            plan=plan,
+            runtime=runtime,
+            default_host_name=default_host,
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return f"Error: App Service '{name}' already exists in '{resource_group}'."
     
     return {
         "status": "Success",
@@ -292,11 +378,13 @@ def create_app_service(
 
 # --- Service Account Tools ---
 
-def list_service_accounts():
+async def list_service_accounts():
     """List all Service Accounts (Mock Service Principals/Managed Identities)."""
-    return list(SERVICE_ACCOUNTS.values())
+    async with await _session() as session:
+        result = await session.execute(select(ServiceAccount).order_by(ServiceAccount.id))
+        return [_service_account_dict(sa) for sa in result.scalars().all()]
 
-def create_service_account(name: str, resource_group: str, type: str = "ManagedIdentity"):
+async def create_service_account(name: str, resource_group: str, type: str = "ManagedIdentity"):
     """Create a new Service Account (Managed Identity).
     
     Args:
@@ -304,26 +392,30 @@ def create_service_account(name: str, resource_group: str, type: str = "ManagedI
         resource_group: Resource Group to store it in.
         type: Type of account (default: ManagedIdentity).
     """
-    if resource_group not in RESOURCE_GROUPS:
-        return f"Error: Resource Group '{resource_group}' does not exist."
+    async with await _session() as session:
+        if not await _group_exists(session, resource_group):
+            return f"Error: Resource Group '{resource_group}' does not exist."
 
-    key = f"{resource_group}/{name}"
-    if key in SERVICE_ACCOUNTS:
-        return f"Error: Service Account '{name}' already exists."
+        existing = await session.execute(
+            select(ServiceAccount.id).where(ServiceAccount.resource_group == resource_group, ServiceAccount.name == name)
+        )
+        if existing.first() is not None:
+            return f"Error: Service Account '{name}' already exists."
+            
+        client_id = str(uuid.uuid4())
+        object_id = str(uuid.uuid4())
         
-    client_id = str(uuid.uuid4())
-    object_id = str(uuid.uuid4())
-    
-    sa_data = {
-        "name": name,
-        "resource_group": resource_group,
-        "type": type,
-        "client_id": client_id,
-        "object_id": object_id,
-        "created_at": datetime.datetime.now().isoformat()
-    }
-    
-    SERVICE_ACCOUNTS[key] = sa_data
+        session.add(ServiceAccount(
+            name=name,
+            resource_group=resource_group,
+            account_type=type,
+            client_id=client_id,
+            object_id=object_id,
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return f"Error: Service Account '{name}' already exists."
     
     return {
         "status": "Success",
@@ -10,9 +10,16 @@ from app.agents.graph import create_supervisor_graph
 from datetime import datetime
 import json
 from langchain_core.messages import HumanMessage
+from app.core.llm_scheduler import Priority, llm_call_context
+from app.core.rag import vector_store_registry
+from app.core.sop_index import sop_index
+from app.core.memory import warm_memory_store
+from app.core.memory_db import memory_db
+from app.mcp.mcp_client_langgraph import mcp_manager
+import asyncio
 
 # Import API routers
-from app.api import auth, users, onboarding, rbac
+from app.api import auth, users, onboarding, rbac, metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +28,19 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # 1. Init DB
     await init_db()
+
+    # Warm the SOP section index, embedding model and FAISS index off the event loop
+    if settings.RAG_WARMUP_ON_STARTUP:
+        async def warm_rag():
+            try:
+                await asyncio.to_thread(sop_index.domains)
+                await asyncio.to_thread(vector_store_registry.warm)
+                logger.info("RAG index warmed")
+            except Exception as e:
+                logger.warning(f"RAG warm-up failed: {e}")
+        warmup_task = asyncio.create_task(warm_rag())
+    if settings.MEMORY_WARMUP_ON_STARTUP:
+        warm_memory_store(background=True)
     
     # 2. Init Checkpointer & Graph
     # Use manual connection to avoid parsing issues
@@ -34,6 +54,11 @@ async def lifespan(app: FastAPI):
         
         yield
         # cleanup happens on exit
+        if settings.RAG_WARMUP_ON_STARTUP and not warmup_task.done():
+            warmup_task.cancel()
+        # Write buffered memory_tools entries
+        await asyncio.to_thread(memory_db.close)
+        await mcp_manager.close()
 
 app = FastAPI(title="Antigravity Backend", lifespan=lifespan)
 
@@ -50,6 +75,7 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(onboarding.router, prefix="/api")
 app.include_router(rbac.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 # Import and include data router
 from app.api import data
@@ -92,31 +118,33 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 inputs["workflow"] = workflow
             
             # 2. Stream events from graph
-            async for event in graph_runnable.astream_events(
-                inputs, 
-                config, 
-                version="v1"
-            ):
-                kind = event["event"]
+            # Interactive chat is scheduled ahead of background LLM work
+            with llm_call_context(Priority.INTERACTIVE, thread_id=client_id):
+                async for event in graph_runnable.astream_events(
+                    inputs, 
+                    config, 
+                    version="v1"
+                ):
+                    kind = event["event"]
                 
-                # Filter for useful events to stream to frontend
-                if kind == "on_chat_model_stream":
-                    content = event["data"]["chunk"].content
-                    if content:
-                        await websocket.send_json({
-                            "type": "token",
-                            "value": content
-                        })
-                elif kind == "on_chain_end":
-                    # Check if it is the final output from a node
-                    data = event["data"].get("output")
-                    if data and isinstance(data, dict) and "messages" in data:
-                        last_msg = data["messages"][-1]
-                        await websocket.send_json({
-                            "type": "message",
-                            "agent": "Supervisor", # TODO: Dynamic agent name
-                            "content": last_msg.content
-                        })
+                    # Filter for useful events to stream to frontend
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            await websocket.send_json({
+                                "type": "token",
+                                "value": content
+                            })
+                    elif kind == "on_chain_end":
+                        # Check if it is the final output from a node
+                        data = event["data"].get("output")
+                        if data and isinstance(data, dict) and "messages" in data:
+                            last_msg = data["messages"][-1]
+                            await websocket.send_json({
+                                "type": "message",
+                                "agent": "Supervisor", # TODO: Dynamic agent name
+                                "content": last_msg.content
+                            })
 
     except WebSocketDisconnect:
         logger.info(f"Client #{client_id} disconnected")
@@ -0,0 +1,112 @@
+"""
+Hybrid Retrieval Benchmark
+Compares vector, BM25 and hybrid (RRF + BM25 fast path) retrieval on the SOPs.
+
+Queries are derived from the corpus itself:
+- identifier queries: tokens such as function names or ticket numbers
+  that occur in exactly one chunk
+- sentence queries: a sentence taken verbatim from a chunk
+A query counts as recalled when a chunk containing the query text is in the
+top k. Reports recall@k and p50/p95 latency per mode.
+
+Usage:
+    python scripts/bench_hybrid_retrieval.py
+    python scripts/bench_hybrid_retrieval.py --k 3 --fake-embeddings   # offline run
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.bm25 import BM25Index, tokenize
+from app.core.ingestion import ingest_documents
+from app.core.llm import get_embeddings
+from app.core.rag import VectorStoreRegistry
+
+
+def build_queries(registry: VectorStoreRegistry, bm25: BM25Index):
+    """Derive (kind, query, relevant chunk ids) triples from the indexed chunks"""
+    docs = registry.get_vectorstore().docstore._dict
+    queries = []
+
+    # Identifiers unique to one chunk
+    for term, postings in bm25.postings.items():
+        if len(postings) == 1 and re.search(r"[0-9_]", term) and len(term) > 3:
+            queries.append(("identifier", term, {bm25.doc_ids[postings[0][0]]}))
+
+    # One verbatim sentence per chunk
+    for doc_id, doc in docs.items():
+        sentences = [s.strip(" -*#") for s in re.split(r"[.\n]", doc.page_content)]
+        sentences = [s for s in sentences if len(tokenize(s)) >= 5]
+        if sentences:
+            sentence = sentences[len(sentences) // 2]
+            relevant = {other_id for other_id, other in docs.items() if sentence in other.page_content}
+            queries.append(("sentence", sentence, relevant))
+    return queries
+
+
+def run_mode(registry: VectorStoreRegistry, queries, mode: str, k: int):
+    latencies, hits = [], {"identifier": [], "sentence": []}
+    fast_path_before = registry.queries_by_mode.get("bm25_fast_path", 0)
+    for kind, query, relevant in queries:
+        started = time.perf_counter()
+        docs = registry.search(query, k=k, mode=mode)
+        latencies.append(time.perf_counter() - started)
+        hits[kind].append(any(doc.id in relevant for doc in docs))
+
+    latencies.sort()
+    result = {
+        "mode": mode,
+        "queries": len(queries),
+        "p50_ms": round(1000 * latencies[len(latencies) // 2], 3),
+        "p95_ms": round(1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+    }
+    for kind, kind_hits in hits.items():
+        if kind_hits:
+            result[f"recall@{k}_{kind}"] = round(statistics.mean(kind_hits), 3)
+    result[f"recall@{k}"] = round(statistics.mean(hits["identifier"] + hits["sentence"]), 3)
+    if mode == "hybrid":
+        fast = registry.queries_by_mode.get("bm25_fast_path", 0) - fast_path_before
+        result["bm25_fast_path_rate"] = round(fast / len(queries), 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector vs BM25 vs hybrid retrieval")
+    parser.add_argument("--docs", default="./docs", help="Documents to index")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="Use deterministic fake embeddings (no model download; vector recall is meaningless)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    embeddings = DeterministicFakeEmbedding(size=384) if args.fake_embeddings else get_embeddings()
+    with tempfile.TemporaryDirectory() as index_path:
+        ingest_documents(args.docs, index_path, embeddings,
+                         chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        registry = VectorStoreRegistry(index_path=index_path, embeddings_factory=lambda: embeddings)
+        registry.warm()
+        queries = build_queries(registry, BM25Index.load(index_path))
+        report = [run_mode(registry, queries, mode, args.k) for mode in ("vector", "bm25", "hybrid")]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for result in report:
+        print(f"\n=== {result.pop('mode')} ===")
+        for key, value in result.items():
+            print(f"  {key:<28} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+MCP Transport Benchmark
+Compares tool-call latency through the agents' MCP client on each transport.
+
+  direct     the composite server's tool called without any MCP client
+             (lower bound: tool code only)
+  inprocess  MCP_TRANSPORT=inprocess, FastMCP in-memory client
+  http       MCP_TRANSPORT=http against the composite server at --url;
+             with --spawn-server a server is started on a free port
+
+Calls go through the LangChain tools returned by MCPClientManager, i.e. the
+path agents use. The composite server's result cache is disabled so every
+call reaches the tool. Reports p50/p99 latency at concurrency 1 and
+calls/sec at each --concurrency level.
+
+Usage:
+    python scripts/bench_mcp_transport.py --spawn-server
+    python scripts/bench_mcp_transport.py --transports inprocess --calls 500
+    python scripts/bench_mcp_transport.py --url http://localhost:8001/mcp --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ["MCP_RESULT_CACHE"] = "false"
+
+from app.core.config import settings
+from app.mcp.mcp_client_langgraph import MCPClientManager
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(1000 * samples[len(samples) // 2], 3),
+        "p99_ms": round(1000 * samples[min(len(samples) - 1, int(0.99 * len(samples)))], 3),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(timeout: float = 60.0):
+    """Start the composite server over HTTP and wait until its port accepts connections"""
+    port = free_port()
+    env = {**os.environ, "MCP_TRANSPORT": "http", "MCP_SERVER_PORT": str(port), "MCP_RESULT_CACHE": "false"}
+    process = subprocess.Popen(
+        [sys.executable, "app/mcp/composite_server.py"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Composite server exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process, f"http://127.0.0.1:{port}/mcp"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Composite server not listening on port {port} after {timeout}s")
+
+
+async def make_caller(transport: str, tool_name: str):
+    """Returns (call, close) for one transport"""
+    if transport == "direct":
+        from app.mcp.composite_server import mcp
+        tool = (await mcp.get_tools())[tool_name]
+
+        async def close():
+            pass
+        return tool.run, close
+
+    settings.MCP_TRANSPORT = transport
+    manager = MCPClientManager()
+    tools = await manager.get_tools_by_names([tool_name])
+    if not tools:
+        raise RuntimeError(f"Tool {tool_name} not found over {transport}")
+    return tools[0].ainvoke, manager.close
+
+
+async def bench(transport: str, tool_name: str, arguments: dict, calls: int, concurrency_levels):
+    call, close = await make_caller(transport, tool_name)
+    try:
+        for _ in range(min(10, calls)):  # Warm-up: connections, imports, first-call paths
+            await call(arguments)
+
+        samples = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            await call(arguments)
+            samples.append(time.perf_counter() - started)
+        row = {"transport": transport, **percentiles(samples)}
+
+        for concurrency in concurrency_levels:
+            remaining = calls
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    await call(arguments)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+            row[f"calls_per_sec@{concurrency}"] = round(calls / (time.perf_counter() - started), 1)
+        return row
+    finally:
+        await close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare MCP tool-call latency across transports")
+    parser.add_argument("--transports", default="direct,inprocess,http")
+    parser.add_argument("--tool", default="resource_list_resource_groups", help="Tool to call")
+    parser.add_argument("--args", default="{}", help="Tool arguments as JSON")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--url", default=settings.MCP_COMPOSITE_URL)
+    parser.add_argument("--spawn-server", action="store_true", help="Start a composite server for the http run")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    transports = [t for t in args.transports.split(",") if t]
+    concurrency_levels = [int(c) for c in args.concurrency.split(",") if c]
+    arguments = json.loads(args.args)
+
+    server = None
+    if "http" in transports and args.spawn_server:
+        print("Starting composite server...", file=sys.stderr)
+        server, args.url = spawn_server()
+    settings.MCP_COMPOSITE_URL = args.url
+
+    rows = []
+    try:
+        for transport in transports:
+            print(f"Benchmarking {transport}...", file=sys.stderr)
+            try:
+                rows.append(asyncio.run(bench(transport, args.tool, arguments, args.calls, concurrency_levels)))
+            except Exception as e:
+                print(f"  {transport} skipped: {e}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps({"tool": args.tool, "calls": args.calls, "results": rows}, indent=2))
+        return
+    for row in rows:
+        throughput = ", ".join(f"{k.split('@')[1]}x: {v}/s" for k, v in row.items() if k.startswith("calls_per_sec"))
+        print(f"{row['transport']:>10}: p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms | {throughput}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Memory Store Benchmark
+Measures the SQLite memory database behind memory_tools at scale.
+
+Loads N conversation context entries (plus N/10 preferences) through the
+write-behind buffer, then reports write throughput and p50/p99 latency of
+preference lookups, conversation context lookups and full-text history
+search, plus the cost of a usage scan and a compaction pass. With
+--baseline the same lookups and searches are timed against the previous
+in-memory dict and substring scan for comparison.
+
+Usage:
+    python scripts/bench_memory_store.py                 # 1M entries
+    python scripts/bench_memory_store.py --n 100000 --baseline
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.memory_db import MemoryDatabase
+
+WORDS = (
+    "network vpn outage printer laptop password reset mailbox license sap module access "
+    "ticket escalation onboarding device wipe enrollment compliance teams sharepoint "
+    "outlook sync firewall dns wifi badge payroll report migration backup restore"
+).split()
+CONVERSATIONS_PER_USER = 20
+KEYS = ("current_project", "active_ticket", "decision", "action_item", "device")
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(1000 * samples[len(samples) // 2], 3),
+        "p99_ms": round(1000 * samples[min(len(samples) - 1, int(0.99 * len(samples)))], 3),
+    }
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def entries(n, rng):
+    """(user_id, conversation_id, key, value) tuples, 100 entries per user"""
+    per_user = CONVERSATIONS_PER_USER * len(KEYS)
+    for i in range(n):
+        user, rest = divmod(i, per_user)
+        conversation, key = divmod(rest, len(KEYS))
+        value = " ".join(rng.choices(WORDS, k=6)) + f" INC{i:07d}"
+        yield f"user_{user}", f"conv_{conversation}", KEYS[key], value
+
+
+def legacy_search(store, user_id, query, limit=5):
+    # The scan memory_tools used before the SQLite store
+    results = []
+    for key, context in store["conversation_context"].items():
+        if key.startswith(f"{user_id}:") and query.lower() in str(context).lower():
+            results.append({"conversation_id": key.split(":", 1)[1], "context": context})
+            if len(results) >= limit:
+                break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory_tools SQLite store")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Conversation context entries")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--baseline", action="store_true", help="Also time the old dict + substring scan")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    users = max(1, args.n // (CONVERSATIONS_PER_USER * len(KEYS)))
+    report = {"entries": args.n, "users": users}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.db")
+        db = MemoryDatabase(path, flush_interval=1.0, flush_max=10000)
+
+        print(f"Writing {args.n} context entries and {args.n // 10} preferences...", file=sys.stderr)
+        legacy = {"user_preferences": {}, "conversation_context": {}}
+        started = time.perf_counter()
+        for user_id, conversation_id, key, value in entries(args.n, rng):
+            db.set_context(user_id, conversation_id, key, value)
+            if args.baseline:
+                legacy["conversation_context"].setdefault(f"{user_id}:{conversation_id}", {})[key] = value
+        for i in range(args.n // 10):
+            user_id = f"user_{i % users}"
+            db.set_preference(user_id, f"pref_{i // users}", rng.choice(WORDS))
+            if args.baseline:
+                legacy["user_preferences"].setdefault(user_id, {})[f"pref_{i // users}"] = "x"
+        db.flush()
+        write_seconds = time.perf_counter() - started
+        report["write_per_sec"] = round((args.n + args.n // 10) / write_seconds)
+        report["db_mb"] = round(sum(
+            os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+        ) / 2 ** 20, 1)
+
+        sample_users = [f"user_{rng.randrange(users)}" for _ in range(args.queries)]
+        lookups = [(u, f"conv_{rng.randrange(CONVERSATIONS_PER_USER)}") for u in sample_users]
+        searches = [(u, " ".join(rng.sample(WORDS, 2))) for u in sample_users]
+
+        report["sqlite"] = {
+            "get_preferences": timed(db.get_preferences, [(u,) for u in sample_users]),
+            "get_context": timed(db.get_context, lookups),
+            "search_context": timed(db.search_context, searches),
+        }
+        started = time.perf_counter()
+        db.get_usage()
+        report["usage_scan_ms"] = round(1000 * (time.perf_counter() - started), 1)
+        report["compaction"] = db.compact()
+        if args.baseline:
+            # The old scan walks every conversation; time a subset of queries
+            few = searches[:max(1, min(len(searches), 20))]
+            report["legacy_dict"] = {
+                "get_preferences": timed(lambda u: legacy["user_preferences"].get(u, {}), [(u,) for u in sample_users]),
+                "get_context": timed(lambda u, c: legacy["conversation_context"].get(f"{u}:{c}", {}), lookups),
+                "search_context": timed(lambda u, q: legacy_search(legacy, u, q), few),
+            }
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['entries']} entries, {report['users']} users, {report['db_mb']} MB, "
+          f"{report['write_per_sec']} writes/sec")
+    print(f"usage scan {report['usage_scan_ms']} ms, compaction pass {report['compaction']['seconds']} s")
+    for backend in ("sqlite", "legacy_dict"):
+        for operation, stats in report.get(backend, {}).items():
+            print(f"{backend:>12} {operation:>16}: p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
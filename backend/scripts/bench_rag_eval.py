@@ -0,0 +1,126 @@
+"""
+RAG Evaluation Benchmark
+Sweeps chunking, index type, search mode and k over the SOPs in backend/docs
+and scores each combination against the labelled question set in
+data/eval/sop_questions.json (see app.core.rag_eval).
+
+Reports recall@k, MRR@k, p50/p99 query latency and index build time, and
+writes a JSON report (with git commit, embedding model and corpus hash) so
+runs can be compared over time.
+
+Usage:
+    python scripts/bench_rag_eval.py
+    python scripts/bench_rag_eval.py --chunk-sizes 300,500,1000 --overlaps 0,50,200 --k 1,3,5
+    python scripts/bench_rag_eval.py --fake-embeddings --output rag_eval_report.json   # offline run
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.config import settings
+from app.core.embedding_cache import model_fingerprint
+from app.core.ingestion import find_documents
+from app.core.rag_eval import DOCS_PATH, QUESTIONS_PATH, best_configuration, load_questions, run_sweep
+
+
+def int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def corpus_hash(docs_path: str) -> str:
+    digest = hashlib.sha256()
+    for path in find_documents(docs_path, ("*.txt", "*.md")):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate RAG retrieval (recall@k / MRR / latency)")
+    parser.add_argument("--docs", default=DOCS_PATH)
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--chunk-sizes", type=int_list, default=[300, 500, 1000])
+    parser.add_argument("--overlaps", type=int_list, default=[0, 50, 200])
+    parser.add_argument("--k", type=int_list, default=[1, 3, 5])
+    parser.add_argument("--index-types", default="flat,hnsw,sq8")
+    parser.add_argument("--modes", default="vector,hybrid")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Use deterministic fake embeddings (no model download)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the embedding cache so build times include embedding")
+    parser.add_argument("--output", default="rag_eval_report.json", help="JSON report path")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        settings.EMBEDDING_CACHE_ENABLED = False
+    if args.fake_embeddings:
+        embeddings = DeterministicFakeEmbedding(size=384)
+    else:
+        from app.core.llm import create_embeddings
+        embeddings = create_embeddings()
+
+    questions = load_questions(args.questions)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work_dir:
+        rows = run_sweep(
+            embeddings,
+            work_dir,
+            chunk_sizes=args.chunk_sizes,
+            chunk_overlaps=args.overlaps,
+            ks=args.k,
+            index_types=args.index_types.split(","),
+            modes=args.modes.split(","),
+            questions=questions,
+            docs_path=args.docs,
+        )
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": git_commit(),
+        "embeddings": model_fingerprint(getattr(embeddings, "inner", embeddings)),
+        "corpus": {"docs_path": os.path.abspath(args.docs), "sha256": corpus_hash(args.docs)},
+        "questions": len(questions),
+        "current_settings": {
+            "chunk_size": settings.RAG_CHUNK_SIZE,
+            "chunk_overlap": settings.RAG_CHUNK_OVERLAP,
+            "index_type": settings.RAG_INDEX_TYPE,
+        },
+        "sweep_seconds": round(time.perf_counter() - started, 1),
+        "best": {f"k={k}": best_configuration(rows, k) for k in args.k},
+        "results": rows,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    columns = ["chunk_size", "chunk_overlap", "chunks", "index_type", "mode", "k",
+               "recall", "mrr", "p50_ms", "p99_ms", "build_seconds"]
+    print(" | ".join(f"{c:>13}" for c in columns))
+    for row in rows:
+        print(" | ".join(f"{str(row[c]):>13}" for c in columns))
+    for key, best in report["best"].items():
+        if best:
+            print(f"Best at {key}: chunk {best['chunk_size']}/{best['chunk_overlap']}, "
+                  f"{best['index_type']} {best['mode']} (recall {best['recall']}, MRR {best['mrr']})")
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Startup Time Benchmark
+Measures import-time cost of the backend entry points with `python -X importtime`.
+
+Each target is imported in a fresh interpreter; the script reports the
+total import time, the wall-clock time and the slowest top-level packages.
+Use it to catch modules that load models or open connections at import.
+
+Usage:
+    python scripts/bench_startup.py                  # all entry points, 3 runs each
+    python scripts/bench_startup.py --runs 5 --top 15
+    python scripts/bench_startup.py --target app.core.memory
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points: FastAPI app, A2A agent server, composite MCP server
+DEFAULT_TARGETS = ["main", "app.agents.server", "app.mcp.composite_server"]
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse `-X importtime` output
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) tuples
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            parts = line[len("import time:"):].split("|")
+            self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        except (ValueError, IndexError):
+            continue
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def measure(target: str):
+    """Import target in a fresh interpreter and return (wall seconds, importtime rows)"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {target} failed: {error}")
+    return wall, parse_importtime(proc.stderr)
+
+
+def summarize(target: str, runs: int, top: int):
+    walls, totals = [], []
+    by_package = defaultdict(list)
+    for _ in range(runs):
+        wall, rows = measure(target)
+        walls.append(wall)
+        totals.append(sum(self_us for _, self_us, _, _ in rows))
+        # Attribute self time to top-level packages
+        package_time = defaultdict(int)
+        for name, self_us, _, _ in rows:
+            package_time[name.split(".")[0]] += self_us
+        for package, us in package_time.items():
+            by_package[package].append(us)
+
+    slowest = sorted(
+        ((package, statistics.median(us)) for package, us in by_package.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "target": target,
+        "runs": runs,
+        "wall_ms_median": round(1000 * statistics.median(walls), 1),
+        "import_ms_median": round(statistics.median(totals) / 1000, 1),
+        "slowest_packages_ms": {package: round(us / 1000, 1) for package, us in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend import/startup time")
+    parser.add_argument("--target", action="append", help="Module to import (repeatable)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for target in args.target or DEFAULT_TARGETS:
+        try:
+            report.append(summarize(target, args.runs, args.top))
+        except RuntimeError as e:
+            report.append({"target": target, "error": str(e)})
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for result in report:
+        print(f"\n=== {result['target']} ===")
+        if "error" in result:
+            print(f"  ERROR: {result['error']}")
+            continue
+        print(f"  wall (median of {result['runs']}): {result['wall_ms_median']} ms")
+        print(f"  import time:                {result['import_ms_median']} ms")
+        print("  slowest packages:")
+        for package, ms in result["slowest_packages_ms"].items():
+            print(f"    {package:<30} {ms:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Vector Index Benchmark
+Compares FAISS index types for the knowledge base at large scale.
+
+Builds every index type over the same synthetic clustered vectors (MiniLM
+dimensions by default), then loads each one in a fresh process, memory-mapped
+like the API workers do, and reports:
+- build time and file size
+- resident memory after load and after querying
+- recall@k against exact search, and p50/p99 single-query latency
+
+Usage:
+    python scripts/bench_vector_index.py                       # 1M vectors, all types
+    python scripts/bench_vector_index.py --n 100000 --types flat,hnsw,sq8
+    python scripts/bench_vector_index.py --no-mmap --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_vectors(n: int, dim: int, seed: int, clusters: int = 1000, chunk: int = 100000) -> np.ndarray:
+    """Clustered unit vectors, roughly like sentence embeddings of a topical corpus"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    out = np.empty((n, dim), dtype="float32")
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        block = centers[rng.integers(0, clusters, size)] + 0.6 * rng.standard_normal((size, dim)).astype("float32")
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        out[start:start + size] = block
+    return out
+
+
+def measure_worker(args):
+    """Runs in a fresh process: load one index and query it"""
+    import faiss
+    from app.core.vector_index import configure_search, read_faiss_index
+
+    queries = np.load(args.queries_file)
+    truth = np.load(args.truth)
+    before = rss_mb()
+    started = time.perf_counter()
+    index = read_faiss_index(args.worker, mmap=args.mmap)
+    configure_search(index)
+    load_seconds = time.perf_counter() - started
+    after_load = rss_mb()
+
+    latencies, hits = [], 0
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), args.k)
+        latencies.append(time.perf_counter() - started)
+        hits += len(set(ids[0]).intersection(truth[i, :args.k]))
+    latencies.sort()
+    print(json.dumps({
+        "load_ms": round(1000 * load_seconds, 1),
+        "rss_after_load_mb": round(after_load - before, 1),
+        "rss_after_queries_mb": round(rss_mb() - before, 1),
+        f"recall@{args.k}": round(hits / (len(queries) * args.k), 4),
+        "p50_ms": round(1000 * latencies[len(latencies) // 2], 3),
+        "p99_ms": round(1000 * latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))], 3),
+        "faiss_threads": faiss.omp_get_max_threads(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types (recall / latency / RSS)")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Number of vectors (chunks)")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (384 = all-MiniLM-L6-v2)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="flat,ivf,hnsw,pq,sq8")
+    parser.add_argument("--no-mmap", dest="mmap", action="store_false", help="Load indexes fully into RAM")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--queries-file", help=argparse.SUPPRESS)
+    parser.add_argument("--truth", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        measure_worker(args)
+        return
+
+    from app.core.vector_index import build_index_of_type
+    import faiss
+
+    print(f"Generating {args.n} x {args.dim} vectors...", file=sys.stderr)
+    vectors = make_vectors(args.n, args.dim, seed=0)
+    queries = make_vectors(args.queries, args.dim, seed=1)
+
+    print("Computing exact neighbours...", file=sys.stderr)
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+    del exact
+
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        queries_path, truth_path = os.path.join(tmp, "queries.npy"), os.path.join(tmp, "truth.npy")
+        np.save(queries_path, queries)
+        np.save(truth_path, truth)
+
+        for index_type in args.types.split(","):
+            print(f"Building {index_type}...", file=sys.stderr)
+            started = time.perf_counter()
+            index = build_index_of_type(vectors, index_type)
+            build_seconds = time.perf_counter() - started
+            path = os.path.join(tmp, f"{index_type}.faiss")
+            faiss.write_index(index, path)
+            del index
+
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", path, "--queries-file", queries_path,
+                   "--truth", truth_path, "--k", str(args.k)]
+            if not args.mmap:
+                cmd.append("--no-mmap")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                report.append({"type": index_type, "error": proc.stderr.strip().splitlines()[-1]})
+                continue
+            result = {
+                "type": index_type,
+                "n": args.n,
+                "build_s": round(build_seconds, 2),
+                "file_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+                "mmap": args.mmap,
+            }
+            result.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+            report.append(result)
+            os.remove(path)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    columns = ["type", "build_s", "file_mb", "rss_after_load_mb", "rss_after_queries_mb",
+               f"recall@{args.k}", "p50_ms", "p99_ms"]
+    print(" | ".join(f"{c:>20}" for c in columns))
+    for result in report:
+        if "error" in result:
+            print(f"{result['type']:>20} | ERROR: {result['error']}")
+            continue
+        print(" | ".join(f"{str(result.get(c)):>20}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
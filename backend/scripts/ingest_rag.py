@@ -3,71 +3,66 @@ RAG Document Ingestion Script
 Loads SOPs from docs/ directory, chunks them, and stores in FAISS index
 """
 import os
-from pathlib import Path
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import TextLoader
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from app.core.ingestion import ingest_documents as sync_index
+from app.core.llm import get_embeddings
 
 
-def ingest_documents(docs_path: str = "./docs", index_path: str = "./faiss_index"):
-    """Ingest policy/SOP documents into FAISS vector store"""
+def ingest_documents(
+    docs_path: str = "./docs",
+    index_path: str = "./faiss_index",
+    batch_size: int = None,
+    workers: int = None,
+    chunk_size: int = None,
+    chunk_overlap: int = None,
+):
+    """Ingest policy/SOP documents into FAISS vector store.
+
+    Re-runs are incremental: unchanged chunks are skipped, new or edited
+    chunks are embedded and vectors of removed chunks are deleted.
+    """
     
     print(f"Loading documents from {docs_path}...")
     
-    # Find all text files
-    docs_dir = Path(docs_path)
-    doc_files = list(docs_dir.glob("*.txt")) + list(docs_dir.glob("*.md"))
-    
-    if not doc_files:
+    if not os.path.isdir(docs_path):
         print(f"No documents found in {docs_path}")
         return
     
-    print(f"Found {len(doc_files)} documents")
-    
-    # Load documents
-    documents = []
-    for doc_file in doc_files:
-        print(f"Loading {doc_file.name}...")
-        try:
-            loader = TextLoader(str(doc_file), encoding='utf-8')
-            docs = loader.load()
-            documents.extend(docs)
-        except Exception as e:
-            print(f"Error loading {doc_file.name}: {e}")
-    
-    print(f"Loaded {len(documents)} document(s)")
-    
-    # Split documents into chunks
-    print("Splitting documents into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-    )
-    chunks = text_splitter.split_documents(documents)
-    print(f"Created {len(chunks)} chunks")
-    
     # Create embeddings
-    print("Creating embeddings (this may take a moment)...")
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    print("Loading embedding model (this may take a moment)...")
+    embeddings = get_embeddings()
     
     # Create or update FAISS index
-    print(f"Storing in FAISS index at {index_path}...")
+    print(f"Syncing FAISS index at {index_path}...")
+    report = sync_index(
+        docs_path,
+        index_path,
+        embeddings,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        batch_size=batch_size,
+        workers=workers,
+    )
+    
+    if report["files_scanned"] == 0:
+        print(f"No documents found in {docs_path}")
+        return
     
-    if os.path.exists(index_path):
-        print("Updating existing index...")
-        vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
-        vectorstore.add_documents(chunks)
-    else:
-        print("Creating new index...")
-        vectorstore = FAISS.from_documents(chunks, embeddings)
+    print(f"Files: {report['files_scanned']} scanned, {report['files_changed']} new/changed, "
+          f"{report['files_unchanged']} unchanged, {report['files_removed']} removed")
+    print(f"Chunks: {report['chunks_total']} total, {report['chunks_embedded']} embedded, "
+          f"{report['chunks_skipped']} skipped, {report['chunks_deleted']} deleted")
+    if report["chunks_embedded"]:
+        print(f"Throughput: {report['chunks_per_sec']} chunks/sec "
+              f"({report['chunks_embedded']} chunks in {report['embed_seconds']}s, "
+              f"batch size {report['batch_size']}, {report['workers'] or 'no'} worker processes)")
     
-    # Save index
-    vectorstore.save_local(index_path)
-    print(f"Successfully ingested {len(chunks)} chunks into FAISS index!")
+    vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
     
     # Test query
     print("\nTesting RAG retrieval...")
@@ -80,9 +75,16 @@ def ingest_documents(docs_path: str = "./docs", index_path: str = "./faiss_index
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    docs_path = sys.argv[1] if len(sys.argv) > 1 else "./docs"
-    index_path = sys.argv[2] if len(sys.argv) > 2 else "./faiss_index"
+    parser = argparse.ArgumentParser(description="Ingest documents into the FAISS index")
+    parser.add_argument("docs_path", nargs="?", default="./docs")
+    parser.add_argument("index_path", nargs="?", default="./faiss_index")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding batch")
+    parser.add_argument("--workers", type=int, default=None, help="Embedding processes (0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Characters per chunk (default RAG_CHUNK_SIZE)")
+    parser.add_argument("--chunk-overlap", type=int, default=None, help="Chunk overlap (default RAG_CHUNK_OVERLAP)")
+    args = parser.parse_args()
     
-    ingest_documents(docs_path, index_path)
+    ingest_documents(args.docs_path, args.index_path, args.batch_size, args.workers,
+                     args.chunk_size, args.chunk_overlap)
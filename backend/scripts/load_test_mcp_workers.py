@@ -0,0 +1,177 @@
+"""
+MCP Worker Scaling Load Test
+Measures composite server throughput as the number of worker processes grows.
+
+For each --workers level a composite server is started with
+`app/mcp/composite_server.py --workers N` on a free port and --concurrency
+clients call --tool over HTTP for --duration seconds, each on its own
+connection so the kernel spreads them across workers. Servers run with the
+default configuration; pass --no-result-cache to have a single worker
+reach the tool (and the shared database) on every call too, as several
+workers always do.
+
+Before measuring, one client creates a resource group and every other client
+must see it: state written through one worker is visible through all.
+
+Throughput can only scale up to the number of CPU cores.
+
+Usage:
+    python scripts/load_test_mcp_workers.py
+    python scripts/load_test_mcp_workers.py --workers 1,2,4,8 --concurrency 32 --duration 20
+    python scripts/load_test_mcp_workers.py --tool servicenow_search_servicenow_tickets --args '{"status": "Open"}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastmcp import Client
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Composite server exited during startup")
+        try:
+            async with Client(url, timeout=2) as client:
+                if await client.ping():
+                    return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Composite server at {url} not ready after {timeout}s")
+
+
+def spawn_server(workers: int, result_cache: bool):
+    port = free_port()
+    env = {**os.environ, "MCP_TRANSPORT": "http", "MCP_SERVER_PORT": str(port)}
+    if not result_cache:
+        env["MCP_RESULT_CACHE"] = "false"
+    process = subprocess.Popen(
+        [sys.executable, "app/mcp/composite_server.py", "--workers", str(workers)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, f"http://127.0.0.1:{port}/mcp"
+
+
+async def check_shared_state(url: str, clients: int):
+    """A resource group created through one connection is listed through all"""
+    name = f"loadtest-{uuid.uuid4().hex[:8]}"
+
+    async def sees_it():
+        async with Client(url) as client:
+            result = await client.call_tool("resource_list_resource_groups", {})
+            return name in result.content[0].text
+
+    # Read first, over enough connections that every worker's cache (if any) holds the old list
+    for _ in range(3):
+        await asyncio.gather(*[sees_it() for _ in range(clients)])
+    async with Client(url) as client:
+        await client.call_tool("resource_create_resource_group", {"name": name, "location": "eastus"})
+    seen = await asyncio.gather(*[sees_it() for _ in range(clients)])
+    if not all(seen):
+        raise AssertionError(f"{seen.count(False)} of {clients} connections did not see resource group {name}")
+
+
+async def run_load(url: str, tool: str, arguments: dict, concurrency: int, duration: float):
+    samples = []
+    errors = 0
+    warmed = 0
+    go = asyncio.Event()
+    stop_at = None
+
+    async def worker():
+        nonlocal errors, warmed, stop_at
+        async with Client(url) as client:
+            await client.call_tool(tool, arguments)  # Warm-up: connection and first call
+            warmed += 1
+            if warmed == concurrency:
+                stop_at = time.perf_counter() + duration
+                go.set()
+            await go.wait()
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    await client.call_tool(tool, arguments)
+                except Exception:
+                    errors += 1
+                samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = duration + max(0.0, time.perf_counter() - stop_at)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "errors": errors,
+        "calls_per_sec": round(len(samples) / elapsed, 1),
+        "p50_ms": round(1000 * samples[len(samples) // 2], 2) if samples else None,
+        "p99_ms": round(1000 * samples[min(len(samples) - 1, int(0.99 * len(samples)))], 2) if samples else None,
+    }
+
+
+async def measure(workers: int, args, arguments: dict):
+    process, url = spawn_server(workers, args.result_cache)
+    try:
+        await wait_ready(url, process, args.startup_timeout)
+        await check_shared_state(url, args.concurrency)
+        return {"workers": workers, **await run_load(url, args.tool, arguments, args.concurrency, args.duration)}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Composite MCP server throughput by worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--tool", default="resource_list_vms")
+    parser.add_argument("--args", default="{}", help="Tool arguments as JSON")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--startup-timeout", type=float, default=90.0)
+    parser.add_argument("--no-result-cache", dest="result_cache", action="store_false",
+                        help="Disable the result cache (only used by single-worker servers)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    arguments = json.loads(args.args)
+    rows = []
+    for workers in [int(w) for w in args.workers.split(",") if w]:
+        print(f"Load testing {workers} worker(s)...", file=sys.stderr)
+        rows.append(asyncio.run(measure(workers, args, arguments)))
+
+    baseline = rows[0]["calls_per_sec"] if rows else None
+    for row in rows:
+        row["speedup"] = round(row["calls_per_sec"] / baseline, 2) if baseline else None
+
+    if args.json:
+        print(json.dumps({"tool": args.tool, "concurrency": args.concurrency, "cpus": os.cpu_count(), "results": rows}, indent=2))
+        return
+    print(f"{args.tool}, {args.concurrency} connections, {os.cpu_count()} CPU(s)")
+    for row in rows:
+        print(
+            f"{row['workers']:>3} worker(s): {row['calls_per_sec']}/s (x{row['speedup']}) | "
+            f"p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms | errors {row['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,33 @@
 """
 MCP Server Startup Script
-Starts all MCP servers in separate processes
+Starts all MCP servers in separate processes and keeps them running.
+
+Servers are started concurrently over HTTP transport, each on its own port.
+A server counts as started once its GET /health readiness probe answers,
+and the time that took is reported per server. Each server's stdout/stderr
+goes to logs/mcp/<name>.log, so a chatty server never blocks on a full pipe.
+
+While running, servers are probed every --health-interval seconds. A server
+that exits, or misses --max-probe-failures probes in a row, is restarted
+with exponential backoff (1s doubling up to --max-backoff). The backoff is
+reset once a server has stayed up for --stable-after seconds.
+
+Usage:
+    python scripts/start_mcp_servers.py
+    python scripts/start_mcp_servers.py --servers ServiceNow,Intune --log-dir /tmp/mcp-logs
 """
-import subprocess
+import argparse
+import asyncio
+import os
+import random
 import sys
 import time
 from pathlib import Path
 
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
 # MCP servers configuration
 MCP_SERVERS = [
     {"name": "ServiceNow", "script": "app/mcp/servers/servicenow_mcp.py", "port": 8001},
@@ -17,57 +38,244 @@ MCP_SERVERS = [
     {"name": "Workflow", "script": "app/mcp/servers/workflow_mcp.py", "port": 8007},
 ]
 
+HEALTH_PATH = "/health"
 
-def start_mcp_servers():
-    """Start all MCP servers as background processes"""
-    processes = []
-    
-    print("Starting MCP servers...")
-    
-    for server in MCP_SERVERS:
-        print(f"Starting {server['name']} on port {server['port']}...")
-        
-        # Start server process
-        process = subprocess.Popen(
-            [sys.executable, server['script']],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+
+class ManagedServer:
+    """One supervised server process"""
+
+    def __init__(self, name: str, command: list, port: int, log_path: Path, env: dict = None):
+        self.name = name
+        self.command = command
+        self.port = port
+        self.log_path = log_path
+        self.env = env or {}
+        self.process = None
+        self.state = "stopped"  # starting, ready, backoff, failed, stopped
+        self.startup_seconds = None
+        self.started_at = None
+        self.restarts = 0
+        self.last_exit = None
+
+    @property
+    def health_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}{HEALTH_PATH}"
+
+
+class Supervisor:
+    """
+    Starts servers concurrently, waits for readiness and restarts failures with backoff
+    """
+
+    def __init__(
+        self,
+        servers: list,
+        startup_timeout: float = 60.0,
+        health_interval: float = 5.0,
+        max_probe_failures: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        on_event=print,
+    ):
+        self.servers = servers
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.max_probe_failures = max_probe_failures
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.on_event = on_event
+        self._stopping = False
+        self._tasks = []
+        self._http = None
+        self._initial = {server.name: asyncio.Event() for server in servers}
+
+    async def _spawn(self, server: ManagedServer):
+        server.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(server.log_path, "ab") as log:
+            log.write(f"\n=== {time.strftime('%Y-%m-%d %H:%M:%S')} starting {server.name} ===\n".encode())
+            log.flush()
+            # The child writes straight to the file; nothing here has to drain a pipe
+            server.process = await asyncio.create_subprocess_exec(
+                *server.command,
+                cwd=str(BACKEND_DIR),
+                env={**os.environ, **server.env},
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        server.started_at = time.monotonic()
+        server.state = "starting"
+
+    async def _probe(self, server: ManagedServer) -> bool:
+        try:
+            response = await self._http.get(server.health_url, timeout=2.0)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def _wait_ready(self, server: ManagedServer) -> bool:
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if server.process.returncode is not None:
+                return False
+            if await self._probe(server):
+                server.startup_seconds = round(time.monotonic() - server.started_at, 2)
+                server.state = "ready"
+                return True
+            await asyncio.sleep(0.2)
+        return False
+
+    async def _watch(self, server: ManagedServer) -> str:
+        """Wait until the process exits or stops answering probes; returns why"""
+        failures = 0
+        exited = asyncio.ensure_future(server.process.wait())
+        try:
+            while True:
+                done, _ = await asyncio.wait({exited}, timeout=self.health_interval)
+                if done:
+                    return f"exited with code {server.process.returncode}"
+                if await self._probe(server):
+                    failures = 0
+                else:
+                    failures += 1
+                    if failures >= self.max_probe_failures:
+                        return f"failed {failures} health probes"
+        finally:
+            exited.cancel()
+
+    async def _stop(self, server: ManagedServer, timeout: float = 10.0):
+        process = server.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _supervise(self, server: ManagedServer):
+        attempt = 0
+        while not self._stopping:
+            await self._spawn(server)
+            if await self._wait_ready(server):
+                self.on_event(f"{server.name} ready on port {server.port} in {server.startup_seconds}s")
+                self._initial[server.name].set()
+                reason = await self._watch(server)
+                if self._stopping:
+                    break
+                if time.monotonic() - server.started_at >= self.stable_after:
+                    attempt = 0
+            else:
+                reason = (
+                    f"exited during startup with code {server.process.returncode}"
+                    if server.process.returncode is not None
+                    else f"not ready after {self.startup_timeout}s"
+                )
+                if self._stopping:
+                    break
+            server.last_exit = reason
+            await self._stop(server)
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.8, 1.0)
+            attempt += 1
+            server.restarts += 1
+            server.state = "backoff"
+            self.on_event(f"{server.name} {reason}, restarting in {delay:.1f}s (see {server.log_path})")
+            if not self._initial[server.name].is_set() and attempt >= 3:
+                server.state = "failed"
+                self._initial[server.name].set()  # Don't hold up the startup report
+            await asyncio.sleep(delay)
+
+    async def start(self):
+        """Start every server concurrently and wait until each is ready (or failing)"""
+        self._http = httpx.AsyncClient()
+        self._tasks = [asyncio.create_task(self._supervise(server)) for server in self.servers]
+        await asyncio.gather(*[event.wait() for event in self._initial.values()])
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*[self._stop(server) for server in self.servers])
+        for server in self.servers:
+            server.state = "stopped"
+        if self._http is not None:
+            await self._http.aclose()
+
+    def report(self) -> str:
+        lines = [f"  {'Server':<22}{'Port':>6}  {'Status':<9}{'Startup':>9}  Restarts  Log"]
+        for server in self.servers:
+            startup = f"{server.startup_seconds}s" if server.startup_seconds is not None else "-"
+            lines.append(
+                f"  {server.name:<22}{server.port:>6}  {server.state:<9}{startup:>9}  {server.restarts:>8}  {server.log_path}"
+            )
+        return "\n".join(lines)
+
+
+def build_servers(configs: list, log_dir: Path) -> list:
+    # run_server() reads its transport and port from the environment
+    return [
+        ManagedServer(
+            name=config["name"],
+            command=[sys.executable, config["script"]],
+            port=config["port"],
+            log_path=log_dir / f"{config['name']}.log",
+            env={"MCP_TRANSPORT": "http", "MCP_SERVER_PORT": str(config["port"]), "PYTHONUNBUFFERED": "1"},
         )
-        
-        processes.append({
-            "name": server['name'],
-            "port": server['port'],
-            "process": process
-        })
-        
-        time.sleep(1)  # Give server time to start
-    
-    print("\nAll MCP servers started!")
-    print("\nServer Status:")
-    for p in processes:
-        status = "Running" if p['process'].poll() is None else "Failed"
-        print(f"  {p['name']}: {status} on port {p['port']}")
-    
-    print("\nTo inspect servers, use MCP Inspector:")
-    print("  npx @modelcontextprotocol/inspector")
-    
-    # Keep script running
+        for config in configs
+    ]
+
+
+async def run(args):
+    configs = MCP_SERVERS
+    if args.servers:
+        wanted = set(args.servers.split(","))
+        configs = [config for config in MCP_SERVERS if config["name"] in wanted]
+
+    supervisor = Supervisor(
+        build_servers(configs, Path(args.log_dir)),
+        startup_timeout=args.startup_timeout,
+        health_interval=args.health_interval,
+        max_probe_failures=args.max_probe_failures,
+        max_backoff=args.max_backoff,
+        stable_after=args.stable_after,
+    )
+    print(f"Starting {len(configs)} MCP servers...")
+    started = time.monotonic()
     try:
+        await supervisor.start()
+        print(f"\nStartup finished in {time.monotonic() - started:.1f}s")
+        print("\nServer Status:")
+        print(supervisor.report())
+
+        print("\nTo inspect servers, use MCP Inspector:")
+        print("  npx @modelcontextprotocol/inspector")
         print("\nPress Ctrl+C to stop all servers...")
-        while True:
-            time.sleep(1)
-            # Check if any process died
-            for p in processes:
-                if p['process'].poll() is not None:
-                    print(f"\nWarning: {p['name']} server stopped unexpectedly!")
-    
-    except KeyboardInterrupt:
+        await asyncio.Event().wait()
+    finally:
         print("\n\nStopping all MCP servers...")
-        for p in processes:
-            p['process'].terminate()
-            p['process'].wait()
+        await supervisor.stop()
         print("All servers stopped.")
 
 
+def start_mcp_servers():
+    """Start and supervise all MCP servers until interrupted"""
+    parser = argparse.ArgumentParser(description="Start and supervise the MCP servers")
+    parser.add_argument("--servers", help="Comma-separated server names (default: all)")
+    parser.add_argument("--log-dir", default=str(BACKEND_DIR / "logs" / "mcp"))
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds to wait for readiness")
+    parser.add_argument("--health-interval", type=float, default=5.0, help="Seconds between liveness probes")
+    parser.add_argument("--max-probe-failures", type=int, default=3, help="Failed probes before a restart")
+    parser.add_argument("--max-backoff", type=float, default=60.0, help="Longest delay between restarts")
+    parser.add_argument("--stable-after", type=float, default=60.0, help="Uptime that resets the backoff")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == "__main__":
     start_mcp_servers()
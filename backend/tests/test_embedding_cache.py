@@ -0,0 +1,99 @@
+"""
+Tests for the persistent embedding cache
+"""
+import os
+import sys
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded: List[str] = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return super().embed_query(text)
+
+
+def test_memory_hits_and_dedup():
+    inner = CountingEmbeddings(size=8)
+    cache = CachedEmbeddings(inner)
+
+    first = cache.embed_documents(["a", "b", "a"])
+    assert inner.embedded == ["a", "b"]
+    assert first[0] == first[2]
+
+    second = cache.embed_documents(["b", "a", "c"])
+    assert inner.embedded == ["a", "b", "c"]
+    assert second[:2] == [first[1], first[0]]
+
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 2 and stats["misses"] == 4
+    assert stats["hit_rate"] == round(2 / 6, 3)
+
+
+def test_queries_cached_separately():
+    inner = CountingEmbeddings(size=8)
+    cache = CachedEmbeddings(inner)
+    cache.embed_documents(["vpn"])
+    cache.embed_query("vpn")
+    cache.embed_query("vpn")
+    assert inner.embedded == ["vpn", "vpn"]
+
+
+def test_disk_cache_survives_restart_and_model_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        inner = CountingEmbeddings(size=8)
+        vectors = CachedEmbeddings(inner, path=path).embed_documents(["wipe device", "reset mfa"])
+
+        # New process, same model: served from disk
+        restarted = CachedEmbeddings(CountingEmbeddings(size=8), path=path)
+        assert restarted.embed_documents(["wipe device", "reset mfa"]) == vectors
+        assert restarted.inner.embedded == []
+        assert restarted.get_stats()["disk_hits"] == 2
+
+        # Different model configuration: never served the old vectors
+        other = CachedEmbeddings(CountingEmbeddings(size=16), path=path)
+        assert len(other.embed_documents(["wipe device"])[0]) == 16
+        assert other.inner.embedded == ["wipe device"]
+        assert other.purge_other_models() == 2
+        assert other.get_stats()["disk_items"] == 1
+
+
+def test_lru_capacity_and_threads():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CachedEmbeddings(CountingEmbeddings(size=8), path=os.path.join(tmp, "cache.db"), memory_items=5)
+        threads = [
+            threading.Thread(target=cache.embed_documents, args=([f"text {i}" for i in range(t, t + 10)],))
+            for t in range(0, 40, 10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = cache.get_stats()
+        assert stats["memory_items"] == 5
+        assert stats["disk_items"] == 40
+
+
+if __name__ == "__main__":
+    test_memory_hits_and_dedup()
+    print("[OK] Memory hits and dedup")
+    test_queries_cached_separately()
+    print("[OK] Queries cached separately")
+    test_disk_cache_survives_restart_and_model_change()
+    print("[OK] Disk cache survives restart and model change")
+    test_lru_capacity_and_threads()
+    print("[OK] LRU capacity and threads")
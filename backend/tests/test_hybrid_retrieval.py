@@ -0,0 +1,113 @@
+"""
+Tests for BM25 + vector hybrid retrieval
+Uses deterministic fake embeddings so no model download is needed.
+"""
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.bm25 import BM25Index, is_decisive, reciprocal_rank_fusion, tokenize
+from app.core.ingestion import ingest_documents
+from app.core.rag import VectorStoreRegistry
+
+DOCS = {
+    "wipe.txt": "## Wipe\nUse wipe_intune_device to remotely erase a lost device. Error 0x80070005 means access denied.",
+    "enroll.txt": "## Enrollment\nUse provision_device with the serial number and user email to enroll a laptop.",
+    "tickets.txt": "## Tickets\nIncidents such as INC0000001 are triaged by priority. Escalate a device ticket after 4 hours.",
+}
+
+
+def test_tokenizer_keeps_identifiers():
+    tokens = tokenize("How do I fix 0x80070005 on INC0000001 via wipe_intune_device?")
+    assert "0x80070005" in tokens and "inc0000001" in tokens and "wipe_intune_device" in tokens
+    assert "how" not in tokens
+
+
+def test_bm25_ranks_exact_identifier_first():
+    index = BM25Index.from_texts((name, text) for name, text in DOCS.items())
+    results = index.search_with_coverage("INC0000001", k=3)
+    assert results[0][0] == "tickets.txt"
+    assert is_decisive(results, ratio=2.0, min_coverage=0.5)
+
+    # A term shared by every document is not decisive
+    assert not is_decisive(index.search_with_coverage("device", k=3), ratio=2.0, min_coverage=0.5)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], k=60)
+    assert fused[0][0] == "b"
+
+
+def test_registry_uses_fast_path_and_fusion():
+    embeddings = DeterministicFakeEmbedding(size=16)
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_path = os.path.join(tmp, "docs")
+        index_path = os.path.join(tmp, "faiss_index")
+        os.makedirs(docs_path)
+        for name, text in DOCS.items():
+            with open(os.path.join(docs_path, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        ingest_documents(docs_path, index_path, embeddings, chunk_size=500, chunk_overlap=0)
+        assert os.path.exists(os.path.join(index_path, "bm25.json"))
+
+        registry = VectorStoreRegistry(index_path=index_path, embeddings_factory=lambda: embeddings)
+        docs = registry.search("error 0x80070005", k=2)
+        assert "0x80070005" in docs[0].page_content
+        assert registry.queries_by_mode["bm25_fast_path"] == 1
+
+        docs = registry.search("device", k=2)
+        assert len(docs) == 2
+        assert registry.queries_by_mode["hybrid"] == 1
+
+        registry.search("device", k=2, mode="vector")
+        assert registry.get_stats()["queries_by_mode"]["vector"] == 1
+
+
+def test_reload_during_query_does_not_mix_indexes():
+    embeddings = DeterministicFakeEmbedding(size=16)
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_path = os.path.join(tmp, "docs")
+        index_path = os.path.join(tmp, "faiss_index")
+        os.makedirs(docs_path)
+
+        def write_docs(docs):
+            for name in os.listdir(docs_path):
+                os.remove(os.path.join(docs_path, name))
+            for name, text in docs.items():
+                with open(os.path.join(docs_path, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+            ingest_documents(docs_path, index_path, embeddings, chunk_size=500, chunk_overlap=0)
+
+        write_docs(DOCS)
+        registry = VectorStoreRegistry(index_path=index_path, embeddings_factory=lambda: embeddings)
+        load = registry.get_vectorstore
+        old = load()
+
+        def reload_after_first_read():
+            # Another request notices the rebuilt index right after this one took the store
+            write_docs({"printer.txt": "## Printers\nA device ticket for a jammed printer on floor 3."})
+            load()
+            return old
+
+        registry.get_vectorstore = reload_after_first_read
+        docs = registry.search("device ticket", k=2, mode="hybrid")
+        # Both rankings come from the same version of the index
+        sources = {os.path.basename(d.metadata["source"]) for d in docs}
+        assert len(docs) == 2 and (sources <= set(DOCS) or sources == {"printer.txt"})
+
+
+if __name__ == "__main__":
+    test_tokenizer_keeps_identifiers()
+    print("[OK] Tokenizer keeps identifiers")
+    test_bm25_ranks_exact_identifier_first()
+    print("[OK] BM25 ranks exact identifier first")
+    test_reciprocal_rank_fusion_rewards_agreement()
+    print("[OK] RRF rewards agreement")
+    test_registry_uses_fast_path_and_fusion()
+    print("[OK] Registry uses fast path and fusion")
+    test_reload_during_query_does_not_mix_indexes()
+    print("[OK] Reload during a query does not mix indexes")
@@ -0,0 +1,224 @@
+"""
+Tests for manifest-driven incremental RAG ingestion
+Uses deterministic fake embeddings and a temporary docs directory.
+"""
+import os
+import sys
+import tempfile
+from functools import partial
+from typing import List
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.ingestion import ingest_documents, load_manifest
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded: int = 0
+    batches: List[int] = []
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
+
+SECTIONS = [f"## Section {i}\n" + f"Step {i} of the procedure. " * 8 for i in range(6)]
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def stored_texts(index_path, embeddings):
+    store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+    return sorted(doc.page_content for doc in store.docstore._dict.values()), store.index.ntotal
+
+
+def run_in_tempdir(test):
+    def wrapper():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                os.makedirs("docs")
+                test(CountingEmbeddings(size=16))
+            finally:
+                os.chdir(cwd)
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+def ingest(embeddings):
+    return ingest_documents("docs", "faiss_index", embeddings, chunk_size=200, chunk_overlap=0)
+
+
+@run_in_tempdir
+def test_rerun_skips_unchanged_chunks(embeddings):
+    write("docs/a.txt", "\n\n".join(SECTIONS))
+    write("docs/b.txt", "\n\n".join(SECTIONS[:2]))
+
+    first = ingest(embeddings)
+    assert first["chunks_embedded"] == first["chunks_total"] > 0
+    embedded = embeddings.embedded
+
+    second = ingest(embeddings)
+    assert second["chunks_embedded"] == 0 and second["chunks_deleted"] == 0
+    assert second["chunks_skipped"] == first["chunks_total"]
+    assert second["files_unchanged"] == 2
+    assert embeddings.embedded == embedded
+
+    _, ntotal = stored_texts("faiss_index", embeddings)
+    assert ntotal == first["chunks_total"]
+
+
+@run_in_tempdir
+def test_edit_embeds_only_changed_chunks(embeddings):
+    write("docs/a.txt", "\n\n".join(SECTIONS))
+    first = ingest(embeddings)
+
+    edited = list(SECTIONS)
+    edited[3] = "## Section 3\nThis step was rewritten entirely."
+    write("docs/a.txt", "\n\n".join(edited))
+    report = ingest(embeddings)
+
+    assert report["files_changed"] == 1
+    assert 0 < report["chunks_embedded"] < first["chunks_total"]
+    assert report["chunks_deleted"] > 0
+    assert report["chunks_skipped"] > 0
+
+    texts, ntotal = stored_texts("faiss_index", embeddings)
+    assert ntotal == report["chunks_total"] == len(texts)
+    assert any("rewritten entirely" in t for t in texts)
+    assert not any("Step 3 of the procedure" in t for t in texts)
+
+
+@run_in_tempdir
+def test_removed_file_vectors_are_deleted(embeddings):
+    write("docs/a.txt", "\n\n".join(SECTIONS[:2]))
+    write("docs/b.txt", "\n\n".join(SECTIONS[4:]))
+    ingest(embeddings)
+
+    os.remove("docs/b.txt")
+    report = ingest(embeddings)
+    assert report["files_removed"] == 1 and report["chunks_deleted"] > 0
+
+    texts, ntotal = stored_texts("faiss_index", embeddings)
+    assert ntotal == len(texts) == report["chunks_total"]
+    assert "docs/b.txt" not in load_manifest("faiss_index")["files"]
+
+
+@run_in_tempdir
+def test_other_source_directories_are_kept(embeddings):
+    os.makedirs("other")
+    write("docs/a.txt", SECTIONS[0])
+    write("other/policy.txt", SECTIONS[1])
+    ingest(embeddings)
+    ingest_documents("other", "faiss_index", embeddings, chunk_size=200, chunk_overlap=0)
+
+    # Re-ingesting docs/ must not treat other/ files as removed
+    report = ingest(embeddings)
+    assert report["files_removed"] == 0 and report["chunks_deleted"] == 0
+    assert set(load_manifest("faiss_index")["files"]) == {"docs/a.txt", "other/policy.txt"}
+
+
+@run_in_tempdir
+def test_undecodable_file_is_skipped(embeddings):
+    write("docs/a.txt", SECTIONS[0])
+    with open("docs/legacy.txt", "wb") as f:
+        f.write("Caf\u00e9 ticket r\u00e9sum\u00e9".encode("latin-1"))
+
+    report = ingest(embeddings)
+    assert report["files_scanned"] == 2 and report["files_changed"] == 1
+    assert set(load_manifest("faiss_index")["files"]) == {"docs/a.txt"}
+    texts, _ = stored_texts("faiss_index", embeddings)
+    assert texts and all("Section 0" in t or "Step 0" in t for t in texts)
+
+
+@run_in_tempdir
+def test_ids_do_not_depend_on_working_directory(embeddings):
+    write("docs/a.txt", "\n\n".join(SECTIONS))
+    first = ingest(embeddings)
+    embedded = embeddings.embedded
+
+    # Same docs and index, run from another directory with absolute paths
+    project = os.getcwd()
+    os.makedirs("elsewhere")
+    os.chdir("elsewhere")
+    try:
+        report = ingest_documents(os.path.join(project, "docs"), os.path.join(project, "faiss_index"),
+                                  embeddings, chunk_size=200, chunk_overlap=0)
+    finally:
+        os.chdir(project)
+    assert report["files_unchanged"] == 1 and report["chunks_embedded"] == 0
+    assert embeddings.embedded == embedded
+
+    # And from the parent directory with relative paths
+    os.chdir("..")
+    try:
+        name = os.path.basename(project)
+        report = ingest_documents(f"{name}/docs", f"{name}/faiss_index", embeddings, chunk_size=200, chunk_overlap=0)
+    finally:
+        os.chdir(project)
+    assert report["chunks_embedded"] == 0 and report["chunks_deleted"] == 0
+
+    _, ntotal = stored_texts("faiss_index", embeddings)
+    assert ntotal == first["chunks_total"]
+    assert set(load_manifest("faiss_index")["files"]) == {"docs/a.txt"}
+
+
+@run_in_tempdir
+def test_chunks_embedded_in_bounded_batches(embeddings):
+    for i in range(3):
+        write(f"docs/{i}.txt", "\n\n".join(SECTIONS))
+    report = ingest_documents("docs", "faiss_index", embeddings, chunk_size=200, chunk_overlap=0,
+                              batch_size=4, workers=0)
+
+    assert report["chunks_embedded"] == sum(embeddings.batches) > 4
+    assert max(embeddings.batches) <= 4
+    assert report["chunks_per_sec"] is not None
+
+
+@run_in_tempdir
+def test_process_pool_matches_in_process(embeddings):
+    write("docs/a.txt", "\n\n".join(SECTIONS))
+    write("docs/b.txt", "\n\n".join(reversed(SECTIONS)))
+    ingest_documents("docs", "serial_index", embeddings, chunk_size=200, chunk_overlap=0, workers=0)
+    embedded_in_process = embeddings.embedded
+    report = ingest_documents("docs", "pool_index", embeddings, chunk_size=200, chunk_overlap=0,
+                              batch_size=3, workers=2,
+                              worker_embeddings_factory=partial(DeterministicFakeEmbedding, size=16))
+
+    # Workers did the embedding, not the in-process model
+    assert embeddings.embedded == embedded_in_process
+    assert report["workers"] == 2 and report["chunks_embedded"] > 0
+
+    serial = FAISS.load_local("serial_index", embeddings, allow_dangerous_deserialization=True)
+    pooled = FAISS.load_local("pool_index", embeddings, allow_dangerous_deserialization=True)
+    assert serial.index.ntotal == pooled.index.ntotal
+    query = serial.embeddings.embed_query("Step 4 of the procedure")
+    assert [d.page_content for d in serial.similarity_search_by_vector(query, k=3)] == \
+        [d.page_content for d in pooled.similarity_search_by_vector(query, k=3)]
+
+
+if __name__ == "__main__":
+    test_rerun_skips_unchanged_chunks()
+    print("[OK] Re-run skips unchanged chunks")
+    test_edit_embeds_only_changed_chunks()
+    print("[OK] Edit embeds only changed chunks")
+    test_removed_file_vectors_are_deleted()
+    print("[OK] Removed file vectors deleted")
+    test_other_source_directories_are_kept()
+    print("[OK] Other source directories kept")
+    test_undecodable_file_is_skipped()
+    print("[OK] Undecodable file skipped")
+    test_ids_do_not_depend_on_working_directory()
+    print("[OK] IDs do not depend on the working directory")
+    test_chunks_embedded_in_bounded_batches()
+    print("[OK] Chunks embedded in bounded batches")
+    test_process_pool_matches_in_process()
+    print("[OK] Process pool matches in-process embedding")
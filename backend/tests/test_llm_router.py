@@ -0,0 +1,152 @@
+"""
+Tests for LLM provider failover, hedging and circuit breaking
+Slow and fast backends are simulated with the fake provider.
+"""
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+from app.core.config import settings
+from app.core.fake_llm import FakeChatModel
+from app.core.llm_router import RoutedChatModel, llm_router
+from app.core.llm_scheduler import ScheduledChatModel
+
+
+def make_backend(provider, delay=0.0, error=None, text=None):
+    inner = FakeChatModel(
+        responses=[text or f"answer from {provider}"],
+        first_token_delay=delay,
+        error=error,
+        name_suffix=provider,
+    )
+    return ScheduledChatModel(inner=inner, provider=provider)
+
+
+def test_fast_primary_is_not_hedged():
+    async def run():
+        primary, secondary = make_backend("fast-p"), make_backend("fast-s")
+        model = RoutedChatModel(backends=[primary, secondary])
+        result = await model.ainvoke([HumanMessage(content="hi")])
+        assert result.content == "answer from fast-p"
+        assert secondary.inner.call_count == 0
+        assert llm_router.health("fast-p").get_stats()["hedges_sent"] == 0
+
+    asyncio.run(run())
+
+
+def test_slow_primary_is_hedged_and_secondary_wins():
+    async def run():
+        original = settings.LLM_HEDGE_DELAY_MS
+        settings.LLM_HEDGE_DELAY_MS = 50
+        try:
+            model = RoutedChatModel(backends=[make_backend("slow-p", delay=1.0), make_backend("quick-s", delay=0.01)])
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await model.ainvoke([HumanMessage(content="hi")])
+            assert result.content == "answer from quick-s"
+            assert loop.time() - started < 0.5
+
+            tokens = [c.content async for c in model.astream([HumanMessage(content="stream please")])]
+            assert "".join(tokens) == "answer from quick-s"
+
+            stats = llm_router.health("slow-p").get_stats()
+            assert stats["hedges_sent"] == 2
+            assert llm_router.health("quick-s").get_stats()["hedge_wins"] == 2
+        finally:
+            settings.LLM_HEDGE_DELAY_MS = original
+
+    asyncio.run(run())
+
+
+def test_failover_and_circuit_breaker():
+    async def run():
+        broken = make_backend("broken-p", error="503 from provider")
+        healthy = make_backend("healthy-s")
+        model = RoutedChatModel(backends=[broken, healthy])
+
+        for _ in range(settings.LLM_CIRCUIT_FAILURE_THRESHOLD):
+            result = await model.ainvoke([HumanMessage(content="hi")])
+            assert result.content == "answer from healthy-s"
+
+        assert llm_router.health("broken-p").get_stats()["state"] == "open"
+        calls_before = broken.inner.call_count
+        await model.ainvoke([HumanMessage(content="again")])
+        assert broken.inner.call_count == calls_before  # skipped while the circuit is open
+
+    asyncio.run(run())
+
+
+def test_sync_invoke_fails_over():
+    model = RoutedChatModel(backends=[make_backend("sync-broken", error="boom"), make_backend("sync-ok")])
+    assert model.invoke([HumanMessage(content="hi")]).content == "answer from sync-ok"
+
+
+class MidStreamFailure(FakeChatModel):
+    """Streams the first word, then fails"""
+
+    def _stream(self, *args, **kwargs):
+        yield next(super()._stream(*args, **kwargs))
+        raise RuntimeError("connection reset mid-stream")
+
+    async def _astream(self, *args, **kwargs):
+        async for chunk in super()._astream(*args, **kwargs):
+            yield chunk
+            raise RuntimeError("connection reset mid-stream")
+
+
+def test_mid_stream_failures_open_the_circuit():
+    def model(provider):
+        inner = MidStreamFailure(responses=["partial answer"], name_suffix=provider)
+        return RoutedChatModel(backends=[ScheduledChatModel(inner=inner, provider=provider)])
+
+    def stream_sync(model):
+        try:
+            list(model.stream([HumanMessage(content="hi")]))
+            assert False, "the stream should fail"
+        except RuntimeError:
+            pass
+
+    async def stream_async(model):
+        try:
+            [chunk async for chunk in model.astream([HumanMessage(content="hi")])]
+            assert False, "the stream should fail"
+        except RuntimeError:
+            pass
+
+    sync_model, async_model = model("midstream-sync"), model("midstream-async")
+    for _ in range(settings.LLM_CIRCUIT_FAILURE_THRESHOLD):
+        stream_sync(sync_model)
+        asyncio.run(stream_async(async_model))
+    for provider in ("midstream-sync", "midstream-async"):
+        stats = llm_router.health(provider).get_stats()
+        assert stats["state"] == "open"
+        assert stats["failures"] == stats["requests"] == settings.LLM_CIRCUIT_FAILURE_THRESHOLD
+
+
+def test_tools_are_bound_per_backend():
+    async def run():
+        model = RoutedChatModel(backends=[make_backend("tools-p")])
+
+        def lookup(ticket_id: str) -> str:
+            """Look up a ticket"""
+            return ticket_id
+
+        result = await model.bind_tools([lookup]).ainvoke([HumanMessage(content="hi")])
+        assert result.content == "answer from tools-p"
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_slow_primary_is_hedged_and_secondary_wins()
+    test_failover_and_circuit_breaker()
+    test_sync_invoke_fails_over()
+    test_mid_stream_failures_open_the_circuit()
+    test_tools_are_bound_per_backend()
+    print("[OK] All LLM router tests passed!")
@@ -0,0 +1,131 @@
+"""
+Tests for the LLM concurrency scheduler
+Runs without any LLM provider: limiters are exercised directly and the
+ScheduledChatModel wraps a LangChain fake chat model.
+"""
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from app.core.llm_scheduler import (
+    Priority,
+    ProviderLimiter,
+    ScheduledChatModel,
+    llm_call_context,
+    llm_scheduler,
+)
+
+
+def test_concurrency_cap_and_priority_order():
+    """Only max_concurrency calls run; queued interactive calls go before background"""
+    async def run():
+        limiter = ProviderLimiter("test", max_concurrency=1)
+        order = []
+
+        first = await limiter.acquire(10, Priority.BACKGROUND, "t0")
+        assert limiter.in_flight == 1
+
+        async def call(name, priority, thread_id):
+            ticket = await limiter.acquire(10, priority, thread_id)
+            order.append(name)
+            limiter.release(ticket)
+
+        tasks = [
+            asyncio.create_task(call("background", Priority.BACKGROUND, "t1")),
+            asyncio.create_task(call("interactive", Priority.INTERACTIVE, "t2")),
+        ]
+        await asyncio.sleep(0.01)
+        assert limiter.get_stats()["queue_depth"] == 2
+
+        limiter.release(first)
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "background"]
+        assert limiter.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_fair_sharing_between_threads():
+    """A thread with many queued calls does not starve a thread with one"""
+    async def run():
+        limiter = ProviderLimiter("test", max_concurrency=1)
+        order = []
+        blocker = await limiter.acquire(1, Priority.NORMAL, "busy")
+
+        async def call(thread_id):
+            ticket = await limiter.acquire(1, Priority.NORMAL, thread_id)
+            order.append(thread_id)
+            limiter.release(ticket)
+
+        tasks = [asyncio.create_task(call("busy")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(call("quiet")))
+        await asyncio.sleep(0.01)
+
+        limiter.release(blocker)
+        await asyncio.gather(*tasks)
+        assert order.index("quiet") <= 1, order
+
+    asyncio.run(run())
+
+
+def test_tokens_per_minute_budget_delays_calls():
+    """A call that does not fit the remaining token budget waits for refill"""
+    async def run():
+        limiter = ProviderLimiter("test", max_concurrency=4, tokens_per_minute=6000)  # 100 tokens/sec
+        ticket = await limiter.acquire(6000, Priority.NORMAL, "t1")
+        limiter.release(ticket)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ticket = await limiter.acquire(20, Priority.NORMAL, "t1")
+        limiter.release(ticket)
+        assert loop.time() - started >= 0.15
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def run():
+        limiter = ProviderLimiter("test", max_concurrency=1)
+        held = await limiter.acquire(1, Priority.NORMAL, "t1")
+        waiting = asyncio.create_task(limiter.acquire(1, Priority.NORMAL, "t2"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        limiter.release(held)
+        assert limiter.in_flight == 0
+        assert limiter.get_stats()["queue_depth"] == 0
+
+    asyncio.run(run())
+
+
+def test_scheduled_chat_model_routes_through_limiter():
+    async def run():
+        model = ScheduledChatModel(
+            inner=GenericFakeChatModel(messages=iter([AIMessage(content="hello there")])),
+            provider="fake-test",
+        )
+        with llm_call_context(Priority.INTERACTIVE, thread_id="thread-1"):
+            chunks = [chunk.content async for chunk in model.astream([HumanMessage(content="hi")])]
+        assert "".join(chunks) == "hello there"
+
+        stats = llm_scheduler.get_stats()["fake-test"]
+        assert stats["granted_total"] == 1
+        assert stats["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_concurrency_cap_and_priority_order()
+    test_fair_sharing_between_threads()
+    test_tokens_per_minute_budget_delays_calls()
+    test_cancelled_waiter_does_not_leak_slot()
+    test_scheduled_chat_model_routes_through_limiter()
+    print("[OK] All LLM scheduler tests passed!")
@@ -0,0 +1,174 @@
+"""
+Tests for the composite server's batch_call tool
+"""
+import asyncio
+import inspect
+import json
+import subprocess
+import sys
+import os
+import tempfile
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastmcp import Client, FastMCP
+from app.core.config import settings
+from app.mcp.batch import BATCH_TOOL, run_batch
+from app.mcp.mcp_client_langgraph import MCPClientManager
+from app.mcp.result_cache import ToolResultCache
+
+
+def make_server(max_concurrency: int = 2):
+    """Composite-style server with a slow ticket lookup and batch_call"""
+    stats = {"running": 0, "peak": 0, "calls": 0}
+    servicenow = FastMCP("ServiceNow")
+
+    @servicenow.tool()
+    async def get_servicenow_ticket(ticket_id: str) -> dict:
+        stats["calls"] += 1
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            stats["running"] -= 1
+        if ticket_id == "BAD":
+            raise ValueError("Malformed ticket id")
+        return {"ticket_id": ticket_id, "status": "Open"}
+
+    @servicenow.tool()
+    async def search_servicenow_tickets(status: str = None) -> list:
+        return ["INC1", "INC2"]
+
+    mcp = FastMCP("EnterpriseHub")
+    mcp.mount(servicenow, prefix="servicenow")
+
+    @mcp.tool(name=BATCH_TOOL)
+    async def batch_call(calls: list) -> list:
+        return await run_batch(mcp, calls, max_concurrency=max_concurrency)
+
+    cache = ToolResultCache(ttl=60)
+    mcp.add_middleware(cache)
+    return mcp, stats, cache
+
+
+def test_fastmcp_private_call_path():
+    # run_batch relies on this private FastMCP method; fail loudly if an upgrade changes it
+    method = getattr(FastMCP, "_call_tool_middleware", None)
+    assert method is not None, "FastMCP._call_tool_middleware is gone: update app.mcp.batch.run_batch"
+    assert list(inspect.signature(method).parameters) == ["self", "key", "arguments"], \
+        "FastMCP._call_tool_middleware changed signature: update app.mcp.batch.run_batch"
+
+
+def test_results_are_ordered_with_per_call_errors():
+    async def run():
+        mcp, stats, cache = make_server(max_concurrency=2)
+        calls = [{"tool": "servicenow_get_servicenow_ticket", "args": {"ticket_id": f"INC{i}"}} for i in range(5)]
+        calls += [
+            {"tool": "servicenow_get_servicenow_ticket", "args": {"ticket_id": "BAD"}},
+            {"tool": "servicenow_no_such_tool", "args": {}},
+            {"tool": "servicenow_get_servicenow_ticket", "args": {}},
+            {"tool": BATCH_TOOL, "args": {"calls": []}},
+            {"tool": "servicenow_search_servicenow_tickets"},
+        ]
+        async with Client(mcp) as client:
+            result = await client.call_tool(BATCH_TOOL, {"calls": calls})
+        results = result.structured_content["result"]
+        assert [r["tool"] for r in results] == [c["tool"] for c in calls]
+        assert [r["result"]["ticket_id"] for r in results[:5]] == [f"INC{i}" for i in range(5)]
+        assert [r["ok"] for r in results[5:]] == [False, False, False, False, True]
+        assert "Malformed ticket id" in results[5]["error"]
+        assert "nested" in results[8]["error"]
+        assert results[9]["result"] == ["INC1", "INC2"]
+        assert stats["peak"] == 2  # Concurrency cap
+        # Batched reads go through the result cache like direct calls
+        assert cache.get_stats()["entries"] == 6
+
+    asyncio.run(run())
+
+
+def test_batch_size_is_bounded():
+    async def run():
+        mcp, stats, cache = make_server()
+        calls = [{"tool": "servicenow_search_servicenow_tickets"}] * (settings.MCP_BATCH_MAX_CALLS + 1)
+        async with Client(mcp) as client:
+            result = await client.call_tool(BATCH_TOOL, {"calls": calls}, raise_on_error=False)
+        assert result.is_error and "at most" in result.content[0].text
+
+    asyncio.run(run())
+
+
+def test_manager_helper():
+    previous = settings.MCP_TRANSPORT, settings.MCP_TOOL_CATALOG_PATH
+    settings.MCP_TRANSPORT, settings.MCP_TOOL_CATALOG_PATH = "inprocess", ""
+
+    async def run():
+        mcp, stats, cache = make_server()
+        manager = MCPClientManager()
+        manager._client_factory = lambda: (lambda: Client(mcp))
+        try:
+            assert await manager.batch_call([]) == []
+            results = await manager.batch_call([
+                {"tool": "servicenow_get_servicenow_ticket", "args": {"ticket_id": "INC1"}},
+                {"tool": "servicenow_get_servicenow_ticket", "args": {"ticket_id": "INC1"}},
+            ])
+            assert all(r["ok"] and r["result"]["status"] == "Open" for r in results)
+            assert manager.get_pool_stats()["calls"] == 1
+        finally:
+            await manager.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        settings.MCP_TRANSPORT, settings.MCP_TOOL_CATALOG_PATH = previous
+
+
+COMPOSITE_BATCH_SCRIPT = f"""
+import asyncio, json, logging, sys
+sys.path.insert(0, {BACKEND_DIR!r})
+logging.disable(logging.CRITICAL)
+from fastmcp import Client
+from app.core.database import engine
+engine.echo = False
+from app.mcp.batch import BATCH_TOOL
+from app.mcp.composite_server import mcp
+
+async def main():
+    async with Client(mcp) as client:
+        result = await client.call_tool(BATCH_TOOL, {{"calls": [
+            {{"tool": "resource_list_resource_groups", "args": {{}}}},
+            {{"tool": "resource_get_vm_status", "args": {{"name": "missing-vm", "resource_group": "default-rg"}}}},
+            {{"tool": "resource_get_vm_status", "args": {{"vm_name": "missing-vm"}}}},
+        ]}})
+    return result.structured_content["result"]
+
+print(json.dumps(asyncio.run(main()), default=str))
+"""
+
+
+def test_composite_server_exposes_batch_call():
+    # The resource tools use the database; run the server against a temporary one
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(tmp, 'test.db')}"}
+        output = subprocess.run(
+            [sys.executable, "-c", COMPOSITE_BATCH_SCRIPT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+    assert output.returncode == 0, output.stderr
+    results = json.loads(output.stdout.strip().splitlines()[-1])
+    assert [r["ok"] for r in results] == [True, True, False]
+    assert "default-rg" in str(results[0]["result"]) and "not found" in results[1]["result"]
+
+
+if __name__ == "__main__":
+    test_fastmcp_private_call_path()
+    print("[OK] FastMCP private call path")
+    test_results_are_ordered_with_per_call_errors()
+    print("[OK] Results ordered with per-call errors")
+    test_batch_size_is_bounded()
+    print("[OK] Batch size bounded")
+    test_manager_helper()
+    print("[OK] Manager helper")
+    test_composite_server_exposes_batch_call()
+    print("[OK] Composite server exposes batch_call")
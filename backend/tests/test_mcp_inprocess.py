@@ -0,0 +1,82 @@
+"""
+Tests for the in-process MCP transport (MCP_TRANSPORT=inprocess)
+"""
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.mcp.composite_server import mcp
+from app.mcp.mcp_client_langgraph import MCPClientManager
+
+
+def inprocess(test):
+    def wrapper():
+        previous = settings.MCP_TRANSPORT
+        settings.MCP_TRANSPORT = "inprocess"
+        try:
+            test()
+        finally:
+            settings.MCP_TRANSPORT = previous
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@inprocess
+def test_same_tool_names_as_the_composite_server():
+    async def run():
+        manager = MCPClientManager()
+        try:
+            tools = await manager.get_all_tools()
+            assert sorted(tool.name for tool in tools) == sorted(await mcp.get_tools())
+            resource_tools = await manager.get_tools_by_prefix("resource_")
+            assert resource_tools and all(tool.name.startswith("resource_") for tool in resource_tools)
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+
+
+@inprocess
+def test_tool_calls_share_one_session():
+    async def run():
+        manager = MCPClientManager()
+        try:
+            [tool] = await manager.get_tools_by_names(["resource_list_resource_groups"])
+            pool = manager._pool
+            results = await asyncio.gather(*[tool.ainvoke({}) for _ in range(5)])
+            assert all(result == results[0] for result in results)
+            assert "default-rg" in str(results[0])
+            assert manager._pool is pool
+            stats = manager.get_pool_stats()
+            assert stats["size"] == 1 and stats["connected"] == 1 and stats["reconnects"] == 0
+        finally:
+            await manager.close()
+        assert manager._pool is None
+
+    asyncio.run(run())
+
+
+@inprocess
+def test_reconnects_on_a_new_event_loop():
+    manager = MCPClientManager()
+
+    async def names():
+        return [tool.name for tool in await manager.get_tools_by_prefix("intune_")]
+
+    first = asyncio.run(names())
+    # The first loop is closed; its session and tools must not be reused
+    assert asyncio.run(names()) == first
+    asyncio.run(manager.close())
+
+
+if __name__ == "__main__":
+    test_same_tool_names_as_the_composite_server()
+    print("[OK] Same tool names as the composite server")
+    test_tool_calls_share_one_session()
+    print("[OK] Tool calls share one session")
+    test_reconnects_on_a_new_event_loop()
+    print("[OK] Reconnects on a new event loop")
@@ -0,0 +1,159 @@
+"""
+Tests for the composite server's read-only tool result cache
+"""
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client, FastMCP
+from app.mcp.result_cache import ToolResultCache
+
+
+def make_server(**cache_options):
+    """Composite-style server with stand-ins for ServiceNow and Intune tools"""
+    tickets = {"INC1": "Open", "INC2": "Open"}
+    devices = {"DEV1": "Enrolled"}
+    calls = {"get": 0, "search": 0, "list_devices": 0}
+
+    servicenow = FastMCP("ServiceNow")
+    intune = FastMCP("Intune")
+
+    @servicenow.tool()
+    async def get_servicenow_ticket(ticket_id: str) -> dict:
+        calls["get"] += 1
+        if ticket_id not in tickets:
+            return {"error": f"Ticket {ticket_id} not found"}
+        return {"ticket_id": ticket_id, "status": tickets[ticket_id]}
+
+    @servicenow.tool()
+    async def search_servicenow_tickets(status: str = None) -> list:
+        calls["search"] += 1
+        await asyncio.sleep(0.05)
+        return sorted(t for t, s in tickets.items() if status is None or s == status)
+
+    @servicenow.tool()
+    async def update_servicenow_ticket_status(ticket_id: str, status: str) -> dict:
+        tickets[ticket_id] = status
+        return {"ticket_id": ticket_id, "status": status}
+
+    @servicenow.tool()
+    async def create_servicenow_ticket(title: str) -> dict:
+        ticket_id = f"INC{len(tickets) + 1}"
+        tickets[ticket_id] = "Open"
+        return {"ticket_id": ticket_id}
+
+    @intune.tool()
+    async def list_intune_devices(user_email: str = None) -> list:
+        calls["list_devices"] += 1
+        return sorted(devices)
+
+    cache = ToolResultCache(ttl=60, **cache_options)
+    mcp = FastMCP("EnterpriseHub")
+    mcp.mount(servicenow, prefix="servicenow")
+    mcp.mount(intune, prefix="intune")
+    mcp.add_middleware(cache)
+    return mcp, cache, calls
+
+
+def test_reads_are_cached_per_argument_tuple():
+    async def run():
+        mcp, cache, calls = make_server()
+        async with Client(mcp) as client:
+            first = await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            again = await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            assert first.data == again.data == {"ticket_id": "INC1", "status": "Open"}
+            assert calls["get"] == 1
+
+            await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC2"})
+            assert calls["get"] == 2
+            # Omitted and None arguments are the same call
+            await client.call_tool("servicenow_search_servicenow_tickets", {})
+            await client.call_tool("servicenow_search_servicenow_tickets", {"status": None})
+            assert calls["search"] == 1
+
+            # Error results are not cached
+            await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC9"})
+            await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC9"})
+            assert calls["get"] == 4
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["entries"] == 3
+
+    asyncio.run(run())
+
+
+def test_mutation_invalidates_only_touched_entities():
+    async def run():
+        mcp, cache, calls = make_server()
+        async with Client(mcp) as client:
+            for ticket_id in ("INC1", "INC2"):
+                await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": ticket_id})
+            await client.call_tool("servicenow_search_servicenow_tickets", {"status": "Open"})
+            await client.call_tool("intune_list_intune_devices", {})
+
+            await client.call_tool("servicenow_update_servicenow_ticket_status", {"ticket_id": "INC1", "status": "Closed"})
+
+            updated = await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            assert updated.data["status"] == "Closed"
+            assert calls["get"] == 3
+            # Another ticket and another server's reads stay cached
+            await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC2"})
+            await client.call_tool("intune_list_intune_devices", {})
+            assert calls["get"] == 3 and calls["list_devices"] == 1
+            # Searches cover the whole collection
+            found = await client.call_tool("servicenow_search_servicenow_tickets", {"status": "Open"})
+            assert found.data == ["INC2"] and calls["search"] == 2
+
+            # Creating a ticket names no ticket id, but still changes searches
+            await client.call_tool("servicenow_create_servicenow_ticket", {"title": "New laptop"})
+            found = await client.call_tool("servicenow_search_servicenow_tickets", {"status": "Open"})
+            assert found.data == ["INC2", "INC3"]
+        assert cache.get_stats()["invalidations"] == 3
+
+    asyncio.run(run())
+
+
+def test_read_overlapping_a_write_is_not_cached():
+    async def run():
+        mcp, cache, calls = make_server()
+        async with Client(mcp) as client:
+            read = asyncio.create_task(client.call_tool("servicenow_search_servicenow_tickets", {"status": "Open"}))
+            await asyncio.sleep(0.02)  # The search is running when the write arrives
+            await client.call_tool("servicenow_update_servicenow_ticket_status", {"ticket_id": "INC2", "status": "Closed"})
+            await read
+            assert cache.get_stats()["entries"] == 0
+            found = await client.call_tool("servicenow_search_servicenow_tickets", {"status": "Open"})
+        assert found.data == ["INC1"] and calls["search"] == 2
+
+    asyncio.run(run())
+
+
+def test_lru_bound():
+    async def run():
+        mcp, cache, calls = make_server(max_entries=2)
+        async with Client(mcp) as client:
+            for ticket_id in ("INC1", "INC2", "INC1", "INC3", "INC1"):
+                await client.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": ticket_id})
+        assert cache.get_stats()["evictions"] == 0  # INC3 does not exist, so it was never cached
+
+        cache.clear()
+        async with Client(mcp) as client:
+            for args in ({"ticket_id": "INC1"}, {"ticket_id": "INC2"}, {}):
+                tool = "servicenow_get_servicenow_ticket" if args else "servicenow_search_servicenow_tickets"
+                await client.call_tool(tool, args)
+        assert cache.get_stats()["entries"] == 2 and cache.get_stats()["evictions"] == 1
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_reads_are_cached_per_argument_tuple()
+    print("[OK] Reads cached per argument tuple")
+    test_mutation_invalidates_only_touched_entities()
+    print("[OK] Mutations invalidate only touched entities")
+    test_read_overlapping_a_write_is_not_cached()
+    print("[OK] Reads overlapping a write are not cached")
+    test_lru_bound()
+    print("[OK] LRU bound")
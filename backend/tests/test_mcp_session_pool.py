@@ -0,0 +1,180 @@
+"""
+Tests for the pooled MCP client sessions (app.mcp.session_pool)
+"""
+import asyncio
+import socket
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client, FastMCP
+from app.core.config import settings
+from app.mcp.mcp_client_langgraph import MCPClientManager
+from app.mcp.session_pool import MCPSessionPool, MCPUnavailableError
+
+
+def make_server():
+    """Composite-style server with one read, one write and one slow tool"""
+    calls = {"get": 0, "update": 0}
+    mcp = FastMCP("EnterpriseHub")
+
+    @mcp.tool()
+    async def servicenow_get_servicenow_ticket(ticket_id: str) -> dict:
+        calls["get"] += 1
+        return {"ticket_id": ticket_id, "status": "Open"}
+
+    @mcp.tool()
+    async def servicenow_update_servicenow_ticket_status(ticket_id: str, status: str) -> dict:
+        calls["update"] += 1
+        return {"ticket_id": ticket_id, "status": status}
+
+    @mcp.tool()
+    async def servicenow_search_servicenow_tickets(status: str = None) -> list:
+        await asyncio.sleep(1)
+        return []
+
+    return mcp, calls
+
+
+class Unreachable:
+    """Stands in for a client whose server refuses connections"""
+
+    async def __aenter__(self):
+        raise ConnectionError("connection refused")
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def break_session(pool: MCPSessionPool, index: int):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("connection reset")
+    pool._slots[index].client.session.call_tool = broken
+
+
+def test_reconnects_with_backoff_until_the_server_is_up():
+    async def run():
+        mcp, calls = make_server()
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            return Unreachable() if len(attempts) <= 3 else Client(mcp)
+
+        pool = MCPSessionPool(factory, size=1, backoff=0.01, backoff_max=0.05, health_interval=0)
+        try:
+            await pool.start()
+            assert await pool.wait_connected(timeout=5)
+            assert len(attempts) == 4
+            result = await pool.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            assert result.structuredContent == {"ticket_id": "INC1", "status": "Open"}
+            [session] = pool.get_stats()["sessions"]
+            assert session["connected"] and session["consecutive_failures"] == 0
+        finally:
+            await pool.close()
+
+        # Nothing to connect to: callers get an error after connect_timeout, not a hang
+        pool = MCPSessionPool(Unreachable, size=2, connect_timeout=0.2, backoff=0.05, health_interval=0)
+        try:
+            try:
+                await pool.list_tools()
+                raise AssertionError("expected MCPUnavailableError")
+            except MCPUnavailableError as e:
+                assert "connection refused" in str(e)
+            assert pool.get_stats()["connected"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_read_only_calls_retry_on_another_session():
+    async def run():
+        mcp, calls = make_server()
+        pool = MCPSessionPool(lambda: Client(mcp), size=2, backoff=0.01, health_interval=0)
+        try:
+            await pool.start()
+            while pool.get_stats()["connected"] < 2:
+                await asyncio.sleep(0.01)
+
+            break_session(pool, 0)
+            break_session(pool, 1)
+            pool._slots[1].in_flight = 1  # Route the first attempt to session 0
+            # Both sessions are broken and mutations are never retried
+            try:
+                await pool.call_tool("servicenow_update_servicenow_ticket_status", {"ticket_id": "INC1", "status": "Closed"})
+                raise AssertionError("expected ConnectionError")
+            except ConnectionError:
+                pass
+            assert calls["update"] == 0 and pool.retries == 0
+            pool._slots[1].in_flight = 0
+
+            # Session 0 reconnects in the background; a read on broken session 1 moves to it
+            while not pool._slots[0].connected:
+                await asyncio.sleep(0.01)
+            pool._slots[0].in_flight = 1
+            result = await pool.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            pool._slots[0].in_flight = 0
+            assert result.structuredContent["ticket_id"] == "INC1"
+            stats = pool.get_stats()
+            assert stats["retries"] == 1 and stats["reconnects"] == 2 and stats["errors"] == 2
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_calls_time_out_without_dropping_the_session():
+    async def run():
+        mcp, calls = make_server()
+        pool = MCPSessionPool(lambda: Client(mcp), size=1, call_timeout=0.1, health_interval=0)
+        try:
+            try:
+                await pool.call_tool("servicenow_search_servicenow_tickets", {})
+                raise AssertionError("expected TimeoutError")
+            except TimeoutError:
+                pass
+            await pool.call_tool("servicenow_get_servicenow_ticket", {"ticket_id": "INC1"})
+            stats = pool.get_stats()
+            assert stats["timeouts"] == 1 and stats["retries"] == 0 and stats["reconnects"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_manager_starts_without_the_mcp_server():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    previous = settings.MCP_TRANSPORT, settings.MCP_COMPOSITE_URL, settings.MCP_CONNECT_TIMEOUT_SECONDS
+    settings.MCP_TRANSPORT, settings.MCP_COMPOSITE_URL = "http", f"http://127.0.0.1:{port}/mcp"
+    settings.MCP_CONNECT_TIMEOUT_SECONDS = 0.5
+
+    async def run():
+        manager = MCPClientManager()
+        try:
+            assert await manager.get_tools_by_prefix("intune_") == []
+            assert manager._tools_cache is None  # Retried on the next request
+            stats = manager.get_pool_stats()
+            assert stats["connected"] == 0 and stats["sessions"][0]["last_error"]
+        finally:
+            await manager.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        settings.MCP_TRANSPORT, settings.MCP_COMPOSITE_URL, settings.MCP_CONNECT_TIMEOUT_SECONDS = previous
+
+
+if __name__ == "__main__":
+    test_reconnects_with_backoff_until_the_server_is_up()
+    print("[OK] Reconnects with backoff until the server is up")
+    test_read_only_calls_retry_on_another_session()
+    print("[OK] Read-only calls retry on another session")
+    test_calls_time_out_without_dropping_the_session()
+    print("[OK] Calls time out without dropping the session")
+    test_manager_starts_without_the_mcp_server()
+    print("[OK] Manager starts without the MCP server")
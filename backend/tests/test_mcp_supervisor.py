@@ -0,0 +1,115 @@
+"""
+Tests for the MCP server supervisor (scripts/start_mcp_servers.py)
+"""
+import asyncio
+import importlib.util
+import socket
+import sys
+import os
+import tempfile
+import textwrap
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_spec = importlib.util.spec_from_file_location("start_mcp_servers", os.path.join(BACKEND_DIR, "scripts", "start_mcp_servers.py"))
+start_mcp_servers = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(start_mcp_servers)
+
+# Stand-in server: fails its first FAIL_TIMES starts, then serves /health
+FAKE_SERVER = textwrap.dedent("""
+    import http.server, os, sys
+    counter = sys.argv[1]
+    starts = int(open(counter).read()) if os.path.exists(counter) else 0
+    open(counter, "w").write(str(starts + 1))
+    print(f"start {starts + 1}", flush=True)
+    if starts < int(os.environ["FAIL_TIMES"]):
+        sys.exit(3)
+
+    class Health(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/health" else 404)
+            self.end_headers()
+
+    http.server.HTTPServer(("127.0.0.1", int(os.environ["MCP_SERVER_PORT"])), Health).serve_forever()
+""")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_servers(tmp: str, fail_times: list):
+    script = Path(tmp) / "fake_server.py"
+    script.write_text(FAKE_SERVER)
+    servers = []
+    for i, fails in enumerate(fail_times):
+        port = free_port()
+        servers.append(start_mcp_servers.ManagedServer(
+            name=f"fake{i}",
+            command=[sys.executable, str(script), str(Path(tmp) / f"starts{i}")],
+            port=port,
+            log_path=Path(tmp) / "logs" / f"fake{i}.log",
+            env={"MCP_SERVER_PORT": str(port), "FAIL_TIMES": str(fails)},
+        ))
+    return servers
+
+
+def supervisor_for(servers):
+    return start_mcp_servers.Supervisor(
+        servers, startup_timeout=10, health_interval=0.2, max_probe_failures=2,
+        backoff=0.1, max_backoff=0.5, on_event=lambda message: None,
+    )
+
+
+def test_starts_concurrently_and_restarts_crashing_servers():
+    async def run(tmp):
+        servers = make_servers(tmp, fail_times=[0, 2])
+        supervisor = supervisor_for(servers)
+        try:
+            await asyncio.wait_for(supervisor.start(), 30)
+            assert [s.state for s in servers] == ["ready", "ready"]
+            assert all(s.startup_seconds is not None for s in servers)
+            assert [s.restarts for s in servers] == [0, 2]
+            assert "exited during startup with code 3" in servers[1].last_exit
+            # Output went to the log file, one section per start
+            assert servers[1].log_path.read_text().count("start ") == 3
+            assert "fake1" in supervisor.report()
+        finally:
+            await supervisor.stop()
+        assert all(s.process.returncode is not None for s in servers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+
+
+def test_restarts_a_server_that_dies_after_startup():
+    async def run(tmp):
+        [server] = make_servers(tmp, fail_times=[0])
+        supervisor = supervisor_for([server])
+        try:
+            await asyncio.wait_for(supervisor.start(), 30)
+            first = server.process
+            first.kill()
+            for _ in range(150):
+                if server.restarts == 1 and server.state == "ready":
+                    break
+                await asyncio.sleep(0.1)
+            assert server.restarts == 1 and server.state == "ready"
+            assert server.process is not first and "exited with code" in server.last_exit
+        finally:
+            await supervisor.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+
+
+if __name__ == "__main__":
+    test_starts_concurrently_and_restarts_crashing_servers()
+    print("[OK] Starts concurrently and restarts crashing servers")
+    test_restarts_a_server_that_dies_after_startup()
+    print("[OK] Restarts a server that dies after startup")
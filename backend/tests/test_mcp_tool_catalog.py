@@ -0,0 +1,155 @@
+"""
+Tests for the on-disk MCP tool catalog and the manager's tool lookups
+"""
+import asyncio
+import json
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client, FastMCP
+from app.core.config import settings
+from app.mcp.mcp_client_langgraph import MCPClientManager
+from app.mcp.tool_catalog import load_catalog
+
+
+def make_server(with_search: bool = False):
+    mcp = FastMCP("EnterpriseHub")
+
+    @mcp.tool()
+    async def servicenow_get_servicenow_ticket(ticket_id: str) -> dict:
+        return {"ticket_id": ticket_id}
+
+    @mcp.tool()
+    async def intune_list_intune_devices() -> list:
+        return ["DEV1"]
+
+    if with_search:
+        @mcp.tool()
+        async def servicenow_search_servicenow_tickets(status: str = None) -> list:
+            return []
+
+    return mcp
+
+
+class Unreachable:
+    async def __aenter__(self):
+        raise ConnectionError("connection refused")
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def manager_for(factory) -> MCPClientManager:
+    manager = MCPClientManager()
+    manager._client_factory = lambda: factory
+    return manager
+
+
+def with_catalog(test):
+    def wrapper():
+        previous = settings.MCP_TRANSPORT, settings.MCP_TOOL_CATALOG_PATH, settings.MCP_CONNECT_TIMEOUT_SECONDS
+        with tempfile.TemporaryDirectory() as tmp:
+            settings.MCP_TRANSPORT = "inprocess"
+            settings.MCP_TOOL_CATALOG_PATH = os.path.join(tmp, "catalog.json")
+            settings.MCP_CONNECT_TIMEOUT_SECONDS = 0.3
+            try:
+                test(settings.MCP_TOOL_CATALOG_PATH)
+            finally:
+                settings.MCP_TRANSPORT, settings.MCP_TOOL_CATALOG_PATH, settings.MCP_CONNECT_TIMEOUT_SECONDS = previous
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_catalog
+def test_catalog_is_saved_and_used_without_the_server(path):
+    mcp = make_server()
+
+    async def first_run():
+        manager = manager_for(lambda: Client(mcp))
+        try:
+            return [tool.name for tool in await manager.get_all_tools()]
+        finally:
+            await manager.close()
+
+    names = asyncio.run(first_run())
+    saved = load_catalog(path, "inprocess")
+    assert saved is not None and sorted(tool.name for tool in saved[0]) == sorted(names)
+    assert load_catalog(path, "http://localhost:8001/mcp") is None
+
+    async def server_down():
+        manager = manager_for(Unreachable)
+        try:
+            tools = await manager.get_tools_by_prefix("servicenow_")
+            assert [tool.name for tool in tools] == ["servicenow_get_servicenow_ticket"]
+            assert manager.get_pool_stats()["connected"] == 0
+            # Calls still need the server
+            try:
+                await tools[0].ainvoke({"ticket_id": "INC1"})
+                raise AssertionError("expected the call to fail")
+            except ConnectionError:
+                pass
+        finally:
+            await manager.close()
+
+    asyncio.run(server_down())
+
+
+@with_catalog
+def test_background_revalidation_picks_up_new_tools(path):
+    async def save_old_catalog():
+        manager = manager_for(lambda: Client(make_server()))
+        await manager.get_all_tools()
+        await manager.close()
+
+    asyncio.run(save_old_catalog())
+    old_hash = json.load(open(path))["hash"]
+
+    async def run():
+        manager = manager_for(lambda: Client(make_server(with_search=True)))
+        try:
+            assert len(await manager.get_all_tools()) == 2  # Served from disk
+            await manager._revalidation
+            names = [tool.name for tool in await manager.get_tools_by_prefix("servicenow_")]
+            assert sorted(names) == ["servicenow_get_servicenow_ticket", "servicenow_search_servicenow_tickets"]
+            result = await manager.get_tools_by_names(["servicenow_search_servicenow_tickets"])
+            assert len(result) == 1
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+    saved = json.load(open(path))
+    assert saved["hash"] != old_hash and len(saved["tools"]) == 3
+
+
+@with_catalog
+def test_unreadable_catalog_falls_back_to_the_server(path):
+    with open(path, "w") as f:
+        f.write("{not json")
+
+    async def run():
+        manager = manager_for(lambda: Client(make_server()))
+        try:
+            assert len(await manager.get_all_tools()) == 2
+            # Lookups with uncommon prefixes are filtered once, then served from the map
+            first = await manager.get_tools_by_prefix("servicenow_get")
+            assert [tool.name for tool in first] == ["servicenow_get_servicenow_ticket"]
+            assert "servicenow_get" in manager._by_prefix
+            assert await manager.get_tools_by_prefix("missing_") == []
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+    assert load_catalog(path, "inprocess") is not None
+
+
+if __name__ == "__main__":
+    test_catalog_is_saved_and_used_without_the_server()
+    print("[OK] Catalog saved and used without the server")
+    test_background_revalidation_picks_up_new_tools()
+    print("[OK] Background revalidation picks up new tools")
+    test_unreadable_catalog_falls_back_to_the_server()
+    print("[OK] Unreadable catalog falls back to the server")
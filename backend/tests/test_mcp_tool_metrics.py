@@ -0,0 +1,166 @@
+"""
+Tests for per-tool MCP metrics (middleware, /metrics and get_server_stats)
+"""
+import asyncio
+import json
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from app.mcp.result_cache import ToolResultCache
+from app.mcp.tool_metrics import STATS_TOOL, ToolMetrics, install_tool_metrics, tool_metrics
+
+
+class FakeClock:
+    """Time that only moves when a tool says so"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_server(clock: FakeClock = None):
+    clock = clock or FakeClock()
+    mcp = FastMCP("Metrics")
+
+    @mcp.tool()
+    async def get_servicenow_ticket(ticket_id: str) -> dict:
+        clock.now += 0.02
+        if ticket_id == "missing":
+            return {"error": "Ticket missing not found"}
+        return {"ticket_id": ticket_id, "description": "x" * 2000}
+
+    @mcp.tool()
+    async def broken() -> str:
+        clock.now += 0.001
+        raise RuntimeError("boom")
+
+    return mcp
+
+
+def test_counts_latency_sizes_and_errors():
+    async def run():
+        clock = FakeClock()
+        mcp = make_server(clock)
+        metrics = ToolMetrics(clock=clock)
+        mcp.add_middleware(metrics)
+        async with Client(mcp) as client:
+            for ticket_id in ("INC1", "INC2", "missing"):
+                await client.call_tool("get_servicenow_ticket", {"ticket_id": ticket_id})
+            try:
+                await client.call_tool("broken", {})
+                assert False, "broken should raise"
+            except ToolError:
+                pass
+
+        stats = metrics.get_stats()
+        assert stats["calls"] == 4 and stats["errors"] == 2
+        ticket = stats["tools"]["get_servicenow_ticket"]
+        assert ticket["calls"] == 3 and ticket["errors"] == 1 and ticket["error_rate"] == 0.3333
+        assert ticket["avg_ms"] == 20.0 and ticket["p50_ms_le"] == 25.0 and ticket["total_seconds"] == 0.06
+        sizes = [len(json.dumps({"ticket_id": t})) for t in ("INC1", "INC2", "missing")]
+        assert ticket["avg_request_bytes"] == round(sum(sizes) / 3)
+        assert ticket["avg_response_bytes"] > 1000
+        assert stats["tools"]["broken"]["error_rate"] == 1.0
+        # Slowest (by total time) first
+        assert list(stats["tools"]) == ["get_servicenow_ticket", "broken"]
+
+    asyncio.run(run())
+
+
+def test_prometheus_text():
+    clock = FakeClock()
+    metrics = ToolMetrics(clock=clock)
+
+    async def run():
+        mcp = make_server(clock)
+        mcp.add_middleware(metrics)
+        async with Client(mcp) as client:
+            await client.call_tool("get_servicenow_ticket", {"ticket_id": "INC1"})
+            await client.call_tool("get_servicenow_ticket", {"ticket_id": "missing"})
+
+    asyncio.run(run())
+    text = metrics.render_prometheus("Metrics")
+    labels = 'server="Metrics",tool="get_servicenow_ticket"'
+    assert "# TYPE mcp_tool_call_duration_seconds histogram" in text
+    assert f"mcp_tool_calls_total{{{labels}}} 2" in text
+    assert f"mcp_tool_errors_total{{{labels}}} 1" in text
+    assert f'mcp_tool_call_duration_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'mcp_tool_call_duration_seconds_bucket{{{labels},le="0.025"}} 2' in text
+    assert f'mcp_tool_call_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"mcp_tool_response_bytes_count{{{labels}}} 2" in text
+
+
+def test_workers_report_summed_counters():
+    async def call(mcp, times):
+        async with Client(mcp) as client:
+            for _ in range(times):
+                await client.call_tool("get_servicenow_ticket", {"ticket_id": "INC1"})
+
+    def calls(text):
+        line = 'mcp_tool_calls_total{server="Metrics",tool="get_servicenow_ticket"} '
+        return int(text.split(line)[1].split()[0])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workers = [ToolMetrics(clock=FakeClock(), shared_dir=tmp, worker_id=f"w{i}") for i in range(2)]
+        servers = [make_server(metrics.clock) for metrics in workers]
+        for server, metrics in zip(servers, workers):
+            server.add_middleware(metrics)
+
+        asyncio.run(call(servers[0], 3))
+        workers[0].flush()  # Its once-a-second flush
+        # Whichever worker answers, the scrape covers both
+        assert calls(workers[1].render_prometheus("Metrics")) == 3
+        asyncio.run(call(servers[1], 2))
+        assert calls(workers[0].render_prometheus("Metrics")) == 3  # Not flushed by worker 1 yet
+        assert calls(workers[1].render_prometheus("Metrics")) == 5
+        assert calls(workers[0].render_prometheus("Metrics")) == 5  # Never goes backwards
+
+        stats = workers[0].get_stats()
+        assert stats["workers"] == 2 and stats["calls"] == 5
+        assert stats["tools"]["get_servicenow_ticket"]["total_seconds"] == 0.1
+
+
+def test_installed_server_exposes_stats_tool_and_endpoint():
+    async def run():
+        mcp = make_server()
+        cache = ToolResultCache(ttl=60)
+        mcp.add_middleware(cache)
+        install_tool_metrics(mcp, extra_stats=lambda: {"result_cache": cache.get_stats()})
+        install_tool_metrics(mcp)  # Second install is a no-op
+        assert mcp.middleware.count(tool_metrics) == 1 and mcp.middleware[0] is tool_metrics
+        tool_metrics.clear()
+
+        async with Client(mcp) as client:
+            await client.call_tool("get_servicenow_ticket", {"ticket_id": "INC1"})
+            result = await client.call_tool(STATS_TOOL, {})
+        stats = result.structured_content
+        assert stats["pid"] == os.getpid() and "result_cache" in stats
+        assert stats["tools"]["get_servicenow_ticket"]["calls"] == 1
+
+        transport = httpx.ASGITransport(app=mcp.http_app(transport="streamable-http", stateless_http=True))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/metrics")
+        assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+        assert 'mcp_tool_calls_total{server="Metrics",tool="get_servicenow_ticket"} 1' in response.text
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_counts_latency_sizes_and_errors()
+    print("[OK] Counts, latency, sizes and errors")
+    test_prometheus_text()
+    print("[OK] Prometheus text")
+    test_workers_report_summed_counters()
+    print("[OK] Workers report summed counters")
+    test_installed_server_exposes_stats_tool_and_endpoint()
+    print("[OK] Stats tool and /metrics endpoint")
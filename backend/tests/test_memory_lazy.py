@@ -0,0 +1,45 @@
+"""
+Tests for lazy construction of the long-term memory store
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core import memory
+from app.core.config import settings
+
+
+def test_import_does_not_load_embedding_model():
+    code = (
+        "import sys, app.core.memory; "
+        "print(any(m in sys.modules for m in ('sentence_transformers', 'langchain_huggingface', 'app.core.llm')))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "False"
+
+
+def test_store_is_created_once():
+    saved = settings.MEMORY_STORE_PATH, memory._memory_store
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.MEMORY_STORE_PATH = os.path.join(tmp, "memory_store.db")
+        memory._memory_store = None
+        try:
+            store = memory.get_memory_store()
+            assert store is memory.get_memory_store()
+            if hasattr(store, "conn"):
+                store.conn.close()
+        finally:
+            settings.MEMORY_STORE_PATH, memory._memory_store = saved
+
+
+if __name__ == "__main__":
+    test_import_does_not_load_embedding_model()
+    print("[OK] Import does not load the embedding model")
+    test_store_is_created_once()
+    print("[OK] Store created once")
@@ -0,0 +1,162 @@
+"""
+Tests for memory_tools TTLs, per-user quotas and compaction
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.memory_db import SUMMARY_KEY, MemoryDatabase
+
+
+def with_db(**kwargs):
+    def decorator(test):
+        def wrapper():
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "memory.db")
+                db = MemoryDatabase(path, flush_interval=60.0, compact_interval=0, **kwargs)
+                try:
+                    test(db, path)
+                finally:
+                    db.close()
+        wrapper.__name__ = test.__name__
+        return wrapper
+    return decorator
+
+
+@with_db()
+def test_expired_entries_are_hidden_then_deleted(db, path):
+    db.set_context("u1", "c1", "otp", "123456", ttl=0.05)
+    db.set_context("u1", "c1", "project", "laptop refresh", ttl=0)
+    db.set_preference("u1", "status", "on call", ttl=0.05)
+    assert db.get_context("u1", "c1") == {"otp": "123456", "project": "laptop refresh"}
+
+    time.sleep(0.1)
+    # Hidden whether still buffered or already flushed
+    assert db.get_context("u1", "c1") == {"project": "laptop refresh"}
+    db.flush()
+    assert db.get_context("u1", "c1") == {"project": "laptop refresh"}
+    assert db.get_preferences("u1") == {}
+    assert db.search_context("u1", "123456") == []
+
+    assert db.compact()["expired"] == 2
+    assert db.get_stats()["expired"] == 2
+
+
+@with_db(max_context_per_user=4, max_preferences_per_user=2)
+def test_quota_evicts_least_recently_used(db, path):
+    for i in range(1, 5):
+        db.set_context("u1", f"c{i}", "note", f"note {i}")
+        db.flush()
+    db.get_context("u1", "c1")  # c1 is now the most recently used
+    db.set_context("u1", "c5", "note", "note 5")
+    db.set_context("u2", "c1", "note", "other user")
+    db.flush()
+
+    assert db.get_context("u1", "c2") == {}
+    assert db.get_context("u1", "c1") == {"note": "note 1"}
+    assert db.get_user_usage("u1")["context_entries"] == 4
+    assert db.get_user_usage("u2")["context_entries"] == 1
+
+    for key in ("a", "b", "c"):
+        db.set_preference("u1", key, key)
+        db.flush()
+    assert db.get_preferences("u1") == {"b": "b", "c": "c"}
+    assert db.get_stats()["evicted"] == 2
+
+
+@with_db(compact_after=0.05)
+def test_compaction_summarizes_idle_conversations(db, path):
+    db.set_context("u1", "c1", "project", "laptop refresh")
+    db.set_context("u1", "c1", "active_ticket", "INC0000042")
+    db.set_context("u1", "c2", "project", "single entry")
+    db.flush()
+    time.sleep(0.1)
+    db.set_context("u1", "c3", "project", "still active")
+    db.set_context("u1", "c3", "decision", "order docks")
+
+    result = db.compact()
+    assert result["summarized"] == 1
+    assert db.get_context("u1", "c1") == {SUMMARY_KEY: "project: laptop refresh\nactive_ticket: INC0000042"}
+    assert db.get_context("u1", "c2") == {"project": "single entry"}
+    assert len(db.get_context("u1", "c3")) == 2
+    # The summary stays searchable
+    assert [r["conversation_id"] for r in db.search_context("u1", "INC0000042")] == ["c1"]
+
+    # A later entry is folded into the existing summary
+    db.set_context("u1", "c1", "resolution", "replaced battery")
+    db.flush()
+    time.sleep(0.1)
+    db.compact()
+    assert db.get_context("u1", "c1") == {
+        SUMMARY_KEY: "project: laptop refresh\nactive_ticket: INC0000042\nresolution: replaced battery"
+    }
+
+
+def test_migrates_existing_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE user_preferences (user_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+                updated_at REAL NOT NULL, PRIMARY KEY (user_id, key)) WITHOUT ROWID;
+            CREATE TABLE conversation_context (id INTEGER PRIMARY KEY, user_id TEXT NOT NULL,
+                conversation_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL,
+                UNIQUE (user_id, conversation_id, key));
+            CREATE VIRTUAL TABLE conversation_fts USING fts5(owner, key, value, content='',
+                tokenize='porter unicode61');
+            CREATE TRIGGER conversation_context_ai AFTER INSERT ON conversation_context BEGIN
+                INSERT INTO conversation_fts (rowid, owner, key, value)
+                VALUES (new.id, 'u' || hex(new.user_id), new.key, new.value);
+            END;
+            INSERT INTO conversation_context (user_id, conversation_id, key, value, updated_at)
+                VALUES ('u1', 'c1', 'project', 'printer rollout', 1.0);
+            INSERT INTO user_preferences VALUES ('u1', 'timezone', 'CET', 1.0);
+        """)
+        conn.close()
+
+        db = MemoryDatabase(path, flush_interval=60.0, compact_interval=0)
+        try:
+            assert db.get_context("u1", "c1") == {"project": "printer rollout"}
+            assert db.get_preferences("u1") == {"timezone": "CET"}
+            db.set_context("u1", "c1", "project", "scanner rollout")
+            assert [r["conversation_id"] for r in db.search_context("u1", "scanner")] == ["c1"]
+            assert db.search_context("u1", "printer") == []
+        finally:
+            db.close()
+
+
+@with_db()
+def test_usage_metrics(db, path):
+    db.set_context("u1", "c1", "k", "12345")
+    db.set_context("u1", "c2", "k", "é")
+    db.set_preference("u1", "tz", "UTC")
+    db.set_context("u2", "c1", "k", "1")
+    db.flush()
+
+    assert db.get_user_usage("u1") == {
+        "user_id": "u1", "conversations": 2, "context_entries": 2, "preferences": 1,
+        "bytes": 6 + 3 + 5, "max_context_entries": db.max_context_per_user,
+        "max_preferences": db.max_preferences_per_user,
+    }
+    usage = db.get_usage(top=1)
+    assert usage["users"] == 2 and usage["entries"] == 4 and usage["context_entries"] == 3
+    assert usage["bytes"] == 14 + 2
+    assert usage["top_users"] == [{"user_id": "u1", "entries": 3, "bytes": 14}]
+
+
+if __name__ == "__main__":
+    test_expired_entries_are_hidden_then_deleted()
+    print("[OK] Expired entries hidden then deleted")
+    test_quota_evicts_least_recently_used()
+    print("[OK] Quota evicts least recently used")
+    test_compaction_summarizes_idle_conversations()
+    print("[OK] Compaction summarizes idle conversations")
+    test_migrates_existing_database()
+    print("[OK] Migrates existing database")
+    test_usage_metrics()
+    print("[OK] Usage metrics")
@@ -0,0 +1,240 @@
+"""
+Tests for the SQLite-backed memory tools
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.core.memory import SemanticMemory, create_memory_store, memory_namespace
+from app.core.memory_db import MemoryDatabase, fts_query
+from app.tools import memory_tools
+
+
+def fake_semantic_memory(max_items_per_user=100):
+    store = create_memory_store(":memory:", DeterministicFakeEmbedding(size=384))
+    return SemanticMemory(store_factory=lambda: store, max_items_per_user=max_items_per_user)
+
+
+def with_db(flush_interval=60.0):
+    def decorator(test):
+        def wrapper():
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "memory.db")
+                db = MemoryDatabase(path, flush_interval=flush_interval)
+                previous = memory_tools.memory_db, memory_tools.semantic_memory
+                memory_tools.memory_db, memory_tools.semantic_memory = db, fake_semantic_memory()
+                memory_tools.connect_semantic_memory(db)
+                try:
+                    test(db, path)
+                finally:
+                    memory_tools.memory_db, memory_tools.semantic_memory = previous
+                    db.close()
+        wrapper.__name__ = test.__name__
+        return wrapper
+    return decorator
+
+
+@with_db()
+def test_tools_round_trip(db, path):
+    memory_tools.save_user_preference.invoke({"preference_key": "timezone", "preference_value": "CET", "user_id": "u1"})
+    memory_tools.save_user_preference.invoke({"preference_key": "timezone", "preference_value": "UTC", "user_id": "u1"})
+    memory_tools.save_conversation_context.invoke({
+        "context_key": "active_ticket", "context_value": "INC0000042 VPN drops",
+        "conversation_id": "c1", "user_id": "u1",
+    })
+    # Visible before the write-behind buffer is flushed
+    assert db.get_stats()["pending_writes"] == 3
+    assert memory_tools.get_user_preferences.invoke({"user_id": "u1"}) == {"timezone": "UTC"}
+    assert memory_tools.get_conversation_context.invoke({"conversation_id": "c1", "user_id": "u1"}) == {
+        "active_ticket": "INC0000042 VPN drops"
+    }
+    assert memory_tools.get_user_preferences.invoke({"user_id": "u2"}) == {}
+
+
+@with_db()
+def test_survives_restart(db, path):
+    db.set_preference("u1", "style", "formal")
+    db.set_context("u1", "c1", "project", "laptop refresh")
+    db.close()
+
+    reopened = MemoryDatabase(path)
+    try:
+        assert reopened.get_preferences("u1") == {"style": "formal"}
+        assert reopened.get_context("u1", "c1") == {"project": "laptop refresh"}
+    finally:
+        reopened.close()
+
+
+@with_db()
+def test_search_is_full_text_and_per_user(db, path):
+    db.set_context("u1", "c1", "issue", "Network outage in building B")
+    db.set_context("u1", "c2", "issue", "Printer jam")
+    db.set_context("u1", "c3", "network_ticket", "INC0000007")
+    db.set_context("u2", "c9", "issue", "Network outage at home")
+
+    results = memory_tools.search_conversation_history.invoke({"query": "network outage", "user_id": "u1"})
+    assert [r["conversation_id"] for r in results] == ["c1"]
+    assert results[0]["context"] == {"issue": "Network outage in building B"}
+
+    # Keys are searchable, word forms match, and operators are literal
+    assert {r["conversation_id"] for r in db.search_context("u1", "networks")} == {"c1", "c3"}
+    assert db.search_context("u1", 'printer OR "jam') == []
+    assert db.search_context("u1", "  ") == []
+    assert fts_query("a b", "u1").startswith('owner : "u7531"')
+
+    # Updates replace the indexed text
+    db.set_context("u1", "c2", "issue", "Network switch replaced")
+    assert {r["conversation_id"] for r in db.search_context("u1", "network")} == {"c1", "c2", "c3"}
+    assert db.search_context("u1", "printer") == []
+
+
+@with_db(flush_interval=0.05)
+def test_background_flush(db, path):
+    db.set_preference("u1", "language", "de")
+    deadline = time.time() + 5
+    while db.get_stats()["pending_writes"] and time.time() < deadline:
+        time.sleep(0.02)
+    assert db.get_stats()["rows_flushed"] == 1
+
+    other = MemoryDatabase(path)  # e.g. the A2A server process
+    try:
+        assert other.get_preferences("u1") == {"language": "de"}
+    finally:
+        other.close()
+
+
+def test_semantic_recall_is_per_user():
+    memory = fake_semantic_memory()
+    memory.remember("john.doe@company.com", "c1", "issue", "VPN drops every hour")
+    memory.remember("john.doe@company.com", "c2", "issue", "Printer jam on floor 3")
+    memory.remember("jane@company.com", "c7", "issue", "VPN drops every hour")
+    assert memory.flush(timeout=10)
+
+    items = memory.recall("john.doe@company.com", "issue: VPN drops every hour", limit=5)
+    assert [item.value["conversation_id"] for item in items] == ["c1", "c2"]
+    assert items[0].score > items[1].score
+    assert memory_namespace("john.doe@company.com") == ("memories", "john%2Edoe@company%2Ecom", "context")
+
+
+def test_eviction_bounds_each_user():
+    memory = fake_semantic_memory(max_items_per_user=5)
+    for i in range(12):
+        memory.remember("u1", f"c{i}", "note", f"note number {i}")
+        memory.flush(timeout=10)
+    memory.remember("u2", "c0", "note", "other user")
+    memory.flush(timeout=10)
+
+    store = memory._store_factory()
+    kept = store.search(memory_namespace("u1"), limit=100)
+    assert sorted(item.key for item in kept) == sorted(f"c{i}:note" for i in range(7, 12))
+    assert len(store.search(memory_namespace("u2"), limit=100)) == 1
+    assert memory.get_stats()["evicted"] == 7
+
+
+def test_eviction_keeps_newest_when_over_the_search_page():
+    memory = fake_semantic_memory(max_items_per_user=20)
+    for i in range(60):
+        memory.remember("u1", f"c{i}", "note", f"note number {i}")
+        if i % 10 == 9:
+            memory.flush(timeout=10)
+    # Cap lowered below what the namespace already holds
+    memory.max_items_per_user, memory.batch_size = 3, 2
+    memory.remember("u1", "c0", "note", "note number 0, updated")
+    memory.flush(timeout=10)
+
+    kept = memory._store_factory().search(memory_namespace("u1"), limit=100)
+    assert sorted(item.key for item in kept) == sorted(["c0:note", "c58:note", "c59:note"])
+
+
+@with_db()
+def test_search_tool_adds_semantic_matches(db, path):
+    for conversation_id, value in (("c1", "Laptop battery swelling"), ("c2", "Outlook keeps asking for password")):
+        memory_tools.save_conversation_context.invoke({
+            "context_key": "issue", "context_value": value, "conversation_id": conversation_id, "user_id": "u1",
+        })
+    assert memory_tools.semantic_memory.flush(timeout=10)
+
+    results = memory_tools.search_conversation_history.invoke({"query": "battery", "user_id": "u1", "limit": 2})
+    # Full-text hit first, then the nearest remaining conversation by embedding
+    assert [r["conversation_id"] for r in results] == ["c1", "c2"]
+    assert [r["source"] for r in results] == ["full_text", "semantic"]
+    assert results[0]["score"] is None and results[1]["score"] is not None
+    assert results[1]["context"] == {"issue": "Outlook keeps asking for password"}
+    # Every result has the same keys
+    assert all(set(r) == {"conversation_id", "context", "source", "score"} for r in results)
+
+
+@with_db()
+def test_semantic_memory_follows_expiry_eviction_and_compaction(db, path):
+    semantic = memory_tools.semantic_memory
+    store = semantic._store_factory()
+
+    def save(conversation_id, key, value, ttl=None):
+        db.set_context("u1", conversation_id, key, value, ttl=ttl)
+        semantic.remember("u1", conversation_id, key, value)
+
+    def indexed():
+        assert semantic.flush(timeout=10)
+        return {item.key for item in store.search(memory_namespace("u1"), limit=100)}
+
+    def in_db():
+        return {f"c{i}:{key}" for i in range(1, 5) for key in db.get_context("u1", f"c{i}")}
+
+    save("c1", "issue", "Laptop battery swelling", ttl=0.05)
+    save("c2", "issue", "Outlook keeps asking for password")
+    save("c3", "device", "Surface Pro 7")
+    save("c3", "issue", "Docking station not detected")
+    assert indexed() == {"c1:issue", "c2:issue", "c3:device", "c3:issue"}
+
+    # Expired and compacted entries leave the index; the summary joins it
+    time.sleep(0.1)
+    db.compact_after = 0.05
+    db.compact()
+    assert indexed() == in_db() == {"c2:issue", "c3:summary"}
+    results = memory_tools.search_conversation_history.invoke({"query": "laptop battery", "user_id": "u1"})
+    assert "c1" not in [r["conversation_id"] for r in results]
+
+    # So do entries evicted over the (shared) quota
+    db.max_context_per_user = 2
+    save("c4", "issue", "Teams camera is black")
+    db.flush()
+    assert len(in_db()) == 2 and indexed() == in_db()
+    assert semantic.get_stats()["forgotten"] == 4
+
+
+@with_db()
+def test_search_tool_skips_removed_entries(db, path):
+    # Indexed, but gone from the database before the removal reached the index
+    memory_tools.semantic_memory.remember("u1", "c1", "issue", "Laptop battery swelling")
+    assert memory_tools.semantic_memory.flush(timeout=10)
+    results = memory_tools.search_conversation_history.invoke({"query": "battery", "user_id": "u1"})
+    assert results == []
+
+
+if __name__ == "__main__":
+    test_tools_round_trip()
+    print("[OK] Tools round trip")
+    test_survives_restart()
+    print("[OK] Memory survives restart")
+    test_search_is_full_text_and_per_user()
+    print("[OK] Full-text search per user")
+    test_background_flush()
+    print("[OK] Background flush")
+    test_semantic_recall_is_per_user()
+    print("[OK] Semantic recall per user")
+    test_eviction_bounds_each_user()
+    print("[OK] Eviction bounds each user")
+    test_eviction_keeps_newest_when_over_the_search_page()
+    print("[OK] Eviction keeps the newest beyond one search page")
+    test_search_tool_adds_semantic_matches()
+    print("[OK] Search tool adds semantic matches")
+    test_semantic_memory_follows_expiry_eviction_and_compaction()
+    print("[OK] Semantic memory follows expiry, eviction and compaction")
+    test_search_tool_skips_removed_entries()
+    print("[OK] Search tool skips removed entries")
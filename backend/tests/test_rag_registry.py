@@ -0,0 +1,102 @@
+"""
+Tests for the cached knowledge base vector store registry
+Uses deterministic fake embeddings so no model download is needed.
+"""
+import os
+import sys
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.rag import VectorStoreRegistry
+
+
+def counting_factory():
+    embeddings = DeterministicFakeEmbedding(size=16)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return embeddings
+
+    return embeddings, factory, calls
+
+
+def write_index(path, embeddings, texts):
+    FAISS.from_texts(texts, embeddings).save_local(path)
+
+
+def test_index_loaded_once_and_reused():
+    embeddings, factory, _ = counting_factory()
+    with tempfile.TemporaryDirectory() as path:
+        write_index(path, embeddings, ["wipe a device", "enroll a laptop", "reset mfa"])
+        registry = VectorStoreRegistry(index_path=path, embeddings_factory=factory)
+
+        first = registry.get_vectorstore()
+        for _ in range(5):
+            assert registry.search("enroll a laptop", k=1)[0].page_content == "enroll a laptop"
+        assert registry.get_vectorstore() is first
+
+        stats = registry.get_stats()
+        assert stats["loads"] == 1
+        assert stats["queries"] == 5
+        assert stats["vectors"] == 3
+        assert stats["last_load_ms"] is not None and stats["query_p95_ms"] is not None
+
+
+def test_rebuilt_index_is_hot_swapped():
+    embeddings, factory, _ = counting_factory()
+    with tempfile.TemporaryDirectory() as path:
+        write_index(path, embeddings, ["old policy"])
+        registry = VectorStoreRegistry(index_path=path, embeddings_factory=factory)
+        old = registry.get_vectorstore()
+
+        write_index(path, embeddings, ["new policy", "another new policy"])
+        new = registry.get_vectorstore()
+
+        assert new is not old
+        assert registry.search("new policy", k=1)[0].page_content == "new policy"
+        assert registry.get_stats()["loads"] == 2
+
+
+def test_concurrent_first_use_loads_once():
+    embeddings, factory, _ = counting_factory()
+    with tempfile.TemporaryDirectory() as path:
+        write_index(path, embeddings, ["vpn setup"])
+        registry = VectorStoreRegistry(index_path=path, embeddings_factory=factory)
+
+        threads = [threading.Thread(target=registry.search, args=("vpn",)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert registry.get_stats()["loads"] == 1
+        assert registry.get_stats()["queries"] == 8
+
+
+def test_missing_index_raises_without_builder():
+    _, factory, _ = counting_factory()
+    with tempfile.TemporaryDirectory() as path:
+        registry = VectorStoreRegistry(index_path=os.path.join(path, "missing"), embeddings_factory=factory)
+        try:
+            registry.get_vectorstore()
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError("expected FileNotFoundError")
+
+
+if __name__ == "__main__":
+    test_index_loaded_once_and_reused()
+    print("[OK] Index loaded once and reused")
+    test_rebuilt_index_is_hot_swapped()
+    print("[OK] Rebuilt index hot-swapped")
+    test_concurrent_first_use_loads_once()
+    print("[OK] Concurrent first use loads once")
+    test_missing_index_raises_without_builder()
+    print("[OK] Missing index raises without builder")
@@ -0,0 +1,104 @@
+"""
+Tests for resource provisioning and RBAC state in the shared database
+Each step runs in its own interpreter, as separate server workers would,
+against a temporary database (DATABASE_URL).
+"""
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import textwrap
+
+# Add backend to path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def in_process(database_url: str, body: str):
+    """Run an async function body in a separate interpreter and return its JSON result"""
+    script = (
+        "import asyncio, json, logging, sys\n"
+        f"sys.path.insert(0, {BACKEND_DIR!r})\n"
+        "logging.disable(logging.CRITICAL)\n"
+        "from app.core.database import engine\n"
+        "engine.echo = False\n"
+        "from app.tools.resource_tools import *\n"
+        "from app.tools.access_management_tools import assign_role, list_role_assignments\n"
+        "async def main():\n"
+        f"{textwrap.indent(textwrap.dedent(body), '    ')}\n"
+        "print(json.dumps(asyncio.run(main())))\n"
+    )
+    env = {**os.environ, "DATABASE_URL": database_url}
+    output = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def with_database(test):
+    def wrapper():
+        with tempfile.TemporaryDirectory() as tmp:
+            test(f"sqlite+aiosqlite:///{os.path.join(tmp, 'test.db')}")
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_database
+def test_state_is_shared_between_processes(database_url):
+    created = in_process(database_url, """
+        groups = await list_resource_groups()
+        await create_resource_group("test-rg", "eastus")
+        vm = await provision_vm("web-01", "test-rg", "UbuntuLTS", "Standard_B1s", "admin", "eastus")
+        return {"groups": groups, "status": vm["status"]}
+    """)
+    assert "default-rg" in created["groups"] and created["status"] == "Success"
+
+    vms = in_process(database_url, "return await list_vms('test-rg')")
+    assert [vm["name"] for vm in vms] == ["web-01"] and vms[0]["power_state"] == "VM running"
+
+    # A change made by one process is seen by the next
+    in_process(database_url, "return await stop_vm('web-01', 'test-rg')")
+    status = in_process(database_url, "return await get_vm_status('web-01', 'test-rg')")
+    assert status["power_state"] == "VM deallocated"
+
+
+@with_database
+def test_concurrent_duplicate_creates_succeed_once(database_url):
+    results, count = in_process(database_url, """
+        await create_resource_group("test-rg", "westus")
+        results = await asyncio.gather(*[
+            provision_vm("db-01", "test-rg", "UbuntuLTS", "Standard_B1s", "admin", "westus") for _ in range(4)
+        ])
+        return results, len(await list_vms("test-rg"))
+    """)
+    assert sum(isinstance(r, dict) and r["status"] == "Success" for r in results) == 1
+    assert all("already exists" in r for r in results if isinstance(r, str))
+    assert count == 1
+
+
+@with_database
+def test_role_assignments_are_persistent_and_idempotent(database_url):
+    user = "new.user@example.com"
+    defaults, first, again = in_process(database_url, f"""
+        defaults = await list_role_assignments("alice@example.com")
+        first = await assign_role({user!r}, "Reader", "/subscriptions/sub-123")
+        again = await assign_role({user!r}, "Reader", "/subscriptions/sub-123")
+        return defaults, first, again
+    """)
+    assert defaults and defaults[0]["role"] == "Contributor"
+    assert "Assigned" in first["message"] and "already assigned" in again["message"]
+
+    roles = in_process(database_url, f"""
+        await assign_role({user!r}, "Owner", "/subscriptions/sub-123")
+        return [r["role"] for r in await list_role_assignments({user!r})]
+    """)
+    assert roles == ["Reader", "Owner"]
+
+
+if __name__ == "__main__":
+    test_state_is_shared_between_processes()
+    print("[OK] State shared between processes")
+    test_concurrent_duplicate_creates_succeed_once()
+    print("[OK] Concurrent duplicate creates succeed once")
+    test_role_assignments_are_persistent_and_idempotent()
+    print("[OK] Role assignments persistent and idempotent")
@@ -0,0 +1,119 @@
+"""
+Tests for the micro-batched async retrieval service
+Uses deterministic fake embeddings so no model download is needed.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.ingestion import ingest_documents
+from app.core.rag import VectorStoreRegistry
+from app.core.retrieval_service import RetrievalService
+
+
+class SlowEmbeddings(DeterministicFakeEmbedding):
+    delay: float = 0.0
+    calls: List[int] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        time.sleep(self.delay)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def with_registry(test):
+    def wrapper():
+        embeddings = SlowEmbeddings(size=16)
+        with tempfile.TemporaryDirectory() as tmp:
+            docs_path, index_path = os.path.join(tmp, "docs"), os.path.join(tmp, "faiss_index")
+            os.makedirs(docs_path)
+            for i in range(12):
+                with open(os.path.join(docs_path, f"sop{i}.txt"), "w", encoding="utf-8") as f:
+                    f.write(f"## Procedure {i}\nStep {i}: restart the service and check device {i} compliance.")
+            ingest_documents(docs_path, index_path, embeddings, chunk_size=500, chunk_overlap=0)
+            embeddings.calls.clear()
+            test(VectorStoreRegistry(index_path=index_path, embeddings_factory=lambda: embeddings), embeddings)
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_registry
+def test_batch_matches_single_searches(registry, embeddings):
+    requests = [(f"restart device {i}", 3, mode) for i in range(6) for mode in ("vector", "hybrid", None)]
+    expected = [[doc.id for doc in registry.search(q, k=k, mode=m)] for q, k, m in requests]
+    embeddings.calls.clear()
+
+    batched = registry.search_batch(requests)
+    assert [[doc.id for doc in docs] for docs in batched] == expected
+    assert len(embeddings.calls) == 1
+
+
+@with_registry
+def test_concurrent_queries_share_batches(registry, embeddings):
+    service = RetrievalService(registry, max_batch=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(service.search(f"check compliance {i}", k=2, mode="vector") for i in range(20)))
+
+    results = asyncio.run(run())
+    assert len(results) == 20 and all(len(docs) == 2 for docs in results)
+    assert service.batches == 3 and service.max_batch_seen == 8
+    assert len(embeddings.calls) == 3
+
+
+@with_registry
+def test_event_loop_stays_responsive(registry, embeddings):
+    embeddings.delay = 0.3
+    service = RetrievalService(registry, max_wait_ms=1)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(service.search(f"restart {i}", mode="vector") for i in range(4)))
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+@with_registry
+def test_errors_reach_every_caller(registry, embeddings):
+    service = RetrievalService(registry, max_wait_ms=5)
+
+    def fail(requests):
+        raise RuntimeError("index unavailable")
+    registry.search_batch = fail
+
+    async def run():
+        return await asyncio.gather(*(service.search("restart") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_searches()
+    print("[OK] Batched search matches single searches")
+    test_concurrent_queries_share_batches()
+    print("[OK] Concurrent queries share batches")
+    test_event_loop_stays_responsive()
+    print("[OK] Event loop stays responsive")
+    test_errors_reach_every_caller()
+    print("[OK] Errors reach every caller")
@@ -0,0 +1,139 @@
+"""
+Tests for single-flight coalescing of LLM requests and read-only MCP tool calls
+"""
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+from app.core.singleflight import SingleFlight, make_key, llm_flights
+from app.core.llm_scheduler import ScheduledChatModel
+from app.mcp.mcp_client_langgraph import _coalesce_read_only_tool
+
+
+def test_make_key_normalizes_dict_order():
+    assert make_key("t", {"a": 1, "b": 2}) == make_key("t", {"b": 2, "a": 1})
+    assert make_key("t", {"a": 1}) != make_key("t", {"a": 2})
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    async def run():
+        flights = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        results = await asyncio.gather(*[flights.do("k", work) for _ in range(5)])
+        assert calls == 1
+        assert all(r == {"value": 42} for r in results)
+        assert flights.get_stats() == {"in_flight": 0, "executions": 1, "collapsed": 4}
+
+        # Once finished, the next call executes again
+        await flights.do("k", work)
+        assert calls == 2
+
+    asyncio.run(run())
+
+
+def test_errors_propagate_to_every_caller():
+    async def run():
+        flights = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(*[flights.do("k", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    asyncio.run(run())
+
+
+def test_stream_fans_out_to_late_subscribers():
+    async def run():
+        flights = SingleFlight("test")
+        produced = 0
+
+        async def source():
+            nonlocal produced
+            for token in ["a", "b", "c"]:
+                produced += 1
+                await asyncio.sleep(0.02)
+                yield token
+
+        async def consume(delay):
+            await asyncio.sleep(delay)
+            return [chunk async for chunk in flights.stream("k", source)]
+
+        results = await asyncio.gather(consume(0), consume(0.03))
+        assert results == [["a", "b", "c"], ["a", "b", "c"]]
+        assert produced == 3
+        assert flights.get_stats()["collapsed"] == 1
+
+    asyncio.run(run())
+
+
+class SlowFakeChatModel(GenericFakeChatModel):
+    """Fake model that takes a while so concurrent calls overlap"""
+
+    async def _agenerate(self, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await super()._agenerate(*args, **kwargs)
+
+
+def test_identical_llm_requests_are_coalesced():
+    async def run():
+        inner = SlowFakeChatModel(messages=iter([AIMessage(content="only once")]))
+        model = ScheduledChatModel(inner=inner, provider="fake-singleflight")
+        before = llm_flights.get_stats()["collapsed"]
+
+        results = await asyncio.gather(*[model.ainvoke([HumanMessage(content="same prompt")]) for _ in range(3)])
+        assert [r.content for r in results] == ["only once"] * 3
+        assert len({id(r) for r in results}) == 3  # every caller gets its own copy
+        assert llm_flights.get_stats()["collapsed"] - before == 2
+
+    asyncio.run(run())
+
+
+def test_read_only_tool_calls_are_coalesced():
+    async def run():
+        calls = 0
+
+        async def list_devices(user_email: str = None, status: str = None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return f"devices for {user_email}"
+
+        tool = StructuredTool.from_function(coroutine=list_devices, name="intune_list_intune_devices",
+                                            description="List devices")
+        tool = _coalesce_read_only_tool(tool)
+
+        results = await asyncio.gather(
+            tool.ainvoke({"user_email": "a@corp.com"}),
+            tool.ainvoke({"user_email": "a@corp.com"}),
+            tool.ainvoke({"user_email": "b@corp.com"}),
+        )
+        assert results[0] == results[1] == "devices for a@corp.com"
+        assert calls == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_make_key_normalizes_dict_order()
+    test_concurrent_identical_calls_share_one_execution()
+    test_errors_propagate_to_every_caller()
+    test_stream_fans_out_to_late_subscribers()
+    test_identical_llm_requests_are_coalesced()
+    test_read_only_tool_calls_are_coalesced()
+    print("[OK] All single-flight tests passed!")
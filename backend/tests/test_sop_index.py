@@ -0,0 +1,86 @@
+"""
+Tests for the SOP section index and the consult_sop tool
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.sop_index import SOPIndex, domain_for_file
+from app.tools.rag_tools import consult_intune_sop, consult_sop
+
+
+def test_domains_cover_all_sops():
+    assert domain_for_file("user_access_management_sap_sop_v1.txt") == "access"
+    assert domain_for_file("new_user_onboarding_sop_v1.txt") == "onboarding"
+
+    index = SOPIndex()
+    assert set(index.domains()) == {"intune", "m365", "onboarding", "servicenow", "access"}
+    assert index.resolve_domain("SAP") == "access"
+    assert index.resolve_domain("all") == ""
+    assert index.resolve_domain("payroll") is None
+
+
+def test_search_finds_sections_by_domain():
+    index = SOPIndex()
+    sections = index.search("wipe procedure", domain="intune")
+    assert sections and "Wipe" in sections[0].title
+    assert all(s.domain == "intune" for s in sections)
+
+    # Stemming: "enroll" matches "Enrollment"
+    assert index.search("enroll", domain="intune")
+
+    # Short words fall back to phrase matching
+    assert any("SLA" in s.title for s in index.search("SLA", domain="servicenow"))
+
+
+def test_consult_tools():
+    text = consult_sop.invoke({"domain": "servicenow", "query": "escalation"})
+    assert "Escalation" in text
+
+    assert "Wipe" in consult_intune_sop.invoke({"query": "how to wipe device"})
+    assert "unknown SOP domain" in consult_sop.invoke({"domain": "payroll", "query": "x"})
+
+
+def test_index_reloads_on_file_change():
+    with tempfile.TemporaryDirectory() as sop_dir:
+        path = os.path.join(sop_dir, "intune_device_provisioning_sop_v1.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# Intune\n\n## Purpose\nDevice enrollment.\n")
+        index = SOPIndex(sop_dir=sop_dir, check_interval=0)
+        assert not index.search("bitlocker recovery", domain="intune")
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n## Bitlocker\nBitlocker recovery keys are escrowed in Intune.\n")
+        # Make sure the mtime changes even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert index.search("bitlocker recovery", domain="intune")[0].title == "Bitlocker"
+        assert index.builds == 2
+
+
+def test_search_is_fast():
+    index = SOPIndex()
+    index.search("warm up")
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.search("device enrollment prerequisites", domain="intune")
+    per_call = (time.perf_counter() - started) / 1000
+    assert per_call < 0.001, f"{per_call * 1e6:.0f} us per search"
+
+
+if __name__ == "__main__":
+    test_domains_cover_all_sops()
+    print("[OK] Domains cover all SOPs")
+    test_search_finds_sections_by_domain()
+    print("[OK] Search finds sections by domain")
+    test_consult_tools()
+    print("[OK] consult_sop / consult_intune_sop")
+    test_index_reloads_on_file_change()
+    print("[OK] Index reloads on file change")
+    test_search_is_fast()
+    print("[OK] Search is fast")
@@ -0,0 +1,172 @@
+"""
+Tests for tool execution in the ServiceNow, M365 and Access subgraphs
+MCP tools are stubbed and the LLM is scripted with the fake provider.
+"""
+import asyncio
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import StructuredTool
+from app.core.fake_llm import FakeChatModel
+from app.agents import access_agent, m365_agent, servicenow_agent
+from app.agents.tool_executor import create_tool_executor
+from app.agents.subgraphs.access import access_graph
+from app.agents.subgraphs.m365 import m365_graph
+from app.agents.subgraphs.servicenow import servicenow_graph
+
+
+def make_tool(name, delay=0.0, error=None, log=None):
+    async def run(ticket_id: str = "") -> str:
+        if log is not None:
+            log.append(("start", name, time.monotonic()))
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(("end", name, time.monotonic()))
+        if error:
+            raise RuntimeError(error)
+        return f"{name} result for {ticket_id}"
+
+    return StructuredTool.from_function(coroutine=run, name=name, description=f"Stub {name}")
+
+
+def tool_calls(*names):
+    return AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"ticket_id": f"INC{i}"}, "id": f"call_{i}"}
+        for i, name in enumerate(names)
+    ])
+
+
+def patch_agent(module, tools, responses):
+    """Stub MCP tools and the LLM for one agent module, returning a restore function"""
+    original_tools, original_llm = module.get_mcp_tools, module.get_llm
+    model = FakeChatModel(responses=responses)
+
+    async def fake_get_mcp_tools(prefix=None):
+        return list(tools)
+
+    module.get_mcp_tools = fake_get_mcp_tools
+    module.get_llm = lambda: model
+
+    def restore():
+        module.get_mcp_tools, module.get_llm = original_tools, original_llm
+
+    return model, restore
+
+
+def test_servicenow_subgraph_executes_tool_calls_in_parallel():
+    async def run():
+        tools = [make_tool("servicenow_get_ticket", delay=0.2), make_tool("servicenow_search_tickets", delay=0.2)]
+        model, restore = patch_agent(servicenow_agent, tools, [
+            tool_calls("servicenow_get_ticket", "servicenow_search_tickets"),
+            "Ticket INC0 is open.",
+        ])
+        try:
+            started = time.monotonic()
+            result = await servicenow_graph.ainvoke({"messages": [HumanMessage(content="status of INC0?")]})
+            elapsed = time.monotonic() - started
+        finally:
+            restore()
+
+        tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+        assert [m.tool_call_id for m in tool_messages] == ["call_0", "call_1"]
+        assert tool_messages[0].content == "servicenow_get_ticket result for INC0"
+        assert result["messages"][-1].content == "Ticket INC0 is open."
+        # One LLM call to request tools, one to answer - no looping on unexecuted calls
+        assert model.call_count == 2
+        assert elapsed < 0.35, f"tool calls ran sequentially ({elapsed:.2f}s)"
+
+    asyncio.run(run())
+
+
+def test_m365_and_access_subgraphs_execute_tools():
+    async def run():
+        m365_model, restore_m365 = patch_agent(m365_agent, [make_tool("m365_list_users")], [
+            tool_calls("m365_list_users"), "Found the users.",
+        ])
+        access_model, restore_access = patch_agent(access_agent, [make_tool("access_check_request_status")], [
+            tool_calls("access_check_request_status"), "Request approved.",
+        ])
+        try:
+            m365_result = await m365_graph.ainvoke({"messages": [HumanMessage(content="list users")]})
+            access_result = await access_graph.ainvoke({"messages": [HumanMessage(content="status?")]})
+        finally:
+            restore_m365()
+            restore_access()
+
+        assert any(isinstance(m, ToolMessage) and m.name == "m365_list_users" for m in m365_result["messages"])
+        assert m365_result["messages"][-1].content == "Found the users."
+        assert any(isinstance(m, ToolMessage) for m in access_result["messages"])
+        assert access_result["messages"][-1].content == "Request approved."
+        assert m365_model.call_count == 2 and access_model.call_count == 2
+
+    asyncio.run(run())
+
+
+def test_timeouts_errors_and_unknown_tools_become_error_messages():
+    async def run():
+        tools = [make_tool("slow", delay=1.0), make_tool("broken", error="backend down"), make_tool("ok")]
+
+        async def load_tools():
+            return tools
+
+        execute = create_tool_executor(load_tools, timeout=0.1)
+        result = await execute({"messages": [tool_calls("slow", "broken", "missing", "ok")]})
+        messages = result["messages"]
+
+        assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2", "call_3"]
+        assert messages[0].status == "error" and "timed out" in messages[0].content
+        assert messages[1].status == "error" and "backend down" in messages[1].content
+        assert messages[2].status == "error" and "not available" in messages[2].content
+        assert messages[3].status == "success" and messages[3].content == "ok result for INC3"
+
+    asyncio.run(run())
+
+
+def test_concurrency_cap_limits_parallel_tools():
+    async def run():
+        log = []
+        tools = [make_tool(f"tool_{i}", delay=0.05, log=log) for i in range(6)]
+
+        async def load_tools():
+            return tools
+
+        execute = create_tool_executor(load_tools, max_concurrency=2)
+        await execute({"messages": [tool_calls(*[t.name for t in tools])]})
+
+        running, peak = 0, 0
+        for event, _, _ in sorted(log, key=lambda e: (e[2], e[0] == "start")):
+            running += 1 if event == "start" else -1
+            peak = max(peak, running)
+        assert peak == 2
+
+    asyncio.run(run())
+
+
+def test_no_tool_calls_is_a_no_op():
+    async def run():
+        async def load_tools():
+            raise AssertionError("tools should not be loaded")
+
+        execute = create_tool_executor(load_tools)
+        result = await execute({"messages": [AIMessage(content="done")]})
+        assert result == {"messages": []}
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_servicenow_subgraph_executes_tool_calls_in_parallel()
+    print("[OK] ServiceNow subgraph runs tool calls in parallel")
+    test_m365_and_access_subgraphs_execute_tools()
+    print("[OK] M365 and Access subgraphs execute tools")
+    test_timeouts_errors_and_unknown_tools_become_error_messages()
+    print("[OK] Timeouts, errors and unknown tools reported to the agent")
+    test_concurrency_cap_limits_parallel_tools()
+    print("[OK] Concurrency cap respected")
+    test_no_tool_calls_is_a_no_op()
+    print("[OK] No tool calls is a no-op")
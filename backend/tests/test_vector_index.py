@@ -0,0 +1,136 @@
+"""
+Tests for the derived, memory-mapped FAISS search index types
+"""
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.core.config import settings
+from app.core.ingestion import ingest_documents
+from app.core.vector_index import (
+    INDEX_TYPES, build_index_of_type, load_store, read_faiss_index, search_index_file,
+)
+
+
+def clustered_vectors(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((50, dim)).astype("float32")
+    return centers[rng.integers(0, 50, n)] + 0.1 * rng.standard_normal((n, dim)).astype("float32")
+
+
+def test_every_type_finds_exact_vectors():
+    vectors = clustered_vectors(12000)
+    for index_type in INDEX_TYPES:
+        index = build_index_of_type(vectors, index_type)
+        assert index.ntotal == len(vectors)
+        _, ids = index.search(vectors[:20], 5)
+        hits = sum(i in row for i, row in enumerate(ids))
+        assert hits >= 18, f"{index_type}: {hits}/20 self-matches"
+
+
+def test_small_corpora_fall_back_to_flat():
+    index = build_index_of_type(clustered_vectors(100), "pq")
+    assert isinstance(index, faiss.IndexFlat)
+
+
+def test_mmap_load_matches_in_memory():
+    vectors = clustered_vectors(12000)
+    with tempfile.TemporaryDirectory() as tmp:
+        for index_type in ("flat", "ivf", "sq8"):
+            path = os.path.join(tmp, search_index_file(index_type))
+            faiss.write_index(build_index_of_type(vectors, index_type), path)
+            mapped = read_faiss_index(path, mmap=True)
+            loaded = read_faiss_index(path, mmap=False)
+            assert np.array_equal(mapped.search(vectors[:5], 3)[1], loaded.search(vectors[:5], 3)[1])
+
+
+def test_ingestion_writes_configured_type():
+    previous = settings.RAG_INDEX_TYPE
+    with tempfile.TemporaryDirectory() as tmp:
+        docs, index_path = os.path.join(tmp, "docs"), os.path.join(tmp, "faiss_index")
+        os.makedirs(docs)
+        with open(os.path.join(docs, "a.txt"), "w", encoding="utf-8") as f:
+            f.write("Reset the VPN token. " * 40)
+        embeddings = DeterministicFakeEmbedding(size=16)
+        try:
+            settings.RAG_INDEX_TYPE = "flat"
+            ingest_documents(docs, index_path, embeddings, chunk_size=100, chunk_overlap=0)
+            assert not os.path.exists(os.path.join(index_path, "index.sq8.faiss"))
+            # Missing derived index is built on the next (otherwise no-op) run
+            settings.RAG_INDEX_TYPE = "sq8"
+            ingest_documents(docs, index_path, embeddings, chunk_size=100, chunk_overlap=0)
+            assert os.path.exists(os.path.join(index_path, "index.sq8.faiss"))
+
+            store = load_store(index_path, embeddings)
+            assert isinstance(store.index, faiss.IndexScalarQuantizer)
+            assert store.similarity_search("Reset the VPN token.", k=1)
+            # A type that was never built falls back to the flat index
+            assert isinstance(load_store(index_path, embeddings, index_type="hnsw").index, faiss.IndexFlat)
+        finally:
+            settings.RAG_INDEX_TYPE = previous
+
+
+def test_switching_back_never_pairs_a_stale_index():
+    previous = settings.RAG_INDEX_TYPE
+    with tempfile.TemporaryDirectory() as tmp:
+        docs, index_path = os.path.join(tmp, "docs"), os.path.join(tmp, "faiss_index")
+        os.makedirs(docs)
+
+        def write(name, text):
+            with open(os.path.join(docs, name), "w", encoding="utf-8") as f:
+                f.write(text)
+
+        def ingest(index_type):
+            settings.RAG_INDEX_TYPE = index_type
+            ingest_documents(docs, index_path, embeddings, chunk_size=100, chunk_overlap=0)
+
+        embeddings = DeterministicFakeEmbedding(size=16)
+        hnsw_path = os.path.join(index_path, search_index_file("hnsw"))
+        try:
+            write("a.txt", "Reset the VPN token. " * 20)
+            ingest("hnsw")
+            with open(hnsw_path, "rb") as f:
+                old_hnsw = f.read()
+
+            # The corpus changes while another type is configured
+            write("b.txt", "Printer on floor 3 is jammed. " * 40)
+            ingest("flat")
+            assert not os.path.exists(hnsw_path)
+
+            # Even a stale file left behind is not paired with the new docstore
+            with open(hnsw_path, "wb") as f:
+                f.write(old_hnsw)
+            settings.RAG_INDEX_TYPE = "hnsw"
+            store = load_store(index_path, embeddings)
+            assert isinstance(store.index, faiss.IndexFlat)
+            assert store.index.ntotal == len(store.index_to_docstore_id)
+
+            # and the next run rebuilds it
+            ingest("hnsw")
+            store = load_store(index_path, embeddings)
+            assert isinstance(store.index, faiss.IndexHNSW)
+            assert store.index.ntotal == len(store.index_to_docstore_id)
+            hit = store.similarity_search("Printer on floor 3 is jammed.", k=1)[0]
+            assert hit.metadata["source"].endswith("b.txt")
+        finally:
+            settings.RAG_INDEX_TYPE = previous
+
+
+if __name__ == "__main__":
+    test_every_type_finds_exact_vectors()
+    print("[OK] Every index type finds exact vectors")
+    test_small_corpora_fall_back_to_flat()
+    print("[OK] Small corpora fall back to flat")
+    test_mmap_load_matches_in_memory()
+    print("[OK] mmap load matches in-memory load")
+    test_ingestion_writes_configured_type()
+    print("[OK] Ingestion writes the configured index type")
+    test_switching_back_never_pairs_a_stale_index()
+    print("[OK] Switching back never pairs a stale index")
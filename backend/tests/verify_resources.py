@@ -19,28 +19,28 @@ from app.tools.access_management_tools import (
 async def test_resource_tools():
     print("--- Testing Resource Tools ---")
     
-    # 1. Resource Group
-    print(create_resource_group("test-rg", "eastus"))
-    rgs = list_resource_groups()
+    # 1. Resource Group (state is in the shared database, so reruns find it again)
+    print(await create_resource_group("test-rg", "eastus"))
+    rgs = await list_resource_groups()
     print(f"RGs: {rgs}")
     assert "test-rg" in rgs
     
     # 2. App Service
-    print(create_app_service("test-app", "test-rg", "S1", "NODE|16-lts", "eastus"))
-    apps = list_app_services("test-rg")
+    print(await create_app_service("test-app", "test-rg", "S1", "NODE|16-lts", "eastus"))
+    apps = await list_app_services("test-rg")
     print(f"Apps: {[a['name'] for a in apps]}")
     assert len(apps) == 1
     assert apps[0]['name'] == "test-app"
     
     # 3. Service Account
-    print(create_service_account("test-sa", "test-rg"))
-    sas = list_service_accounts()
+    print(await create_service_account("test-sa", "test-rg"))
+    sas = [s for s in await list_service_accounts() if s['resource_group'] == "test-rg"]
     print(f"SAs: {[s['name'] for s in sas]}")
     assert len(sas) == 1
     
     # 4. VM
-    print(provision_vm("test-vm", "test-rg", "UbuntuLTS", "Standard_D2s_v3", "adminuser", "eastus"))
-    vms = list_vms("test-rg")
+    print(await provision_vm("test-vm", "test-rg", "UbuntuLTS", "Standard_D2s_v3", "adminuser", "eastus"))
+    vms = await list_vms("test-rg")
     print(f"VMs: {[v['name'] for v in vms]}")
     assert len(vms) == 1
 